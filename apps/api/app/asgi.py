@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from .main import create_app
+
+
+# ASGI entrypoint: ``uvicorn app.asgi:app``. app.main only defines create_app, so
+# importing it (tests, rq workers, CLI tools) builds no app from the environment.
+app = create_app()
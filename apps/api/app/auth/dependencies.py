@@ -1,32 +1,84 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import Annotated
+
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 from ..db import get_db
 from ..models import User
-from .jwt import decode_token
+from .jwt import InvalidToken, verify_token
 
 
 bearer = HTTPBearer(auto_error=False)
+BearerCredentials = Annotated[HTTPAuthorizationCredentials | None, Depends(bearer)]
+
+# Embedded in calendar subscription URLs; only ever accepted by the feed route.
+CALENDAR_TOKEN_TYPE = "calendar"
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated caller, built from verified token claims without a DB hit.
+
+    Routes that only need the caller's id should take a ``CurrentPrincipal``;
+    ``CurrentUser`` loads the full ``User`` row for the few that need it.
+    """
+
+    id: str
+    token_type: str | None = None
 
 
-def get_current_user(
-    cred: HTTPAuthorizationCredentials | None = Depends(bearer),
-    db: Session = Depends(get_db),
-) -> User:
+def get_current_principal(cred: BearerCredentials) -> Principal:
     if cred is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
     try:
-        payload = decode_token(cred.credentials)
-    except Exception:
+        payload = verify_token(cred.credentials)
+    except InvalidToken:
         raise HTTPException(status_code=401, detail="Invalid token")
     sub = payload.get("sub")
     if not sub:
         raise HTTPException(status_code=401, detail="Invalid token payload")
-    user = db.get(User, sub)
+    if payload.get("type") == CALENDAR_TOKEN_TYPE:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return Principal(id=sub, token_type=payload.get("type"))
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+
+
+def get_calendar_principal(
+    plan_id: str,
+    cred: BearerCredentials,
+    token: str | None = None,
+) -> Principal:
+    """Caller of a plan's calendar feed: a bearer token, or a subscription ``token`` query param.
+
+    Calendar apps cannot send headers, so subscription URLs carry a token that is
+    valid for this one plan's feed and nothing else.
+    """
+    if token is None:
+        return get_current_principal(cred)
+    try:
+        payload = verify_token(token)
+    except InvalidToken:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    sub = payload.get("sub")
+    if not sub or payload.get("type") != CALENDAR_TOKEN_TYPE or payload.get("plan") != plan_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return Principal(id=sub, token_type=CALENDAR_TOKEN_TYPE)
+
+
+CalendarPrincipal = Annotated[Principal, Depends(get_calendar_principal)]
+
+
+def get_current_user(principal: CurrentPrincipal, db: Annotated[Session, Depends(get_db)]) -> User:
+    user = db.get(User, principal.id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return user
 
+
+CurrentUser = Annotated[User, Depends(get_current_user)]
@@ -1,20 +1,33 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
-
-from jose import jwt
+import threading
+import time
+from collections import OrderedDict
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import Any
 
 from ..config import get_settings
 
 
+class InvalidToken(ValueError):
+    """The token is malformed, has a bad signature or has expired."""
+
+
 def _now() -> datetime:
-    return datetime.now(timezone.utc)
+    return datetime.now(UTC)
+
+
+# jose (and the cryptography backend it loads) is imported on first use, not at
+# app import; the startup warmup pays for it when enabled.
 
 
-def create_token(sub: str, ttl_seconds: int, token_type: str) -> str:
+def create_token(sub: str, ttl_seconds: int, token_type: str, **claims: Any) -> str:
+    from jose import jwt
+
     settings = get_settings()
-    payload: Dict[str, Any] = {
+    payload: dict[str, Any] = {
+        **claims,
         "sub": sub,
         "type": token_type,
         "iat": int(_now().timestamp()),
@@ -24,6 +37,63 @@ def create_token(sub: str, ttl_seconds: int, token_type: str) -> str:
 
 
 def decode_token(token: str) -> dict:
+    from jose import JWTError, jwt
+
     settings = get_settings()
-    return jwt.decode(token, settings.jwt_secret, algorithms=["HS256"])
+    try:
+        return jwt.decode(token, settings.jwt_secret, algorithms=["HS256"])
+    except JWTError as exc:
+        raise InvalidToken(str(exc)) from exc
+
+
+
+class TokenCache:
+    """Bounded LRU of verified token -> claims.
+
+    Entries are only trusted until the token's own ``exp``; an expired hit is
+    dropped and the token is decoded (and rejected) again.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._data: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+
+    def get(self, token: str) -> dict | None:
+        with self._lock:
+            claims = self._data.get(token)
+            if claims is None:
+                return None
+            if claims["exp"] <= time.time():
+                del self._data[token]
+                return None
+            self._data.move_to_end(token)
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        if self.max_entries <= 0 or not isinstance(claims.get("exp"), (int, float)):
+            return
+        with self._lock:
+            self._data[token] = claims
+            self._data.move_to_end(token)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+@lru_cache
+def get_token_cache() -> TokenCache:
+    return TokenCache(get_settings().token_cache_size)
+
 
+def verify_token(token: str) -> dict:
+    """``decode_token`` with a cache of already-verified tokens."""
+    cache = get_token_cache()
+    claims = cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        cache.put(token, claims)
+    return claims
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any
+
+from ..config import get_settings
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool already has ``password_hash_max_pending`` jobs queued."""
+
+
+def _params() -> tuple[int, int, int]:
+    settings = get_settings()
+    return settings.argon2_time_cost, settings.argon2_memory_cost, settings.argon2_parallelism
+
+
+def _hasher(params: tuple[int, int, int]):
+    from passlib.hash import argon2
+
+    time_cost, memory_cost, parallelism = params
+    return argon2.using(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+# Worker entry points: module-level so they pickle into the process pool.
+
+
+def _hash(password: str, params: tuple[int, int, int]) -> str:
+    return _hasher(params).hash(password)
+
+
+def _verify(password: str, password_hash: str, params: tuple[int, int, int]) -> tuple[bool, str | None]:
+    """Return (ok, new_hash); new_hash is set when the stored hash used outdated cost parameters."""
+    hasher = _hasher(params)
+    if not hasher.verify(password, password_hash):
+        return False, None
+    if hasher.needs_update(password_hash):
+        return True, hasher.hash(password)
+    return True, None
+
+
+class HashingPool:
+    """Bounded process pool for argon2, so hashing never holds a request worker's GIL.
+
+    At most ``max_pending`` jobs may be queued or running; beyond that callers get
+    ``HashingBusy`` immediately instead of waiting behind a login storm. With
+    ``workers == 0`` hashing runs inline (tests, CLI tools).
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.pending = 0
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise HashingBusy()
+            self.pending += 1
+            if self._executor is None:
+                # spawn, not fork: forking a server process with live threads can deadlock the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            executor = self._executor
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future: Future | None) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.workers <= 0:
+            return fn(*args)
+        return self._submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.workers <= 0:
+            return fn(*args)
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def get_hashing_pool() -> HashingPool:
+    settings = get_settings()
+    return HashingPool(settings.password_hash_workers, settings.password_hash_max_pending)
+
+
+def warm_hashing_pool() -> None:
+    """Start the hashing workers and load argon2 in each, so the first logins after a deploy don't pay for it."""
+    pool = get_hashing_pool()
+    if pool.workers <= 0:
+        _hash("warmup", _params())
+        return
+    futures = [pool._submit(_hash, "warmup", _params()) for _ in range(min(pool.workers, pool.max_pending))]
+    for future in futures:
+        future.result()
+
+
+def hash_password(password: str) -> str:
+    return get_hashing_pool().run(_hash, password, _params())
+
+
+def verify_password(password: str, password_hash: str) -> tuple[bool, str | None]:
+    return get_hashing_pool().run(_verify, password, password_hash, _params())
+
+
+async def hash_password_async(password: str) -> str:
+    return await get_hashing_pool().run_async(_hash, password, _params())
+
+
+async def verify_password_async(password: str, password_hash: str) -> tuple[bool, str | None]:
+    return await get_hashing_pool().run_async(_verify, password, password_hash, _params())
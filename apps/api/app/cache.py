@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Protocol
+
+from .config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+PLAN_SCOPE = "plan"
+CAPABILITY_SCOPE = "capability"
+
+
+class CacheUnavailable(Exception):
+    """Raised by a backend whose store can't be reached; ResponseCache treats it as a miss."""
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, ttl: int) -> None: ...
+
+    def add(self, key: str, value: bytes, ttl: int) -> bytes:
+        """Set ``key`` only if absent; return the value now stored."""
+        ...
+
+
+class LRUBackend:
+    """Thread-safe in-process LRU with per-entry TTL.
+
+    For tests and single-process dev (``RESPONSE_CACHE=memory``). Invalidation only
+    reaches the current process, so multi-worker deployments must use Redis.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+
+    def _get_locked(self, key: str) -> bytes | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _set_locked(self, key: str, value: bytes, ttl: int) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            return self._get_locked(key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def add(self, key: str, value: bytes, ttl: int) -> bytes:
+        with self._lock:
+            current = self._get_locked(key)
+            if current is not None:
+                return current
+            self._set_locked(key, value, ttl)
+            return value
+
+
+class NullBackend:
+    """Stores nothing; every read misses. Used when the cache is switched off."""
+
+    def get(self, key: str) -> bytes | None:
+        return None
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        return None
+
+    def add(self, key: str, value: bytes, ttl: int) -> bytes:
+        return value
+
+
+class RedisBackend:
+    """Cache shared by all workers.
+
+    The client connects on demand, so a Redis that is down at startup or restarts
+    is picked up again by the next call; until then calls raise ``CacheUnavailable``.
+    """
+
+    def __init__(self, client) -> None:
+        import redis
+
+        self.client = client
+        self._redis_error = redis.RedisError
+
+    @contextmanager
+    def _unavailable_on_error(self) -> Iterator[None]:
+        try:
+            yield
+        except self._redis_error as exc:
+            raise CacheUnavailable(str(exc)) from exc
+
+    def get(self, key: str) -> bytes | None:
+        with self._unavailable_on_error():
+            return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._unavailable_on_error():
+            self.client.set(key, value, ex=ttl)
+
+    def add(self, key: str, value: bytes, ttl: int) -> bytes:
+        with self._unavailable_on_error():
+            if self.client.set(key, value, ex=ttl, nx=True):
+                return value
+            return self.client.get(key) or value
+
+
+class ResponseCache:
+    """Versioned read-through cache for serialized per-user responses.
+
+    Each (scope, user) has a version token; entries are keyed by it. Readers fetch
+    the version *before* querying the DB and store under that version, and writers
+    replace the version after committing, so a response computed from pre-commit
+    data can never be served once the write is visible. Versions are wall-clock
+    nanoseconds rather than counters, so a lost version key cannot resurrect old
+    entries. An unreachable backend is logged and treated as a miss.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def _version_key(scope: str, user_id: str) -> str:
+        return f"nra:ver:{scope}:{user_id}"
+
+    def version(self, scope: str, user_id: str) -> str:
+        key = self._version_key(scope, user_id)
+        try:
+            current = self.backend.get(key)
+            if current is None:
+                # Versions outlive entries so a stale entry can never match a fresh version.
+                current = self.backend.add(key, str(time.time_ns()).encode(), self.ttl * 2)
+            return current.decode()
+        except CacheUnavailable:
+            logger.warning("response cache version lookup failed", exc_info=True)
+            return ""
+
+    @staticmethod
+    def _entry_key(scope: str, user_id: str, version: str, variant: str) -> str:
+        key = f"nra:{scope}:{user_id}:{version}"
+        return f"{key}:{variant}" if variant else key
+
+    def get(self, scope: str, user_id: str, variant: str = "") -> tuple[bytes | None, str]:
+        """Return (cached body or None, version to store a fresh body under).
+
+        ``variant`` keys a further representation under the same version, so one
+        invalidation of the scope drops all of them.
+        """
+        version = self.version(scope, user_id)
+        if not version:
+            return None, version
+        try:
+            return self.backend.get(self._entry_key(scope, user_id, version, variant)), version
+        except CacheUnavailable:
+            logger.warning("response cache get failed", exc_info=True)
+            return None, version
+
+    def put(self, scope: str, user_id: str, version: str, body: bytes, variant: str = "") -> None:
+        if not version:
+            return
+        try:
+            self.backend.set(self._entry_key(scope, user_id, version, variant), body, self.ttl)
+        except CacheUnavailable:
+            logger.warning("response cache put failed", exc_info=True)
+
+    def invalidate(self, scope: str, user_id: str) -> None:
+        try:
+            self.backend.set(self._version_key(scope, user_id), str(time.time_ns()).encode(), self.ttl * 2)
+        except CacheUnavailable:
+            logger.warning("response cache invalidation failed", exc_info=True)
+
+
+def _make_backend() -> CacheBackend:
+    settings = get_settings()
+    if settings.response_cache == "off":
+        return NullBackend()
+    if settings.response_cache == "memory":
+        return LRUBackend(settings.response_cache_max_entries)
+    import redis
+
+    # Not pinged here: a per-process fallback would miss other workers' invalidations
+    # and serve stale responses, so while Redis is unreachable every read misses instead.
+    return RedisBackend(redis.Redis.from_url(settings.redis_url, socket_timeout=0.25, socket_connect_timeout=0.25))
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    return ResponseCache(_make_backend(), get_settings().response_cache_ttl)
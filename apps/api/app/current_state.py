@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from .domain.projection import RiegelFit
+from .models import CapabilitySnapshot, Plan, UserCurrentState, UserRiegelFit
+
+
+# Readers resolve "latest snapshot" / "active plan" through the user's state row
+# (a primary-key lookup) instead of sorting their tables. Writers lock that row,
+# so concurrent writes for one user serialize and the pointers stay consistent.
+
+
+def lock_current_state(db: Session, user_id: str) -> UserCurrentState:
+    # Sessions don't autoflush, and the populate_existing re-read below would
+    # overwrite pointer changes still pending from an earlier record_* call.
+    db.flush()
+    db.execute(insert(UserCurrentState).values(user_id=user_id).on_conflict_do_nothing(index_elements=["user_id"]))
+    return db.scalars(
+        select(UserCurrentState)
+        .where(UserCurrentState.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).one()
+
+
+def record_snapshot(db: Session, user_id: str, snap: CapabilitySnapshot) -> None:
+    """Point at ``snap`` unless the current latest is dated later (backdated entries don't win)."""
+    state = lock_current_state(db, user_id)
+    current = db.get(CapabilitySnapshot, state.snapshot_id) if state.snapshot_id else None
+    if current is None or snap.date >= current.date:
+        state.snapshot_id = snap.id
+        state.updated_at = func.now()
+
+
+def record_plan(db: Session, user_id: str, plan: Plan) -> None:
+    state = lock_current_state(db, user_id)
+    state.plan_id = plan.id
+    state.goal_id = plan.goal_id
+    state.updated_at = func.now()
+
+
+def latest_snapshot(db: Session, user_id: str) -> CapabilitySnapshot | None:
+    return db.scalars(
+        select(CapabilitySnapshot)
+        .join(UserCurrentState, UserCurrentState.snapshot_id == CapabilitySnapshot.id)
+        .where(UserCurrentState.user_id == user_id)
+    ).first()
+
+
+def active_plan_row(db: Session, user_id: str) -> Row | None:
+    """(id, start_date, end_date, status, version) of the user's active plan."""
+    return db.execute(
+        select(Plan.id, Plan.start_date, Plan.end_date, Plan.status, Plan.version)
+        .join(UserCurrentState, UserCurrentState.plan_id == Plan.id)
+        .where(UserCurrentState.user_id == user_id, Plan.status == "active")
+    ).first()
+
+
+def fold_riegel_fit(db: Session, user_id: str, runs: RiegelFit) -> None:
+    """Add a batch of logged runs' sums to the user's Riegel fit (no history rescan)."""
+    # Create-if-missing, then lock, as lock_current_state does: two first logs for a user
+    # serialize on the row instead of both inserting it and one failing on the key.
+    db.execute(
+        insert(UserRiegelFit)
+        .values(user_id=user_id, n=0, sum_x=0.0, sum_y=0.0, sum_xx=0.0, sum_xy=0.0)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    row = db.scalars(
+        select(UserRiegelFit)
+        .where(UserRiegelFit.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).one()
+    fit = RiegelFit(n=row.n, sum_x=row.sum_x, sum_y=row.sum_y, sum_xx=row.sum_xx, sum_xy=row.sum_xy)
+    fit.merge(runs)
+    row.n, row.sum_x, row.sum_y, row.sum_xx, row.sum_xy = fit.n, fit.sum_x, fit.sum_y, fit.sum_xx, fit.sum_xy
+    row.exponent = fit.exponent()
+    row.updated_at = func.now()
+    # Sessions don't autoflush, and the populate_existing read above would drop
+    # these sums if another fold ran in this transaction before the commit.
+    db.flush()
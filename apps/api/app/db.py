@@ -1,33 +1,192 @@
 from __future__ import annotations
 
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
 from contextlib import contextmanager
-from typing import Generator
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, exc
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
-from .config import get_settings
+from .config import Settings, get_settings
+from .metrics import Histogram
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(get_settings().database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """Checkout latency histogram and timeout count for one connection pool.
+
+    Gauges (size, in use, overflow) are read from the live pool at snapshot time.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.pool: Pool | None = None
+        self._lock = threading.Lock()
+        self.timeouts = 0
+        self.wait_max = 0.0
+        self.wait = Histogram(CHECKOUT_BUCKETS)
+
+    def observe(self, wait: float, timed_out: bool) -> None:
+        if timed_out:
+            with self._lock:
+                self.timeouts += 1
+            return
+        self.wait.observe((), wait)
+        with self._lock:
+            self.wait_max = max(self.wait_max, wait)
+
+    def snapshot(self) -> dict[str, Any]:
+        pool = self.pool
+        cumulative, wait_sum, checkouts = self.wait.sample()
+        out: dict[str, Any] = {
+            "checkouts": checkouts,
+            "timeouts": self.timeouts,
+            "checkout_wait_sum_sec": wait_sum,
+            "checkout_wait_max_sec": self.wait_max,
+            "checkout_wait_buckets": cumulative,  # Prometheus-style cumulative ``le`` buckets
+        }
+        if isinstance(pool, QueuePool):
+            out.update(size=pool.size(), in_use=pool.checkedout(), overflow=max(0, pool.overflow()))
+        return out
+
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+
+class _InstrumentedPoolMixin:
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kw: Any) -> None:
+        super().__init__(*args, **kw)
+        self.metrics.pool = self  # type: ignore[assignment]  # recreate() builds a new pool
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()  # type: ignore[misc]
+        except exc.TimeoutError:
+            self.metrics.observe(time.perf_counter() - t0, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - t0, timed_out=False)
+        return conn
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    metrics = sync_pool_metrics
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+
+def _engine_kwargs(settings: Settings) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_statement_timeout_ms > 0:
+        kwargs["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return kwargs
+
+
+# Engines are built on first use, normally by the app lifespan's warmup or first
+# request, so importing this module (workers, CLI tools, tests) connects to nothing
+# and does not load the DB driver.
+
+
+@lru_cache
+def get_engine() -> Engine:
+    settings = get_settings()
+    return create_engine(settings.database_url, poolclass=InstrumentedQueuePool, **_engine_kwargs(settings))
+
+
+@lru_cache
+def get_sessionmaker() -> sessionmaker[Session]:
+    return sessionmaker(bind=get_engine(), autoflush=False, autocommit=False, expire_on_commit=False)
 
 
 def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
 
 
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """Engine for ``DB_ASYNC`` mode; created on first use so sync deployments never build it."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    settings = get_settings()
+    return create_async_engine(
+        settings.database_url, poolclass=InstrumentedAsyncQueuePool, **_engine_kwargs(settings)
+    )
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, autocommit=False, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+def warm_pool(connections: int) -> None:
+    """Open ``connections`` pooled connections now so the first requests don't pay for connecting."""
+    engine = get_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for conn in opened:
+            conn.close()
+
+
+async def warm_async_pool(connections: int) -> None:
+    engine = get_async_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(await engine.connect())
+    finally:
+        for conn in opened:
+            await conn.close()
+
+
+async def dispose_engines() -> None:
+    """Close the pooled connections of whichever engines were created (app shutdown)."""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+
+
 @contextmanager
 def session_scope() -> Generator[Session, None, None]:
-    session = SessionLocal()
+    session = get_sessionmaker()()
     try:
         yield session
         session.commit()
@@ -1,13 +1,157 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from datetime import date, timedelta
-from typing import List
 
 
-def evaluate_and_apply_adaptations(plan_id: str, as_of: date) -> List[dict]:
-    """Placeholder: evaluate rules and return events. DB ops handled in routers/services.
+# Design doc 3.4 rules; windows are in days of workout date.
+HARD_RPE = 7
+HARD_EASY_WINDOW_DAYS = 14
+HARD_EASY_THRESHOLD = 3
+HARD_EASY_VOLUME_FACTOR = 0.90
 
-    For MVP scaffolding, this returns an empty list and acts as a seam for future logic.
+MISSED_KEY_WINDOW_DAYS = 10
+MISSED_KEY_THRESHOLD = 2
+RECOVERY_VOLUME_FACTOR = 0.60
+
+AHEAD_MAX_RPE = 4
+AHEAD_DISTANCE_RATIO = 1.10
+AHEAD_WINDOW_DAYS = 14
+AHEAD_THRESHOLD = 3
+AHEAD_VOLUME_FACTOR = 1.05
+
+RECOVERY_WEEK_RULE = "missed_key_recovery_week"
+ADJUSTMENT_DAYS = 7  # an adjustment rewrites the week after the log that fired it
+
+
+@dataclass
+class AdaptationState:
+    """Per-plan rolling windows, updated one log at a time.
+
+    ``cursor`` is the latest workout date up to which missed key sessions have been
+    counted, so each planned key session is inspected at most once.
+    """
+
+    hard_easy: list[date] = field(default_factory=list)
+    ahead: list[date] = field(default_factory=list)
+    missed_key: list[date] = field(default_factory=list)
+    cursor: date | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "hard_easy": [d.isoformat() for d in self.hard_easy],
+            "ahead": [d.isoformat() for d in self.ahead],
+            "missed_key": [d.isoformat() for d in self.missed_key],
+            "cursor": self.cursor.isoformat() if self.cursor else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> AdaptationState:
+        return cls(
+            hard_easy=[date.fromisoformat(d) for d in data.get("hard_easy", [])],
+            ahead=[date.fromisoformat(d) for d in data.get("ahead", [])],
+            missed_key=[date.fromisoformat(d) for d in data.get("missed_key", [])],
+            cursor=date.fromisoformat(data["cursor"]) if data.get("cursor") else None,
+        )
+
+
+@dataclass
+class LoggedSession:
+    wdate: date
+    wtype: str
+    is_key: bool
+    target_distance_m: int | None
+    actual_distance_m: int | None
+    rpe: int | None
+
+
+@dataclass
+class Adjustment:
+    """Rewrite of planned workouts dated ``start``..``end`` (inclusive)."""
+
+    rule: str
+    start: date
+    end: date
+    volume_factor: float
+    easy_only: bool = False  # recovery: quality sessions become easy runs
+
+
+def adjustment_window(as_of: date) -> tuple[date, date]:
+    return as_of + timedelta(days=1), as_of + timedelta(days=ADJUSTMENT_DAYS)
+
+
+def replayed_adjustment(rule: str, event_date: date, volume_factor: float) -> Adjustment:
+    """The adjustment an adaptation event recorded, for re-applying it to regenerated workouts."""
+    return Adjustment(rule, *adjustment_window(event_date), volume_factor, easy_only=rule == RECOVERY_WEEK_RULE)
+
+
+def _prune(window: list[date], days: int) -> list[date]:
+    """Keep the dates within ``days`` of the newest one.
+
+    Windows follow workout dates, not today, so a back-filled batch of older logs
+    is counted like the same logs arriving on time.
     """
-    return []
+    if not window:
+        return window
+    oldest = max(window) - timedelta(days=days)
+    return [d for d in window if d > oldest]
+
+
+def evaluate_and_apply_adaptations(
+    state: AdaptationState, session: LoggedSession, missed_key_dates: Iterable[date], as_of: date
+) -> list[Adjustment]:
+    """Fold one new log into ``state`` and return the adjustments it triggers.
+
+    ``missed_key_dates`` are the unlogged key workouts dated after ``state.cursor``
+    and before ``min(session.wdate, as_of)``; the caller queries only that range. Each rule's
+    window is cleared when it fires so one streak triggers one adjustment.
+    """
+    adjustments: list[Adjustment] = []
+    next_week = adjustment_window(as_of)
+
+    # Only sessions that are already in the past can have been missed.
+    horizon = min(session.wdate, as_of)
+    if state.cursor is None or horizon > state.cursor:
+        state.missed_key.extend(missed_key_dates)
+        state.cursor = horizon
+    state.missed_key = _prune(state.missed_key, MISSED_KEY_WINDOW_DAYS)
+
+    if session.wtype == "easy" and session.rpe is not None and session.rpe >= HARD_RPE:
+        state.hard_easy.append(session.wdate)
+    state.hard_easy = _prune(state.hard_easy, HARD_EASY_WINDOW_DAYS)
+
+    if (
+        session.wtype in ("easy", "long")
+        and session.rpe is not None
+        and session.rpe <= AHEAD_MAX_RPE
+        and session.target_distance_m
+        and (session.actual_distance_m or 0) >= session.target_distance_m * AHEAD_DISTANCE_RATIO
+    ):
+        state.ahead.append(session.wdate)
+    state.ahead = _prune(state.ahead, AHEAD_WINDOW_DAYS)
+
+    if len(state.missed_key) >= MISSED_KEY_THRESHOLD:
+        adjustments.append(Adjustment(RECOVERY_WEEK_RULE, *next_week, RECOVERY_VOLUME_FACTOR, easy_only=True))
+        state.missed_key.clear()
+        # A recovery week supersedes any progression or trim for the same days
+        state.ahead.clear()
+        state.hard_easy.clear()
+    if len(state.hard_easy) >= HARD_EASY_THRESHOLD:
+        adjustments.append(Adjustment("hard_easy_runs_reduce_volume", *next_week, HARD_EASY_VOLUME_FACTOR))
+        state.hard_easy.clear()
+        state.ahead.clear()
+    if len(state.ahead) >= AHEAD_THRESHOLD:
+        adjustments.append(Adjustment("ahead_of_schedule_progress", *next_week, AHEAD_VOLUME_FACTOR))
+        state.ahead.clear()
+    return adjustments
+
 
+def adjusted_workout(workout: dict, adjustment: Adjustment) -> dict:
+    """Return the new values for one planned workout (keys as in ``WorkoutSpec``)."""
+    out = dict(workout)
+    if out.get("target_distance_m") is not None:
+        out["target_distance_m"] = int(out["target_distance_m"] * adjustment.volume_factor)
+    if adjustment.easy_only and out.get("wtype") in ("tempo", "interval"):
+        out.update(wtype="easy", target_zone="easy", description="Recovery run", is_key=False)
+    return out
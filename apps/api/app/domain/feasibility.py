@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import math
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import date
-from typing import Optional
+
+MAX_WEEKS_NEEDED = 200
 
 
 @dataclass
@@ -12,19 +15,67 @@ class FeasibilityResult:
     tradeoffs: list[dict]
 
 
+@dataclass
+class FeasibilitySurface:
+    distance_m: int
+    weeks_needed: int
+    best_case_time_sec: int
+    feasible: list[list[bool]]  # [date index][time index]
+
+
 def _weeks_between(start: date, end: date) -> int:
     return max(0, (end - start).days // 7)
 
 
+def _start_weekly_volume(comfortable_distance_m: int) -> float:
+    return max(comfortable_distance_m * 3.0, 10_000)  # meters
+
+
+def _target_weekly_volume(goal_distance_m: int) -> float:
+    target_long_run = goal_distance_m * 0.7 if goal_distance_m >= 21_097 else goal_distance_m * 0.5
+    # Assume need weekly volume ~ 5-6x long run
+    return max(target_long_run * 3.0, goal_distance_m * 2.5)
+
+
+def _weeks_to_volume(start_vol: float, target_vol: float, growth: float) -> int:
+    """Smallest n with start_vol * (1 + growth)^n >= target_vol, capped at MAX_WEEKS_NEEDED.
+
+    Solved with a logarithm; the neighbouring integers are checked so float error
+    at exact boundaries cannot shift the answer by a week.
+    """
+    if start_vol >= target_vol:
+        return 0
+    if growth <= 0:
+        return MAX_WEEKS_NEEDED
+    factor = 1 + growth
+    n = max(1, math.ceil(math.log(target_vol / start_vol) / math.log(factor)))
+    if start_vol * factor ** (n - 1) >= target_vol:
+        n -= 1
+    elif start_vol * factor**n < target_vol:
+        n += 1
+    return min(n, MAX_WEEKS_NEEDED)
+
+
+def _best_case_time(
+    comfortable_time_sec: int, comfortable_distance_m: int, goal_distance_m: int, riegel_k: float | None = None
+) -> int:
+    from .projection import riegel_predict
+
+    predicted = riegel_predict(comfortable_time_sec, comfortable_distance_m, goal_distance_m, k=riegel_k)
+    # Allow 5% improvement over naive Riegel (with training)
+    return int(predicted * 0.95)
+
+
 def assess_feasibility(
     *,
     today: date,
     target_date: date,
     goal_distance_m: int,
-    target_time_sec: Optional[int],
+    target_time_sec: int | None,
     comfortable_distance_m: int,
     comfortable_time_sec: int,
     weekly_volume_cap: float = 0.10,
+    riegel_k: float | None = None,
 ) -> FeasibilityResult:
     """Simple deterministic feasibility check per MVP guardrails.
 
@@ -32,34 +83,24 @@ def assess_feasibility(
     - Cap weekly growth at weekly_volume_cap.
     - Long run <= 35% of weekly volume.
     - If time target provided, compare to Riegel prediction and allow modest improvement.
+      ``riegel_k`` is the runner's fitted exponent, if any; otherwise the global default applies.
     """
-    from .projection import riegel_predict
-
     reasons: list[str] = []
     tradeoffs: list[dict] = []
     weeks_avail = _weeks_between(today, target_date)
     if weeks_avail < 4:
         reasons.append("Less than 4 weeks available")
 
-    start_weekly_vol = max(comfortable_distance_m * 3.0, 10_000)  # meters
-    target_long_run = goal_distance_m * 0.7 if goal_distance_m >= 21_097 else goal_distance_m * 0.5
-    # Assume need weekly volume ~ 5-6x long run
-    target_weekly_vol = max(target_long_run * 3.0, goal_distance_m * 2.5)
-
     # Compute weeks needed to reach target volume under cap
-    weeks_needed = 0
-    vol = start_weekly_vol
-    while vol < target_weekly_vol and weeks_needed < 200:
-        vol *= (1 + weekly_volume_cap)
-        weeks_needed += 1
+    weeks_needed = _weeks_to_volume(
+        _start_weekly_volume(comfortable_distance_m), _target_weekly_volume(goal_distance_m), weekly_volume_cap
+    )
 
     # Time feasibility
     time_feasible = True
     time_relax_sec = 0
     if target_time_sec:
-        predicted = riegel_predict(comfortable_time_sec, comfortable_distance_m, goal_distance_m)
-        # Allow 5% improvement over naive Riegel (with training)
-        best_case = int(predicted * 0.95)
+        best_case = _best_case_time(comfortable_time_sec, comfortable_distance_m, goal_distance_m, riegel_k)
         if target_time_sec < best_case:
             time_feasible = False
             time_relax_sec = best_case - target_time_sec
@@ -82,3 +123,37 @@ def assess_feasibility(
 
     return FeasibilityResult(feasible=feasible, reasons=reasons, tradeoffs=tradeoffs)
 
+
+def sweep_feasibility(
+    *,
+    today: date,
+    target_dates: Sequence[date],
+    target_times_sec: Sequence[int | None],
+    goal_distances_m: Sequence[int],
+    comfortable_distance_m: int,
+    comfortable_time_sec: int,
+    weekly_volume_cap: float = 0.10,
+    riegel_k: float | None = None,
+) -> list[FeasibilitySurface]:
+    """Evaluate ``assess_feasibility`` over a dates x times grid for each distance.
+
+    Volume and time limits only depend on the distance, and the available weeks
+    only on the date, so each is computed once and the grid is a comparison.
+    """
+    start_vol = _start_weekly_volume(comfortable_distance_m)
+    weeks_avail = [_weeks_between(today, d) for d in target_dates]
+    surfaces: list[FeasibilitySurface] = []
+    for distance_m in goal_distances_m:
+        weeks_needed = _weeks_to_volume(start_vol, _target_weekly_volume(distance_m), weekly_volume_cap)
+        best_case = _best_case_time(comfortable_time_sec, comfortable_distance_m, distance_m, riegel_k)
+        time_ok = [not t or t >= best_case for t in target_times_sec]
+        feasible = [
+            [ok and weeks >= 4 and weeks_needed <= weeks for ok in time_ok]
+            for weeks in weeks_avail
+        ]
+        surfaces.append(
+            FeasibilitySurface(
+                distance_m=distance_m, weeks_needed=weeks_needed, best_case_time_sec=best_case, feasible=feasible
+            )
+        )
+    return surfaces
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date
+
+from .planner import WorkoutSpec
+
+
+# Compared when matching a stored workout to its regenerated spec; wdate is the match key.
+SPEC_FIELDS = ("wtype", "target_distance_m", "target_duration_sec", "target_zone", "description", "is_key")
+
+
+@dataclass
+class PlanDiff:
+    inserts: list[WorkoutSpec] = field(default_factory=list)
+    updates: list[tuple[str, WorkoutSpec]] = field(default_factory=list)
+    deletes: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserts or self.updates or self.deletes)
+
+
+def diff_workouts(existing: Iterable[tuple[str, WorkoutSpec]], specs: Iterable[WorkoutSpec]) -> PlanDiff:
+    """Row-level changes turning ``existing`` (id, spec) pairs into ``specs``.
+
+    Workouts are matched by date, in order within a date, so a regenerated plan on
+    the same weekly grid becomes in-place updates; only rows whose fields differ
+    are touched.
+    """
+    old: dict[date, list[tuple[str, WorkoutSpec]]] = defaultdict(list)
+    for wid, spec in existing:
+        old[spec.wdate].append((wid, spec))
+    new: dict[date, list[WorkoutSpec]] = defaultdict(list)
+    for spec in specs:
+        new[spec.wdate].append(spec)
+
+    diff = PlanDiff()
+    for day in sorted(old.keys() | new.keys()):
+        before, after = old.get(day, []), new.get(day, [])
+        for (wid, current), spec in zip(before, after):
+            if any(getattr(current, f) != getattr(spec, f) for f in SPEC_FIELDS):
+                diff.updates.append((wid, spec))
+            else:
+                diff.unchanged += 1
+        diff.inserts.extend(after[len(before):])
+        diff.deletes.extend(wid for wid, _ in before[len(after):])
+    return diff
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import List, Optional
 
 
 @dataclass
@@ -17,9 +17,9 @@ class PlanSpec:
 class WorkoutSpec:
     wdate: date
     wtype: str
-    target_distance_m: Optional[int]
-    target_duration_sec: Optional[int]
-    target_zone: Optional[str]
+    target_distance_m: int | None
+    target_duration_sec: int | None
+    target_zone: str | None
     description: str
     is_key: bool
 
@@ -28,13 +28,34 @@ def _weeks_between(start: date, end: date) -> int:
     return max(1, (end - start).days // 7)
 
 
-def _insert_cutbacks(weekly_volumes: List[float]) -> List[float]:
-    out: List[float] = []
-    for i, v in enumerate(weekly_volumes):
-        out.append(v)
-        if (i + 1) % 3 == 0 and i + 1 < len(weekly_volumes):
-            out.append(max(v * 0.8, 0))
-    return out[: len(weekly_volumes)]
+def _weekly_volumes(start_weekly_vol: float, cap_growth: float, weeks: int) -> list[float]:
+    """Weekly volumes grown under the cap, with every fourth week a cutback.
+
+    Cutback weeks repeat 80% of the preceding week and growth resumes afterwards,
+    so week ``j`` maps onto growth step ``3 * (j // 4) + min(j % 4, 2)``.
+    """
+    factor = 1 + cap_growth
+    growth: list[float] = []
+    v = start_weekly_vol
+    for _ in range(weeks):
+        growth.append(v)
+        v = v * factor
+    vols: list[float] = []
+    for j in range(weeks):
+        g, r = divmod(j, 4)
+        if r < 3:
+            vols.append(growth[3 * g + r])
+        else:
+            vols.append(max(growth[3 * g + 2] * 0.8, 0))
+    return vols
+
+
+def _week_distances(week_vol: float, goal_distance_m: int) -> tuple[int, int, int, int]:
+    """Split a week's volume into (easy, quality, easy, long) target distances."""
+    long_run = min(goal_distance_m * 0.35, week_vol * 0.35)
+    quality = min(week_vol * 0.25, long_run * 0.8)
+    easy_total = max(0.0, week_vol - long_run - quality)
+    return int(easy_total * 0.4), int(quality), int(easy_total * 0.6), int(long_run)
 
 
 def generate_plan(
@@ -43,25 +64,17 @@ def generate_plan(
     start_weekly_vol: float,
     cap_growth: float,
     spec: PlanSpec,
-) -> List[WorkoutSpec]:
+) -> list[WorkoutSpec]:
     weeks = _weeks_between(spec.start_date, spec.end_date)
     # Build weekly volumes respecting cap and insert cutbacks
-    vols: List[float] = []
-    v = start_weekly_vol
-    for _ in range(weeks):
-        vols.append(v)
-        v = v * (1 + cap_growth)
-    vols = _insert_cutbacks(vols)
+    vols = _weekly_volumes(start_weekly_vol, cap_growth, weeks)
 
     # Simple weekly templates: 4 days run: Mon Easy, Wed Quality, Fri Easy, Sun Long
     weekday_offsets = [0, 2, 4, 6]  # Mon, Wed, Fri, Sun
-    workouts: List[WorkoutSpec] = []
+    workouts: list[WorkoutSpec] = []
     cur = spec.start_date
     for w in range(weeks):
-        week_vol = vols[w]
-        long_run = min(goal_distance_m * 0.35, week_vol * 0.35)
-        quality = min(week_vol * 0.25, long_run * 0.8)
-        easy_total = max(0.0, week_vol - long_run - quality)
+        easy_1, quality, easy_2, long_run = _week_distances(vols[w], goal_distance_m)
 
         days = [cur + timedelta(days=o) for o in weekday_offsets]
         # Easy
@@ -69,7 +82,7 @@ def generate_plan(
             WorkoutSpec(
                 wdate=days[0],
                 wtype="easy",
-                target_distance_m=int(easy_total * 0.4),
+                target_distance_m=easy_1,
                 target_duration_sec=None,
                 target_zone="easy",
                 description="Easy run",
@@ -82,7 +95,7 @@ def generate_plan(
             WorkoutSpec(
                 wdate=days[1],
                 wtype=wtype,
-                target_distance_m=int(quality),
+                target_distance_m=quality,
                 target_duration_sec=None,
                 target_zone="threshold" if wtype == "tempo" else "interval",
                 description="Quality session",
@@ -94,7 +107,7 @@ def generate_plan(
             WorkoutSpec(
                 wdate=days[2],
                 wtype="easy",
-                target_distance_m=int(easy_total * 0.6),
+                target_distance_m=easy_2,
                 target_duration_sec=None,
                 target_zone="easy",
                 description="Easy run",
@@ -106,7 +119,7 @@ def generate_plan(
             WorkoutSpec(
                 wdate=days[3],
                 wtype="long",
-                target_distance_m=int(long_run),
+                target_distance_m=long_run,
                 target_duration_sec=None,
                 target_zone="aerobic",
                 description="Long run",
@@ -118,3 +131,146 @@ def generate_plan(
     # Ensure no back-to-back intensity: our template already spaces them.
     return workouts
 
+
+# Cutbacks repeat every four weeks and quality alternates every two, so
+# regeneration restarts on a four-week boundary to keep both where they were.
+_BLOCK_WEEKS = 4
+
+
+def regenerate_from(
+    *,
+    plan_start: date,
+    plan_end: date,
+    from_date: date,
+    goal_distance_m: int,
+    start_weekly_vol: float,
+    cap_growth: float,
+) -> list[WorkoutSpec]:
+    """Workouts dated ``from_date`` onwards for an existing plan, from a new base volume.
+
+    Generation restarts at the beginning of the plan's training block containing
+    ``from_date`` so the weekly grid lines up with the rows already stored; only
+    days from ``from_date`` on are returned.
+    """
+    weeks_in = max(0, (from_date - plan_start).days // 7)
+    block_start = plan_start + timedelta(weeks=weeks_in - weeks_in % _BLOCK_WEEKS)
+    if block_start >= plan_end:
+        return []
+    spec = PlanSpec(start_date=block_start, end_date=plan_end, running_days_per_week=4, phases={})
+    specs = generate_plan(
+        goal_distance_m=goal_distance_m, start_weekly_vol=start_weekly_vol, cap_growth=cap_growth, spec=spec
+    )
+    return [w for w in specs if w.wdate >= from_date]
+
+
+# --- Batch generation -------------------------------------------------------
+#
+# The weekly template is fixed, so every column except dates and distances is a
+# repetition of a two-week pattern (quality alternates tempo/interval). Dates only
+# depend on (start_date, weeks) and distances on (goal, start volume, cap, weeks),
+# which lets a batch share both curves across plans with the same inputs.
+
+_WEEKDAY_OFFSETS = (0, 2, 4, 6)  # Mon, Wed, Fri, Sun
+_TEMPLATE_WTYPE = ("easy", "tempo", "easy", "long", "easy", "interval", "easy", "long")
+_TEMPLATE_ZONE = ("easy", "threshold", "easy", "aerobic", "easy", "interval", "easy", "aerobic")
+_TEMPLATE_DESCRIPTION = ("Easy run", "Quality session", "Easy run", "Long run") * 2
+_TEMPLATE_IS_KEY = (False, True, False, True) * 2
+
+
+@dataclass
+class PlanRequest:
+    goal_distance_m: int
+    start_weekly_vol: float
+    cap_growth: float
+    start_date: date
+    end_date: date
+
+
+@dataclass
+class WorkoutBatch:
+    """Columnar workouts for many plans.
+
+    Plan ``i`` owns rows ``offsets[i]:offsets[i + 1]``. ``target_duration_sec`` is not
+    stored because the template never sets it.
+    """
+
+    offsets: list[int]
+    wdate: list[date]
+    wtype: list[str]
+    target_distance_m: list[int]
+    target_zone: list[str]
+    description: list[str]
+    is_key: list[bool]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def specs(self, i: int) -> list[WorkoutSpec]:
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return [
+            WorkoutSpec(
+                wdate=self.wdate[j],
+                wtype=self.wtype[j],
+                target_distance_m=self.target_distance_m[j],
+                target_duration_sec=None,
+                target_zone=self.target_zone[j],
+                description=self.description[j],
+                is_key=self.is_key[j],
+            )
+            for j in range(lo, hi)
+        ]
+
+
+def _repeat(template: tuple, n: int) -> list:
+    reps, rem = divmod(n, len(template))
+    return list(template * reps + template[:rem])
+
+
+def generate_plan_batch(requests: Iterable[PlanRequest]) -> WorkoutBatch:
+    """Generate many plans at once; plan ``i`` equals ``generate_plan`` for request ``i``."""
+    batch = WorkoutBatch(offsets=[0], wdate=[], wtype=[], target_distance_m=[], target_zone=[], description=[], is_key=[])
+    day_deltas: list[timedelta] = []
+    distance_curves: dict[tuple, list[int]] = {}
+    date_curves: dict[tuple, list[date]] = {}
+    template_columns: dict[int, tuple[list, list, list, list]] = {}
+
+    for req in requests:
+        weeks = _weeks_between(req.start_date, req.end_date)
+        n = 4 * weeks
+
+        curve_key = (req.goal_distance_m, req.start_weekly_vol, req.cap_growth, weeks)
+        distances = distance_curves.get(curve_key)
+        if distances is None:
+            distances = []
+            for vol in _weekly_volumes(req.start_weekly_vol, req.cap_growth, weeks):
+                distances.extend(_week_distances(vol, req.goal_distance_m))
+            distance_curves[curve_key] = distances
+
+        date_key = (req.start_date, weeks)
+        dates = date_curves.get(date_key)
+        if dates is None:
+            while len(day_deltas) < n:
+                week = len(day_deltas) // 4
+                day_deltas.extend(timedelta(days=7 * week + o) for o in _WEEKDAY_OFFSETS)
+            dates = [req.start_date + d for d in day_deltas[:n]]
+            date_curves[date_key] = dates
+
+        columns = template_columns.get(n)
+        if columns is None:
+            columns = (
+                _repeat(_TEMPLATE_WTYPE, n),
+                _repeat(_TEMPLATE_ZONE, n),
+                _repeat(_TEMPLATE_DESCRIPTION, n),
+                _repeat(_TEMPLATE_IS_KEY, n),
+            )
+            template_columns[n] = columns
+
+        batch.wdate.extend(dates)
+        batch.target_distance_m.extend(distances)
+        batch.wtype.extend(columns[0])
+        batch.target_zone.extend(columns[1])
+        batch.description.extend(columns[2])
+        batch.is_key.extend(columns[3])
+        batch.offsets.append(batch.offsets[-1] + n)
+
+    return batch
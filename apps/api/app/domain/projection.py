@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import math
+from collections.abc import Iterable
 from dataclasses import dataclass
 
 from ..config import get_settings
 
 
 DEFAULT_RIEGEL_K = 1.06
+# Fitted exponents outside this band are clamped; real runners sit well inside it.
+RIEGEL_K_BOUNDS = (1.01, 1.15)
+FIT_MIN_SAMPLES = 3
+FIT_MIN_DISTANCE_M = 1000
+# Minimum variance of log-distance before the slope is trusted (~10% spread).
+FIT_MIN_LOG_VARIANCE = 0.01
 
 
 @dataclass
@@ -25,3 +33,60 @@ def riegel_predict(t1_sec: int, d1_m: int, d2_m: int, k: float | None = None) ->
     t2 = float(t1_sec) * (float(d2_m) / float(d1_m)) ** k_eff
     return max(1, int(round(t2)))
 
+
+
+@dataclass
+class RiegelFit:
+    """Running sufficient statistics for log(T) = log(a) + k * log(D).
+
+    ``add`` folds in one (distance, time) pair in O(1); ``exponent`` solves the
+    least-squares slope from the sums, so no history has to be rescanned.
+    """
+
+    n: int = 0
+    sum_x: float = 0.0
+    sum_y: float = 0.0
+    sum_xx: float = 0.0
+    sum_xy: float = 0.0
+
+    @staticmethod
+    def accepts(distance_m: int, time_sec: int) -> bool:
+        return distance_m >= FIT_MIN_DISTANCE_M and time_sec > 0
+
+    def add(self, distance_m: int, time_sec: int) -> bool:
+        if not self.accepts(distance_m, time_sec):
+            return False
+        x = math.log(distance_m)
+        y = math.log(time_sec)
+        self.n += 1
+        self.sum_x += x
+        self.sum_y += y
+        self.sum_xx += x * x
+        self.sum_xy += x * y
+        return True
+
+    def merge(self, other: RiegelFit) -> None:
+        """Fold in sums accumulated elsewhere (e.g. a batch of logs)."""
+        self.n += other.n
+        self.sum_x += other.sum_x
+        self.sum_y += other.sum_y
+        self.sum_xx += other.sum_xx
+        self.sum_xy += other.sum_xy
+
+    def exponent(self) -> float | None:
+        if self.n < FIT_MIN_SAMPLES:
+            return None
+        var_x = self.sum_xx / self.n - (self.sum_x / self.n) ** 2
+        if var_x < FIT_MIN_LOG_VARIANCE:
+            return None
+        cov_xy = self.sum_xy / self.n - (self.sum_x / self.n) * (self.sum_y / self.n)
+        lo, hi = RIEGEL_K_BOUNDS
+        return min(hi, max(lo, cov_xy / var_x))
+
+
+def fit_riegel(pairs: Iterable[tuple[int, int]]) -> RiegelFit:
+    """Fit over a full history of (distance_m, time_sec) pairs, e.g. for a backfill."""
+    fit = RiegelFit()
+    for distance_m, time_sec in pairs:
+        fit.add(distance_m, time_sec)
+    return fit
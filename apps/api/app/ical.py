@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+PRODID = "-//NRA//Training Plan//EN"
+# Hint for subscribed clients; most poll on their own schedule regardless.
+REFRESH_INTERVAL = "PT1H"
+CALENDAR_TAIL = b"END:VCALENDAR\r\n"
+
+_WTYPE_LABELS = {
+    "easy": "Easy run",
+    "long": "Long run",
+    "tempo": "Tempo run",
+    "interval": "Intervals",
+    "cross": "Cross-training",
+}
+
+
+def _escape(text: str) -> str:
+    # RFC 5545 3.3.11 TEXT
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def _line(content: str) -> bytes:
+    """One content line, folded at 75 octets without splitting a UTF-8 sequence."""
+    raw = content.encode()
+    if len(raw) <= 75:
+        return raw + b"\r\n"
+    out, current, limit = [], b"", 75
+    for ch in content:
+        enc = ch.encode()
+        if len(current) + len(enc) > limit:
+            out.append(current)
+            current, limit = b"", 74  # continuation lines start with a space
+        current += enc
+    out.append(current)
+    return b"\r\n ".join(out) + b"\r\n"
+
+
+def _date(d: date) -> str:
+    return d.strftime("%Y%m%d")
+
+
+def _timestamp(dt: datetime) -> str:
+    return dt.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+def calendar_head(name: str) -> bytes:
+    return b"".join(
+        _line(line)
+        for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{_escape(name)}",
+            f"REFRESH-INTERVAL;VALUE=DURATION:{REFRESH_INTERVAL}",
+            f"X-PUBLISHED-TTL:{REFRESH_INTERVAL}",
+        )
+    )
+
+
+def _summary(row: Any) -> str:
+    label = _WTYPE_LABELS.get(row.wtype, row.wtype.capitalize())
+    if row.target_distance_m:
+        return f"{label} · {row.target_distance_m / 1000:.1f} km"
+    if row.target_duration_sec:
+        return f"{label} · {round(row.target_duration_sec / 60)} min"
+    return label
+
+
+def vevents(rows: Iterable[Any], dtstamp: datetime, sequence: int) -> bytes:
+    """All-day VEVENTs for workout rows selected as ``WORKOUT_COLUMNS``.
+
+    ``dtstamp`` and ``sequence`` come from the plan (creation time and version) so
+    the same plan version always renders to the same bytes. Rest days are left out.
+    """
+    stamp = _timestamp(dtstamp)
+    out = []
+    for row in rows:
+        if row.wtype == "rest":
+            continue
+        details = [row.description or ""]
+        if row.target_zone:
+            details.append(f"Zone: {row.target_zone}")
+        if row.is_key:
+            details.append("Key session")
+        description = "\n".join(d for d in details if d)
+        out.append(
+            b"".join(
+                _line(line)
+                for line in (
+                    "BEGIN:VEVENT",
+                    f"UID:{row.id}@nra",
+                    f"DTSTAMP:{stamp}",
+                    f"SEQUENCE:{sequence}",
+                    f"DTSTART;VALUE=DATE:{_date(row.wdate)}",
+                    f"DTEND;VALUE=DATE:{_date(row.wdate + timedelta(days=1))}",
+                    f"SUMMARY:{_escape(_summary(row))}",
+                    f"DESCRIPTION:{_escape(description)}",
+                    "TRANSP:TRANSPARENT",
+                    "END:VEVENT",
+                )
+            )
+        )
+    return b"".join(out)
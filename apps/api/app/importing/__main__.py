@@ -0,0 +1,51 @@
+"""Import a CSV/GPX/TCX export for one user without going through the queue.
+
+    python -m app.importing runs.csv --email runner@example.com
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from sqlalchemy import select
+
+from ..cache import PLAN_SCOPE, get_response_cache
+from ..db import session_scope
+from ..models import User
+from .loader import ImportStats, import_runs
+from .parsers import FORMATS, detect_format, parse_runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    t0 = time.perf_counter()
+
+    def progress(stats: ImportStats) -> None:
+        rate = (stats.parsed + stats.skipped) / max(time.perf_counter() - t0, 1e-9)
+        print(
+            f"\r{stats.parsed} runs ({stats.matched} matched, {stats.unplanned} unplanned, "
+            f"{stats.duplicates} duplicates, {stats.skipped} skipped) {rate:,.0f}/s",
+            end="",
+            file=sys.stderr,
+        )
+
+    with session_scope() as db:
+        user_id = db.scalar(select(User.id).where(User.email == args.email))
+        if user_id is None:
+            sys.exit(f"No user with email {args.email}")
+        with open(args.path, "rb") as fh:
+            stats = import_runs(db, user_id, parse_runs(fh, fmt), source=f"import:{fmt}", progress=progress)
+    print(file=sys.stderr)
+    if stats.matched:
+        get_response_cache().invalidate(PLAN_SCOPE, user_id)
+
+
+if __name__ == "__main__":
+    main()
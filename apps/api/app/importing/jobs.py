@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+from dataclasses import asdict
+
+from rq import get_current_job
+
+from ..cache import PLAN_SCOPE, get_response_cache
+from ..db import session_scope
+from .loader import ImportStats, import_runs
+from .parsers import parse_runs
+
+
+def run_import(user_id: str, path: str, fmt: str) -> dict:
+    """rq entry point: import a spooled upload, publishing progress in ``job.meta``."""
+    job = get_current_job()
+
+    def progress(stats: ImportStats) -> None:
+        if job is not None:
+            job.meta.update(asdict(stats))
+            job.save_meta()
+
+    try:
+        with open(path, "rb") as fh, session_scope() as db:
+            stats = import_runs(db, user_id, parse_runs(fh, fmt), source=f"import:{fmt}", progress=progress)
+    finally:
+        os.unlink(path)
+    if stats.matched:
+        get_response_cache().invalidate(PLAN_SCOPE, user_id)
+    return asdict(stats)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, cast
+
+from sqlalchemy import select, text, update
+from sqlalchemy.orm import Session
+
+from ..current_state import fold_riegel_fit
+from ..domain.projection import FIT_MIN_DISTANCE_M, RiegelFit
+from ..models import Plan, UserCurrentState, Workout
+from .parsers import ImportedRun
+
+if TYPE_CHECKING:
+    import psycopg
+
+
+STAGE_SQL = (
+    "CREATE TEMP TABLE import_stage "
+    "(workout_id uuid, run_date date, actual_distance_m integer, actual_time_sec integer, rpe integer, notes text)"
+)
+COPY_SQL = "COPY import_stage (workout_id, run_date, actual_distance_m, actual_time_sec, rpe, notes) FROM STDIN"
+# A run the user already has a log for (same date, distance and time) was imported
+# before, so re-importing an export (or a repeat within one) adds nothing. The
+# Riegel sums come from the inserted rows only, with RiegelFit.accepts' bounds.
+INSERT_SQL = text(
+    """
+    WITH inserted AS (
+        INSERT INTO session_logs (user_id, workout_id, run_date, actual_distance_m, actual_time_sec, rpe, notes, source)
+        SELECT DISTINCT ON (s.run_date, s.actual_distance_m, s.actual_time_sec)
+               CAST(:user_id AS uuid), s.workout_id, s.run_date, s.actual_distance_m, s.actual_time_sec,
+               s.rpe, s.notes, :source
+        FROM import_stage s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM session_logs l
+            WHERE l.user_id = CAST(:user_id AS uuid)
+              AND l.run_date = s.run_date
+              AND l.actual_distance_m IS NOT DISTINCT FROM s.actual_distance_m
+              AND l.actual_time_sec IS NOT DISTINCT FROM s.actual_time_sec
+        )
+        ORDER BY s.run_date, s.actual_distance_m, s.actual_time_sec
+        RETURNING workout_id, actual_distance_m AS d, actual_time_sec AS t
+    )
+    SELECT count(*) FILTER (WHERE workout_id IS NOT NULL),
+           count(*) FILTER (WHERE workout_id IS NULL),
+           count(*) FILTER (WHERE d >= :min_d AND t > 0),
+           coalesce(sum(ln(d)) FILTER (WHERE d >= :min_d AND t > 0), 0),
+           coalesce(sum(ln(t)) FILTER (WHERE d >= :min_d AND t > 0), 0),
+           coalesce(sum(ln(d) ^ 2) FILTER (WHERE d >= :min_d AND t > 0), 0),
+           coalesce(sum(ln(d) * ln(t)) FILTER (WHERE d >= :min_d AND t > 0), 0)
+    FROM inserted
+    """
+)
+# Progress callbacks fire every this many parsed records.
+PROGRESS_EVERY = 5000
+
+
+@dataclass
+class ImportStats:
+    parsed: int = 0
+    matched: int = 0
+    unplanned: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+
+
+def _planned_by_date(db: Session, user_id: str) -> tuple[str | None, dict[date, str]]:
+    """The active plan and its first workout per date; bounded by plan length, not history."""
+    plan_id = db.scalar(
+        select(Plan.id)
+        .join(UserCurrentState, UserCurrentState.plan_id == Plan.id)
+        .where(UserCurrentState.user_id == user_id, Plan.status == "active")
+    )
+    if plan_id is None:
+        return None, {}
+    by_date: dict[date, str] = {}
+    for wid, wdate in db.execute(
+        select(Workout.id, Workout.wdate).where(Workout.plan_id == plan_id).order_by(Workout.wdate, Workout.id)
+    ):
+        by_date.setdefault(wdate, wid)
+    return plan_id, by_date
+
+
+def import_runs(
+    db: Session,
+    user_id: str,
+    runs: Iterable[ImportedRun | None],
+    source: str,
+    progress: Callable[[ImportStats], None] | None = None,
+) -> ImportStats:
+    """COPY parsed runs into ``session_logs`` as they stream in; the caller commits.
+
+    Runs on a date with a workout in the user's active plan are attached to it,
+    the rest are stored as unplanned, and runs the user already has a log for
+    are counted as duplicates. Memory is bounded by the active plan, not by the
+    size of the upload. Imported runs feed the Riegel fit but not the
+    adaptation engine, which reasons about recent training only.
+    """
+    stats = ImportStats()
+    plan_id, planned = _planned_by_date(db, user_id)
+    # One long COPY; DB_STATEMENT_TIMEOUT_MS is meant for request queries
+    db.execute(text("SET LOCAL statement_timeout = 0"))
+    db.execute(text(STAGE_SQL))
+    raw = cast("psycopg.Connection", db.connection().connection.driver_connection)
+    with raw.cursor() as cur, cur.copy(COPY_SQL) as copy:
+        for run in runs:
+            if run is None:
+                stats.skipped += 1
+            else:
+                stats.parsed += 1
+                copy.write_row(
+                    (planned.get(run.run_date), run.run_date, run.distance_m, run.time_sec, run.rpe, run.notes)
+                )
+            if progress and (stats.parsed + stats.skipped) % PROGRESS_EVERY == 0:
+                progress(stats)
+    matched, unplanned, *sums = db.execute(
+        INSERT_SQL, {"user_id": user_id, "source": source, "min_d": FIT_MIN_DISTANCE_M}
+    ).one()
+    db.execute(text("DROP TABLE import_stage"))
+    stats.matched, stats.unplanned = matched, unplanned
+    stats.duplicates = stats.parsed - matched - unplanned
+    fit = RiegelFit(*sums)
+    if fit.n:
+        fold_riegel_fit(db, user_id, fit)
+    if stats.matched:
+        db.execute(update(Plan).where(Plan.id == plan_id).values(version=Plan.version + 1))
+    if progress:
+        progress(stats)
+    return stats
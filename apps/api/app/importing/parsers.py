@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import math
+import xml.etree.ElementTree as ET
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import PurePath
+from typing import BinaryIO
+
+
+FORMATS = ("csv", "gpx", "tcx")
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ImportedRun:
+    run_date: date
+    distance_m: int | None
+    time_sec: int | None
+    rpe: int | None = None
+    notes: str | None = None
+
+
+def detect_format(filename: str) -> str:
+    fmt = PurePath(filename).suffix.lower().lstrip(".")
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"Unsupported file type {fmt!r}; expected one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def parse_runs(stream: BinaryIO, fmt: str) -> Iterator[ImportedRun | None]:
+    """Stream runs out of an export without reading it whole.
+
+    Yields ``None`` for a record that could not be parsed, so callers can count
+    skipped rows without the parser aborting a long import.
+    """
+    parsers: dict[str, Callable[[BinaryIO], Iterator[ImportedRun | None]]] = {
+        "csv": _parse_csv,
+        "gpx": _parse_gpx,
+        "tcx": _parse_tcx,
+    }
+    if fmt not in parsers:
+        raise ImportFormatError(f"Unsupported format {fmt!r}")
+    return parsers[fmt](stream)
+
+
+# CSV: header names are matched case-insensitively; the first alias present wins.
+_DATE_COLUMNS = ("date", "run_date", "start_time", "activity date")
+_DISTANCE_COLUMNS = (("distance_m", 1.0), ("distance_km", 1000.0), ("distance", 1000.0), ("distance_mi", 1609.344))
+_TIME_COLUMNS = ("time_sec", "duration_sec", "moving time", "elapsed time", "duration", "time")
+_DATE_FORMATS = ("%b %d, %Y, %I:%M:%S %p", "%d/%m/%Y", "%m/%d/%Y %H:%M", "%Y/%m/%d")
+
+
+def _parse_date(value: str) -> date:
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+
+def _parse_duration(value: str) -> int:
+    """Seconds from ``3600``, ``3600.5`` or ``[H:]MM:SS``."""
+    parts = value.strip().split(":")
+    if len(parts) == 1:
+        return round(float(parts[0]))
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return round(seconds)
+
+
+def _parse_csv(stream: BinaryIO) -> Iterator[ImportedRun | None]:
+    reader = csv.reader(codecs.getreader("utf-8-sig")(stream))
+    header = [h.strip().lower() for h in next(reader, [])]
+    cols = {name: i for i, name in enumerate(header)}
+    date_col = next((cols[c] for c in _DATE_COLUMNS if c in cols), None)
+    if date_col is None:
+        raise ImportFormatError(f"CSV needs a date column ({', '.join(_DATE_COLUMNS)})")
+    dist_col = next(((cols[c], scale) for c, scale in _DISTANCE_COLUMNS if c in cols), None)
+    time_col = next((cols[c] for c in _TIME_COLUMNS if c in cols), None)
+    rpe_col = cols.get("rpe")
+    notes_col = next((cols[c] for c in ("notes", "activity name", "name") if c in cols), None)
+
+    def cell(row: list[str], col: int | None) -> str:
+        return row[col].strip() if col is not None and col < len(row) else ""
+
+    for row in reader:
+        if not row:
+            continue
+        try:
+            run_date = _parse_date(cell(row, date_col))
+            distance = cell(row, dist_col[0]) if dist_col else ""
+            duration = cell(row, time_col)
+            rpe = cell(row, rpe_col)
+            yield ImportedRun(
+                run_date=run_date,
+                distance_m=round(float(distance) * dist_col[1]) if dist_col and distance else None,
+                time_sec=_parse_duration(duration) if duration else None,
+                rpe=int(rpe) if rpe and 1 <= int(rpe) <= 10 else None,
+                notes=cell(row, notes_col) or None,
+            )
+        except (ValueError, IndexError):
+            yield None
+
+
+# GPX / TCX: iterparse, detaching each finished record so memory stays flat.
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _iter_records(
+    stream: BinaryIO, record: str, visit: Callable[[ET.Element, list[ET.Element]], None]
+) -> Iterator[ET.Element]:
+    """Yield each completed ``record`` element, then drop it from the tree.
+
+    ``visit`` sees every other finished element with its ancestors, so per-point
+    data can be folded into running totals and discarded before the record ends.
+    """
+    stack: list[ET.Element] = []
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if _local(elem.tag) == record:
+            yield elem
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+        else:
+            visit(elem, stack)
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.strip())
+
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * 6_371_000 * math.asin(math.sqrt(a))
+
+
+class _Track:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.first: datetime | None = None
+        self.last: datetime | None = None
+        self.prev: tuple[float, float] | None = None
+        self.distance = 0.0
+        self.bad = False
+
+
+def _parse_gpx(stream: BinaryIO) -> Iterator[ImportedRun | None]:
+    track = _Track()
+
+    def visit(elem: ET.Element, ancestors: list[ET.Element]) -> None:
+        if _local(elem.tag) != "trkpt":
+            return
+        try:
+            point = (float(elem.attrib["lat"]), float(elem.attrib["lon"]))
+            when = next((_parse_time(c.text) for c in elem if _local(c.tag) == "time"), None)
+        except (KeyError, ValueError):
+            track.bad = True
+            return
+        if track.prev is not None:
+            track.distance += _haversine_m(*track.prev, *point)
+        track.prev = point
+        if when is not None:
+            track.first = track.first or when
+            track.last = when
+        elem.clear()
+        ancestors[-1].remove(elem)
+
+    for _ in _iter_records(stream, "trk", visit):
+        if track.bad or track.first is None or track.last is None:
+            yield None
+        else:
+            yield ImportedRun(
+                run_date=track.first.date(),
+                distance_m=round(track.distance),
+                time_sec=round((track.last - track.first).total_seconds()),
+            )
+        track.reset()
+
+
+class _Activity:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.start: datetime | None = None
+        self.distance = 0.0
+        self.time = 0.0
+        self.bad = False
+
+
+def _parse_tcx(stream: BinaryIO) -> Iterator[ImportedRun | None]:
+    activity = _Activity()
+
+    def visit(elem: ET.Element, ancestors: list[ET.Element]) -> None:
+        name = _local(elem.tag)
+        parent = _local(ancestors[-1].tag) if ancestors else ""
+        try:
+            if name == "Id" and parent == "Activity":
+                activity.start = activity.start or _parse_time(elem.text)
+            elif name == "Lap":
+                activity.start = activity.start or _parse_time(elem.attrib.get("StartTime"))
+            elif name == "DistanceMeters" and parent == "Lap":
+                activity.distance += float(elem.text or 0)
+            elif name == "TotalTimeSeconds" and parent == "Lap":
+                activity.time += float(elem.text or 0)
+        except ValueError:
+            activity.bad = True
+        if name == "Trackpoint":
+            elem.clear()
+            ancestors[-1].remove(elem)
+
+    for _ in _iter_records(stream, "Activity", visit):
+        if activity.bad or activity.start is None:
+            yield None
+        else:
+            yield ImportedRun(
+                run_date=activity.start.date(),
+                distance_m=round(activity.distance),
+                time_sec=round(activity.time),
+            )
+        activity.reset()
@@ -1,19 +1,31 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import get_settings
-from .routers import auth as auth_router
-from .routers import capability as capability_router
-from .routers import goals as goals_router
-from .routers import plans as plans_router
-from .routers import workouts as workouts_router
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
-    app = FastAPI(title="Nat's Running App API", version="0.1.0")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        # Engines are created on first use (app.db); with STARTUP_WARMUP that is
+        # here, before the server accepts connections
+        from .db import dispose_engines
+
+        if settings.startup_warmup:
+            from .warmup import warm_up
+
+            await warm_up(settings)
+        yield
+        await dispose_engines()
+
+    app = FastAPI(title="Nat's Running App API", version="0.1.0", lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_origins,
@@ -26,12 +38,38 @@ def create_app() -> FastAPI:
     def healthz():
         return {"ok": True}
 
-    app.include_router(auth_router.router)
-    app.include_router(capability_router.router)
-    app.include_router(goals_router.router)
-    app.include_router(plans_router.router)
-    app.include_router(workouts_router.router)
-    return app
+    @app.get("/healthz/pool")
+    def pool_stats():
+        from .db import async_pool_metrics, sync_pool_metrics
 
+        return {m.name: m.snapshot() for m in (sync_pool_metrics, async_pool_metrics) if m.pool is not None}
 
-app = create_app()
+    if settings.metrics_enabled:
+        from .db import async_pool_metrics, sync_pool_metrics
+        from .metrics import PROMETHEUS_MEDIA_TYPE, MetricsMiddleware, instrument_engines, render, request_metrics
+
+        instrument_engines()
+        # Added last so it is outermost: its timing covers CORS and every other middleware
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/metrics", include_in_schema=False)
+        def metrics():
+            body = render(request_metrics, (sync_pool_metrics, async_pool_metrics))
+            return Response(body, media_type=PROMETHEUS_MEDIA_TYPE)
+
+    if settings.db_async:
+        from .routers.aio import auth as aio_auth
+        from .routers.aio import capability as aio_capability
+        from .routers.aio import goals as aio_goals
+        from .routers.aio import imports as aio_imports
+        from .routers.aio import plans as aio_plans
+        from .routers.aio import workouts as aio_workouts
+
+        modules = (aio_auth, aio_capability, aio_goals, aio_imports, aio_plans, aio_workouts)
+    else:
+        from .routers import auth, capability, goals, imports, plans, workouts
+
+        modules = (auth, capability, goals, imports, plans, workouts)
+    for module in modules:
+        app.include_router(module.router)
+    return app
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+if TYPE_CHECKING:
+    from .db import PoolMetrics
+
+
+logger = logging.getLogger(__name__)
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Label for requests no route matched (404s, scanners), so paths can't explode the series count.
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Prometheus-style histogram with one series per label tuple."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: dict[tuple[str, ...], list[Any]] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _cumulative(self, counts: list[int]) -> list[tuple[str, int]]:
+        cumulative, running = [], 0
+        for le, count in zip((*map(_num, self.buckets), "+Inf"), counts):
+            running += count
+            cumulative.append((le, running))
+        return cumulative
+
+    def samples(self) -> Iterator[tuple[tuple[str, ...], list[tuple[str, int]], float, int]]:
+        """(labels, cumulative ``le`` buckets, sum, count) per series."""
+        with self._lock:
+            series = [(labels, list(counts), total, n) for labels, (counts, total, n) in self._series.items()]
+        for labels, counts, total, n in sorted(series):
+            yield labels, self._cumulative(counts), total, n
+
+    def sample(self, labels: tuple[str, ...] = ()) -> tuple[list[tuple[str, int]], float, int]:
+        """Cumulative ``le`` buckets, sum and count of one series; zeros if it was never observed."""
+        with self._lock:
+            counts, total, n = self._series.get(labels) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts = list(counts)
+        return self._cumulative(counts), total, n
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_time: float = 0.0
+
+
+# Set by the middleware for the duration of a request. Sync endpoints run in the
+# threadpool with a copy of the request's context, so the same object is updated.
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _current.get()
+
+
+def _roll_up(stats: RequestStats) -> None:
+    # A counter opened inside another (a request inside a benchmark's timed call)
+    # also adds to the enclosing one once it is reset
+    outer = _current.get()
+    if outer is not None:
+        outer.queries += stats.queries
+        outer.db_time += stats.db_time
+
+
+@contextmanager
+def count_queries() -> Iterator[RequestStats]:
+    """Count statements run inside the block (and threads started from it with its context).
+
+    Nested blocks, including ``MetricsMiddleware``'s per-request one, count toward it too.
+    """
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        _roll_up(stats)
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """Declare the most SQL statements an endpoint may run per request.
+
+    Place it under the route decorator. ``MetricsMiddleware`` logs a warning and
+    counts ``nra_http_request_over_query_budget_total`` when a request exceeds it,
+    and the query-budget tests fail on any overrun, which is what catches N+1s.
+    """
+
+    def mark(fn: F) -> F:
+        fn.query_budget = max_queries  # type: ignore[attr-defined]
+        return fn
+
+    return mark
+
+
+def budget_of(endpoint: object) -> int | None:
+    return getattr(endpoint, "query_budget", None)
+
+
+def same_query_budget(endpoint: Callable[..., Any]) -> Callable[[F], F]:
+    """``query_budget`` copied from ``endpoint``, for an async route that runs the same statements."""
+    budget = budget_of(endpoint)
+    if budget is None:
+        raise ValueError(f"{endpoint.__qualname__} declares no query budget")
+    return query_budget(budget)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # type: ignore[no-untyped-def]
+    if context is not None and _current.get() is not None:
+        context._metrics_t0 = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # type: ignore[no-untyped-def]
+    stats = _current.get()
+    t0 = getattr(context, "_metrics_t0", None)
+    if stats is not None and t0 is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - t0
+
+
+def instrument_engines() -> None:
+    """Count statements and cursor time per request on every engine, async ones included."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RequestMetrics:
+    """Per-route latency, DB time and query histograms, status counts and in-flight gauge."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.responses: dict[tuple[str, str, str], int] = {}
+        self.duration = Histogram(LATENCY_BUCKETS)
+        self.db_duration = Histogram(LATENCY_BUCKETS)
+        self.db_queries = Histogram(QUERY_BUCKETS)
+        self.over_budget: dict[tuple[str, str], int] = {}
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+        key = (method, route)
+        counted = (method, route, str(status))
+        with self._lock:
+            self.in_flight -= 1
+            self.responses[counted] = self.responses.get(counted, 0) + 1
+        self.duration.observe(key, elapsed)
+        self.db_duration.observe(key, stats.db_time)
+        self.db_queries.observe(key, stats.queries)
+
+    def response_counts(self) -> list[tuple[tuple[str, str, str], int]]:
+        with self._lock:
+            return sorted(self.responses.items())
+
+    def exceeded_budget(self, method: str, route: str, queries: int, budget: int) -> None:
+        logger.warning("%s %s ran %d SQL statements, over its query budget of %d", method, route, queries, budget)
+        with self._lock:
+            self.over_budget[(method, route)] = self.over_budget.get((method, route), 0) + 1
+
+    def over_budget_counts(self) -> list[tuple[tuple[str, str], int]]:
+        with self._lock:
+            return sorted(self.over_budget.items())
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding ``RequestMetrics``; times the whole response, streamed bodies included."""
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics) -> None:  # type: ignore[no-untyped-def]
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send) -> None:  # type: ignore[no-untyped-def]
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_status(message) -> None:  # type: ignore[no-untyped-def]
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        self.metrics.started()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - t0
+            _current.reset(token)
+            _roll_up(stats)
+            # FastAPI's router leaves the matched route in the scope
+            matched = scope.get("route")
+            route = getattr(matched, "path", UNMATCHED_ROUTE)
+            self.metrics.finished(scope["method"], route, status, elapsed, stats)
+            budget = budget_of(getattr(matched, "endpoint", None))
+            if budget is not None and stats.queries > budget:
+                self.metrics.exceeded_budget(scope["method"], route, stats.queries, budget)
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(names: tuple[str, ...], values: Iterable[str]) -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return ",".join(pairs)
+
+
+def _histogram_lines(
+    name: str, help_text: str, names: tuple[str, ...], samples: Iterable[tuple[tuple[str, ...], list, float, int]]
+) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for values, cumulative, total, count in samples:
+        labels = _labels(names, values)
+        sep = "," if labels else ""
+        lines.extend(f'{name}_bucket{{{labels}{sep}le="{le}"}} {n}' for le, n in cumulative)
+        lines.append(f"{name}_sum{{{labels}}} {total!r}")
+        lines.append(f"{name}_count{{{labels}}} {count}")
+    return lines
+
+
+def render(metrics: RequestMetrics, pools: Iterable[PoolMetrics]) -> str:
+    """Prometheus text exposition of request metrics and connection pool metrics."""
+    route = ("method", "route")
+    lines = [
+        "# HELP nra_http_requests_in_flight Requests currently being served.",
+        "# TYPE nra_http_requests_in_flight gauge",
+        f"nra_http_requests_in_flight {metrics.in_flight}",
+        "# HELP nra_http_responses_total Responses by route and status code.",
+        "# TYPE nra_http_responses_total counter",
+    ]
+    for values, n in metrics.response_counts():
+        lines.append(f"nra_http_responses_total{{{_labels(('method', 'route', 'status'), values)}}} {n}")
+    lines += [
+        "# HELP nra_http_request_over_query_budget_total Requests that ran more SQL statements than their budget.",
+        "# TYPE nra_http_request_over_query_budget_total counter",
+    ]
+    for key, n in metrics.over_budget_counts():
+        lines.append(f"nra_http_request_over_query_budget_total{{{_labels(route, key)}}} {n}")
+    for name, help_text, hist in (
+        ("nra_http_request_duration_seconds", "Time to serve the request, body included.", metrics.duration),
+        ("nra_http_request_db_seconds", "Time in SQL execution while serving the request.", metrics.db_duration),
+        ("nra_http_request_db_queries", "SQL statements executed while serving the request.", metrics.db_queries),
+    ):
+        lines += _histogram_lines(name, help_text, route, hist.samples())
+
+    snapshots = [(m.name, m.snapshot()) for m in pools if m.pool is not None]
+    waits = (((name,), s["checkout_wait_buckets"], s["checkout_wait_sum_sec"], s["checkouts"]) for name, s in snapshots)
+    lines += _histogram_lines("nra_db_pool_checkout_wait_seconds", "Wait for a pooled connection.", ("pool",), waits)
+    for name, kind, stat, help_text in (
+        ("nra_db_pool_timeouts_total", "counter", "timeouts", "Checkouts that hit the pool timeout."),
+        ("nra_db_pool_size", "gauge", "size", "Configured pool size."),
+        ("nra_db_pool_in_use", "gauge", "in_use", "Connections checked out."),
+        ("nra_db_pool_overflow", "gauge", "overflow", "Connections open beyond the pool size."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines.extend(f'{name}{{pool="{pool}"}} {s[stat]}' for pool, s in snapshots if stat in s)
+    return "\n".join(lines) + "\n"
@@ -1,22 +1,21 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import Optional
 
 from sqlalchemy import (
     Boolean,
     CheckConstraint,
     Date,
     DateTime,
+    Float,
     ForeignKey,
     Integer,
     JSON,
     String,
     Text,
-    UniqueConstraint,
     text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .db import Base
@@ -47,7 +46,7 @@ class Goal(Base):
     id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     distance_m: Mapped[int] = mapped_column(Integer, nullable=False)
-    target_time_sec: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    target_time_sec: Mapped[int | None] = mapped_column(Integer, nullable=True)
     target_date: Mapped[date] = mapped_column(Date, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
 
@@ -78,6 +77,8 @@ class Plan(Base):
     start_date: Mapped[date] = mapped_column(Date, nullable=False)
     end_date: Mapped[date] = mapped_column(Date, nullable=False)
     status: Mapped[str] = mapped_column(String, nullable=False)
+    # Bumped on every change visible through the plan's endpoints; part of its ETag
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default=text("1"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
 
     user: Mapped[User] = relationship()
@@ -96,10 +97,10 @@ class Workout(Base):
     plan_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("plans.id", ondelete="CASCADE"), nullable=False)
     wdate: Mapped[date] = mapped_column(Date, nullable=False)
     wtype: Mapped[str] = mapped_column(String, nullable=False)
-    target_distance_m: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    target_duration_sec: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    target_zone: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    target_distance_m: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    target_duration_sec: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    target_zone: Mapped[str | None] = mapped_column(String, nullable=True)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
     is_key: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
     plan: Mapped[Plan] = relationship(back_populates="workouts")
@@ -113,14 +114,20 @@ class SessionLog(Base):
     __tablename__ = "session_logs"
 
     id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, server_default=text("gen_random_uuid()"))
-    workout_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("workouts.id", ondelete="CASCADE"), nullable=False)
-    actual_distance_m: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    actual_time_sec: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    rpe: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # NULL for unplanned runs (e.g. imported history with no workout on that date)
+    workout_id: Mapped[str | None] = mapped_column(
+        UUID(as_uuid=False), ForeignKey("workouts.id", ondelete="CASCADE"), nullable=True
+    )
+    run_date: Mapped[date] = mapped_column(Date, nullable=False)
+    actual_distance_m: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    actual_time_sec: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rpe: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    source: Mapped[str | None] = mapped_column(String, nullable=True)  # e.g. "import:gpx"; NULL = logged in app
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
 
-    workout: Mapped[Workout] = relationship()
+    workout: Mapped[Workout | None] = relationship()
 
     __table_args__ = (
         CheckConstraint("rpe IS NULL OR (rpe BETWEEN 1 AND 10)", name="ck_session_logs_rpe_range"),
@@ -140,6 +147,45 @@ class AdaptationEvent(Base):
     plan: Mapped[Plan] = relationship()
 
 
-# Useful partial unique indexes can be created in migrations; app-level invariant:
-# Only one active plan per goal.
+class UserRiegelFit(Base):
+    """Per-user Riegel exponent fit, kept as running sums updated on each log."""
+
+    __tablename__ = "user_riegel_fits"
+
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    n: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sum_x: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sum_y: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sum_xx: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sum_xy: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    exponent: Mapped[float | None] = mapped_column(Float, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+
+
+class PlanAdaptationState(Base):
+    """Rolling rule windows for a plan's adaptation engine, updated on each log."""
+
+    __tablename__ = "plan_adaptation_states"
+
+    plan_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("plans.id", ondelete="CASCADE"), primary_key=True)
+    state: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+
+
+class UserCurrentState(Base):
+    """Pointers to a user's latest snapshot and active plan/goal, kept by the write paths."""
+
+    __tablename__ = "user_current_state"
+
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    snapshot_id: Mapped[str | None] = mapped_column(
+        UUID(as_uuid=False), ForeignKey("capability_snapshots.id", ondelete="SET NULL"), nullable=True
+    )
+    plan_id: Mapped[str | None] = mapped_column(UUID(as_uuid=False), ForeignKey("plans.id", ondelete="SET NULL"), nullable=True)
+    goal_id: Mapped[str | None] = mapped_column(UUID(as_uuid=False), ForeignKey("goals.id", ondelete="SET NULL"), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+
+
+# Indexes live in the migrations. Only one active plan per goal is enforced by the
+# partial unique index uq_plans_goal_active (0005_hot_path_indexes).
 
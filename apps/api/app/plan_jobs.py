@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from fastapi import HTTPException
+from rq import get_current_job
+
+from .db import session_scope
+from .routers import plans
+
+
+class PlanJobError(Exception):
+    pass
+
+
+def run_plan_generation(user_id: str, goal_id: str, mode: str) -> dict:
+    """rq entry point for ``generate-plan?async=true``.
+
+    Returns the plan id for ``GET /plans/jobs/{id}``; the plan itself is read back
+    through the plan endpoints. Client errors (goal gone, concurrent generation)
+    are kept in ``job.meta["error"]`` so the status endpoint can show the detail.
+    """
+    job = get_current_job()
+    try:
+        with session_scope() as db:
+            plan_id, _, etag = plans.generate_for_goal(db, user_id, goal_id, mode)
+    except HTTPException as exc:
+        if job is not None:
+            job.meta["error"] = exc.detail
+            job.save_meta()
+        raise PlanJobError(exc.detail) from None
+    return {"plan_id": plan_id, "etag": etag}
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from .config import get_settings
+
+
+IMPORTS_QUEUE = "imports"
+PLANS_QUEUE = "plans"
+
+
+@lru_cache
+def get_redis():
+    import redis
+
+    return redis.Redis.from_url(get_settings().redis_url)
+
+
+def get_queue(name: str):
+    """rq queue on the shared Redis; run workers with ``rq worker <name> --url $REDIS_URL``."""
+    from rq import Queue
+
+    return Queue(name, connection=get_redis())
+
+
+def fetch_job(job_id: str, user_id: str):
+    """The rq job if it exists and was enqueued by ``user_id`` (``meta["user_id"]``), else None."""
+    from rq.exceptions import NoSuchJobError
+    from rq.job import Job
+
+    try:
+        job = Job.fetch(job_id, connection=get_redis())
+    except NoSuchJobError:
+        return None
+    return job if job.meta.get("user_id") == user_id else None
@@ -0,0 +1,22 @@
+"""Async counterparts of the routers in ``app.routers`` (enabled with ``DB_ASYNC=1``).
+
+Endpoints take an ``AsyncSession`` and run the sync route logic through
+``AsyncSession.run_sync``, so each statement awaits the async driver instead of
+holding a threadpool thread, while the route bodies stay defined once. ``run_sync``
+runs that logic on the event loop, so only database work and the small amount of
+Python that goes with it belong there: building one plan, diffing a regeneration
+and encoding the response take about a millisecond. Response cache and queue calls
+(Redis) and whole-batch CPU work (``/plans/generate-batch``) run in the threadpool,
+and password hashing in the hashing process pool.
+"""
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...db import get_async_db
+
+
+AsyncDbSession = Annotated[AsyncSession, Depends(get_async_db)]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+from sqlalchemy import select, update
+
+from ...auth.passwords import HashingBusy, hash_password_async, verify_password_async
+from ...metrics import same_query_budget
+from ...models import User
+from ...schemas import RegisterRequest, TokenPair
+from .. import auth as sync_auth
+from ..auth import LoginRequest, _busy, _token_pair
+from . import AsyncDbSession
+
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+@router.post("/register", response_model=TokenPair)
+@same_query_budget(sync_auth.register)
+async def register(payload: RegisterRequest, db: AsyncDbSession):
+    if await db.scalar(select(User.id).where(User.email == str(payload.email))):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    try:
+        password_hash = await hash_password_async(payload.password)
+    except HashingBusy:
+        raise _busy()
+    user = User(
+        email=str(payload.email),
+        password_hash=password_hash,
+        age=payload.age,
+        sex=payload.sex,
+    )
+    db.add(user)
+    await db.commit()
+    return _token_pair(user.id)
+
+
+@router.post("/login", response_model=TokenPair)
+@same_query_budget(sync_auth.login)
+async def login(payload: LoginRequest, db: AsyncDbSession):
+    row = (await db.execute(select(User.id, User.password_hash).where(User.email == str(payload.email)))).first()
+    if not row:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    try:
+        ok, new_hash = await verify_password_async(payload.password, row.password_hash)
+    except HashingBusy:
+        raise _busy()
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_hash:
+        await db.execute(update(User).where(User.id == row.id).values(password_hash=new_hash))
+        await db.commit()
+    return _token_pair(row.id)
+
+
+@router.post("/refresh", response_model=TokenPair)
+@same_query_budget(sync_auth.refresh)
+async def refresh(token: str, db: AsyncDbSession):
+    return await db.run_sync(lambda s: sync_auth.refresh(token=token, db=s))
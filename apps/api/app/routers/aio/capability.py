@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Header
+from fastapi.concurrency import run_in_threadpool
+
+from ...auth.dependencies import CurrentPrincipal
+from ...cache import CAPABILITY_SCOPE, get_response_cache
+from ...metrics import same_query_budget
+from ...schemas import CapabilityCreate, CapabilityOut
+from ...serialization import tagged_response
+from .. import capability
+from . import AsyncDbSession
+
+
+router = APIRouter(prefix="/capability", tags=["capability"])
+
+
+@router.post("", response_model=CapabilityOut)
+@same_query_budget(capability.create_capability)
+async def create_capability(payload: CapabilityCreate, user: CurrentPrincipal, db: AsyncDbSession):
+    out = await db.run_sync(lambda s: capability.create_snapshot(s, user.id, payload))
+    await run_in_threadpool(get_response_cache().invalidate, CAPABILITY_SCOPE, user.id)
+    return out
+
+
+@router.get("/latest", response_model=CapabilityOut)
+@same_query_budget(capability.get_latest_capability)
+async def get_latest_capability(
+    user: CurrentPrincipal,
+    db: AsyncDbSession,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    cache = get_response_cache()
+    cached, version = await run_in_threadpool(cache.get, CAPABILITY_SCOPE, user.id)
+    if cached is not None:
+        return tagged_response(cached, if_none_match)
+    resp, tagged = await db.run_sync(lambda s: capability.latest_capability_response(s, user.id, if_none_match))
+    if tagged is not None:
+        await run_in_threadpool(cache.put, CAPABILITY_SCOPE, user.id, version, tagged)
+    return resp
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+
+from ...auth.dependencies import CurrentPrincipal
+from ...metrics import same_query_budget
+from ...schemas import FeasibilityResult, FeasibilitySweepOut, FeasibilitySweepRequest, GoalCreate, GoalOut
+from .. import goals
+from . import AsyncDbSession
+
+
+router = APIRouter(prefix="/goals", tags=["goals"])
+
+
+@router.post("", response_model=GoalOut)
+@same_query_budget(goals.create_goal)
+async def create_goal(payload: GoalCreate, user: CurrentPrincipal, db: AsyncDbSession):
+    return await db.run_sync(lambda s: goals.create_goal(payload=payload, user=user, db=s))
+
+
+@router.post("/feasibility-sweep", response_model=FeasibilitySweepOut)
+@same_query_budget(goals.feasibility_sweep)
+async def feasibility_sweep(payload: FeasibilitySweepRequest, user: CurrentPrincipal, db: AsyncDbSession):
+    inputs = await db.run_sync(lambda s: goals.sweep_inputs(s, user.id))
+    # Up to 8 distances x 64 times x every target date: too much to run on the loop
+    return await run_in_threadpool(goals.sweep_response, payload, *inputs)
+
+
+@router.post("/{goal_id}/feasibility", response_model=FeasibilityResult)
+@same_query_budget(goals.goal_feasibility)
+async def goal_feasibility(goal_id: str, user: CurrentPrincipal, db: AsyncDbSession):
+    return await db.run_sync(lambda s: goals.goal_feasibility(goal_id=goal_id, user=user, db=s))
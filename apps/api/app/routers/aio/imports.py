@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, File, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from ...auth.dependencies import CurrentPrincipal
+from ...importing.parsers import FORMATS
+from ...metrics import same_query_budget
+from ...schemas import ImportJobOut
+from .. import imports
+
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+
+@router.post("", response_model=ImportJobOut, status_code=202)
+@same_query_budget(imports.start_import)
+async def start_import(
+    file: Annotated[UploadFile, File()],
+    user: CurrentPrincipal,
+    fmt: Annotated[str | None, Query(alias="format", description=f"One of {', '.join(FORMATS)}")] = None,
+):
+    # Spooling the upload and the Redis enqueue both block; keep them off the loop
+    return await run_in_threadpool(imports.start_import, file=file, fmt=fmt, user=user)
+
+
+@router.get("/{job_id}", response_model=ImportJobOut)
+@same_query_budget(imports.get_import)
+async def get_import(job_id: str, user: CurrentPrincipal):
+    return await run_in_threadpool(imports.get_import, job_id=job_id, user=user)
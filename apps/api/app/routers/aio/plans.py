@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Callable, Iterable
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from ...auth.dependencies import CalendarPrincipal, CurrentPrincipal
+from ...cache import PLAN_SCOPE, get_response_cache
+from ...db import get_async_sessionmaker
+from ...ical import CALENDAR_TAIL, ICS_MEDIA_TYPE
+from ...metrics import same_query_budget
+from ...models import Plan
+from ...schemas import (
+    CalendarSubscriptionOut,
+    PlanBatchRequest,
+    PlanDiffOut,
+    PlanJobOut,
+    PlanOut,
+    WorkoutBatchOut,
+    WorkoutOut,
+)
+from ...serialization import etag_matches, json_response, ndjson_lines, not_modified, tagged_response
+from .. import plans
+from . import AsyncDbSession
+
+
+router = APIRouter(prefix="/plans", tags=["plans"])
+
+
+@router.post(
+    "/goals/{goal_id}/generate-plan",
+    response_model=PlanOut,
+    responses={202: {"model": PlanJobOut, "description": "Queued (``async=true``)"}},
+)
+@same_query_budget(plans.generate_plan_for_goal)
+async def generate_plan_for_goal(
+    goal_id: str,
+    user: CurrentPrincipal,
+    db: AsyncDbSession,
+    mode: Annotated[str, Query(pattern="^(full|incremental)$")] = "full",
+    run_async: Annotated[bool, Query(alias="async")] = False,
+):
+    if run_async:
+        await db.run_sync(lambda s: plans._goal_and_snapshot(s, user.id, goal_id))
+        return await run_in_threadpool(plans.enqueue_generation, user.id, goal_id, mode)
+    _, body, etag, changed = await db.run_sync(lambda s: plans.write_plan_for_goal(s, user.id, goal_id, mode))
+    if changed:
+        await run_in_threadpool(get_response_cache().invalidate, PLAN_SCOPE, user.id)
+    return json_response(body, etag=etag)
+
+
+@router.get("/jobs/{job_id}", response_model=PlanJobOut)
+@same_query_budget(plans.get_plan_job)
+async def get_plan_job(job_id: str, user: CurrentPrincipal):
+    return await run_in_threadpool(plans.get_plan_job, job_id=job_id, user=user)
+
+
+@router.post("/generate-batch", response_model=WorkoutBatchOut)
+@same_query_budget(plans.generate_plan_batch_preview)
+async def generate_plan_batch_preview(payload: PlanBatchRequest, user: CurrentPrincipal):
+    return await run_in_threadpool(plans.generate_plan_batch_preview, payload=payload, user=user)
+
+
+@router.get("/current", response_model=PlanOut)
+@same_query_budget(plans.get_current_plan)
+async def get_current_plan(
+    user: CurrentPrincipal,
+    db: AsyncDbSession,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    cache = get_response_cache()
+    cached, version = await run_in_threadpool(cache.get, PLAN_SCOPE, user.id)
+    if cached is not None:
+        return tagged_response(cached, if_none_match)
+    resp, tagged = await db.run_sync(lambda s: plans.current_plan_response(s, user.id, if_none_match))
+    if tagged is not None:
+        await run_in_threadpool(cache.put, PLAN_SCOPE, user.id, version, tagged)
+    return resp
+
+
+async def _stream_workouts(stmt: Select) -> AsyncIterator[bytes]:
+    async with get_async_sessionmaker()() as s:
+        result = await s.stream(stmt.execution_options(yield_per=plans.STREAM_BATCH_SIZE))
+        async for part in result.partitions():
+            yield ndjson_lines(part)
+
+
+@router.get("/{plan_id}/workouts", response_model=list[WorkoutOut])
+@same_query_budget(plans.list_workouts)
+async def list_workouts(
+    plan_id: str,
+    user: CurrentPrincipal,
+    db: AsyncDbSession,
+    from_date: Annotated[date | None, Query(alias="from")] = None,
+    to_date: Annotated[date | None, Query(alias="to")] = None,
+    limit: Annotated[int | None, Query(ge=1, le=1000)] = None,
+    cursor: str | None = None,
+    accept: Annotated[str | None, Header()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    if accept and plans.NDJSON_MEDIA_TYPE in accept:
+        plan = await db.get(Plan, plan_id)
+        if not plan or plan.user_id != user.id:
+            raise HTTPException(status_code=404, detail="Plan not found")
+        etag = plans.listing_etag(plan, from_date, to_date, limit, cursor, stream=True)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        after = plans.decode_cursor(cursor) if cursor else None
+        stmt = plans.workouts_stmt(plan_id, from_date, to_date, after)
+        if limit:
+            stmt = stmt.limit(limit)
+        return StreamingResponse(_stream_workouts(stmt), media_type=plans.NDJSON_MEDIA_TYPE, headers={"ETag": etag})
+    return await db.run_sync(
+        lambda s: plans.list_workouts(
+            plan_id=plan_id,
+            user=user,
+            db=s,
+            from_date=from_date,
+            to_date=to_date,
+            limit=limit,
+            cursor=cursor,
+            accept=None,
+            if_none_match=if_none_match,
+        )
+    )
+
+
+async def _stream_calendar(
+    stmt: Select, head: bytes, render: Callable[[Iterable], bytes], fill: Callable[[bytes], None]
+) -> AsyncIterator[bytes]:
+    parts = [head]
+    yield head
+    async with get_async_sessionmaker()() as s:
+        result = await s.stream(stmt.execution_options(yield_per=plans.STREAM_BATCH_SIZE))
+        async for part in result.partitions():
+            chunk = render(part)
+            parts.append(chunk)
+            yield chunk
+    parts.append(CALENDAR_TAIL)
+    yield CALENDAR_TAIL
+    await run_in_threadpool(fill, b"".join(parts))
+
+
+@router.get("/{plan_id}/calendar.ics", response_class=Response)
+@same_query_budget(plans.get_plan_calendar)
+async def get_plan_calendar(
+    plan_id: str,
+    user: CalendarPrincipal,
+    db: AsyncDbSession,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    cached, version = await run_in_threadpool(plans.cached_calendar, user.id, plan_id, if_none_match)
+    if cached is not None:
+        return cached
+    plan = await db.get(Plan, plan_id)
+    if not plan or plan.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    etag = plans.calendar_etag(plan)
+    head, render = plans.calendar_renderer(plan)
+    fill = plans.calendar_filler(user.id, plan, version)
+    stmt = plans.workouts_stmt(plan.id, None, None, None)
+    if etag_matches(if_none_match, etag):
+        rows = (await db.execute(stmt)).all()
+        await run_in_threadpool(fill, head + render(rows) + CALENDAR_TAIL)
+        return not_modified(etag)
+    return StreamingResponse(_stream_calendar(stmt, head, render, fill), media_type=ICS_MEDIA_TYPE, headers={"ETag": etag})
+
+
+@router.post("/{plan_id}/calendar-token", response_model=CalendarSubscriptionOut)
+@same_query_budget(plans.create_calendar_token)
+async def create_calendar_token(plan_id: str, request: Request, user: CurrentPrincipal, db: AsyncDbSession):
+    return await db.run_sync(
+        lambda s: plans.create_calendar_token(plan_id=plan_id, request=request, user=user, db=s)
+    )
+
+
+@router.get("/{plan_id}/diff", response_model=PlanDiffOut)
+@same_query_budget(plans.preview_plan_diff)
+async def preview_plan_diff(plan_id: str, user: CurrentPrincipal, db: AsyncDbSession):
+    return await db.run_sync(lambda s: plans.preview_plan_diff(plan_id=plan_id, user=user, db=s))
+
+
+@router.post("/{plan_id}/regenerate", response_model=PlanDiffOut)
+@same_query_budget(plans.regenerate_plan)
+async def regenerate_plan(plan_id: str, user: CurrentPrincipal, db: AsyncDbSession):
+    body, changed = await db.run_sync(lambda s: plans.regenerate_in_place(s, user.id, plan_id))
+    if changed:
+        await run_in_threadpool(get_response_cache().invalidate, PLAN_SCOPE, user.id)
+    return json_response(body)
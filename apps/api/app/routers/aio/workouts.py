@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+
+from ...auth.dependencies import CurrentPrincipal
+from ...cache import PLAN_SCOPE, get_response_cache
+from ...metrics import same_query_budget
+from ...schemas import LogBatchOut, LogBatchRequest, LogCreate, WorkoutOut
+from .. import workouts
+from . import AsyncDbSession
+
+
+router = APIRouter(prefix="/workouts", tags=["workouts"])
+
+
+@router.get("/{workout_id}", response_model=WorkoutOut)
+@same_query_budget(workouts.get_workout)
+async def get_workout(workout_id: str, user: CurrentPrincipal, db: AsyncDbSession):
+    return await db.run_sync(lambda s: workouts.get_workout(workout_id=workout_id, user=user, db=s))
+
+
+@router.post("/logs:batch", response_model=LogBatchOut)
+@same_query_budget(workouts.log_workouts_batch)
+async def log_workouts_batch(payload: LogBatchRequest, user: CurrentPrincipal, db: AsyncDbSession):
+    out, recorded = await db.run_sync(lambda s: workouts.record_log_batch(s, user.id, payload))
+    if recorded:
+        await run_in_threadpool(get_response_cache().invalidate, PLAN_SCOPE, user.id)
+    return out
+
+
+@router.post("/{workout_id}/log")
+@same_query_budget(workouts.log_workout)
+async def log_workout(workout_id: str, payload: LogCreate, user: CurrentPrincipal, db: AsyncDbSession):
+    await db.run_sync(lambda s: workouts.record_log(s, user.id, workout_id, payload))
+    await run_in_threadpool(get_response_cache().invalidate, PLAN_SCOPE, user.id)
+    return {"ok": True}
@@ -1,38 +1,50 @@
 from __future__ import annotations
 
-from passlib.hash import argon2
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, HTTPException
 from pydantic import EmailStr
-from sqlalchemy.orm import Session
 
 from ..auth.jwt import create_token
+from ..auth.passwords import HashingBusy, hash_password, verify_password
 from ..config import get_settings
-from ..db import get_db
+from ..metrics import query_budget
 from ..models import User
 from ..schemas import RegisterRequest, TokenPair
+from . import DbSession
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Authentication busy, retry shortly", headers={"Retry-After": "1"})
+
+
+def _token_pair(user_id: str) -> TokenPair:
+    settings = get_settings()
+    at = create_token(user_id, settings.access_token_ttl, "access")
+    rt = create_token(user_id, settings.refresh_token_ttl, "refresh")
+    return TokenPair(access_token=at, refresh_token=rt)
+
+
 @router.post("/register", response_model=TokenPair)
-def register(payload: RegisterRequest, db: Session = Depends(get_db)):
+@query_budget(3)
+def register(payload: RegisterRequest, db: DbSession):
     if db.query(User).filter(User.email == payload.email).first():
         raise HTTPException(status_code=400, detail="Email already registered")
+    try:
+        password_hash = hash_password(payload.password)
+    except HashingBusy:
+        raise _busy()
     user = User(
         email=str(payload.email),
-        password_hash=argon2.hash(payload.password),
+        password_hash=password_hash,
         age=payload.age,
         sex=payload.sex,
     )
     db.add(user)
     db.commit()
     db.refresh(user)
-
-    settings = get_settings()
-    at = create_token(user.id, settings.access_token_ttl, "access")
-    rt = create_token(user.id, settings.refresh_token_ttl, "refresh")
-    return TokenPair(access_token=at, refresh_token=rt)
+    return _token_pair(user.id)
 
 
 class LoginRequest(RegisterRequest):
@@ -43,18 +55,27 @@ class LoginRequest(RegisterRequest):
 
 
 @router.post("/login", response_model=TokenPair)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
+@query_budget(2)
+def login(payload: LoginRequest, db: DbSession):
     user = db.query(User).filter(User.email == str(payload.email)).first()
-    if not user or not argon2.verify(payload.password, user.password_hash):
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
-    settings = get_settings()
-    at = create_token(user.id, settings.access_token_ttl, "access")
-    rt = create_token(user.id, settings.refresh_token_ttl, "refresh")
-    return TokenPair(access_token=at, refresh_token=rt)
+    try:
+        ok, new_hash = verify_password(payload.password, user.password_hash)
+    except HashingBusy:
+        raise _busy()
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_hash:
+        # Cost parameters changed since this hash was made; upgrade it transparently
+        user.password_hash = new_hash
+        db.commit()
+    return _token_pair(user.id)
 
 
 @router.post("/refresh", response_model=TokenPair)
-def refresh(token: str, db: Session = Depends(get_db)):
+@query_budget(1)
+def refresh(token: str, db: DbSession):
     # For MVP: accept refresh token in body; issue new access+refresh
     from ..auth.jwt import decode_token
 
@@ -64,8 +85,5 @@ def refresh(token: str, db: Session = Depends(get_db)):
     user = db.get(User, payload.get("sub"))
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-    settings = get_settings()
-    at = create_token(user.id, settings.access_token_ttl, "access")
-    rt = create_token(user.id, settings.refresh_token_ttl, "refresh")
-    return TokenPair(access_token=at, refresh_token=rt)
+    return _token_pair(user.id)
 
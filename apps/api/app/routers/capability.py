@@ -1,75 +1,108 @@
 from __future__ import annotations
 
-from datetime import date
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from ..auth.dependencies import get_current_user
-from ..db import get_db
+from ..auth.dependencies import CurrentPrincipal
+from ..cache import CAPABILITY_SCOPE, get_response_cache
+from ..config import get_settings
+from ..current_state import latest_snapshot, record_snapshot
 from ..domain.projection import riegel_predict
 from ..domain.zones import derive_zones
-from ..models import CapabilitySnapshot, User
+from ..metrics import query_budget
+from ..models import CapabilitySnapshot, UserRiegelFit
 from ..schemas import CapabilityCreate, CapabilityOut
+from ..serialization import etag_matches, json_response, not_modified, pack_tagged, tagged_response
+from . import DbSession
 
 
 router = APIRouter(prefix="/capability", tags=["capability"])
 
 
-def _projection(comfortable_distance_m: int, comfortable_time_sec: int) -> dict:
-    # Predict key distances
+def _projection(comfortable_distance_m: int, comfortable_time_sec: int, riegel_k: float | None = None) -> dict:
+    # Predict key distances, with the runner's fitted exponent when one exists
+    k = get_settings().riegel_k if riegel_k is None else riegel_k
     predictions = {}
     for d in [5000, 10000, 21097, 42195]:
-        predictions[str(d)] = riegel_predict(comfortable_time_sec, comfortable_distance_m, d)
+        predictions[str(d)] = riegel_predict(comfortable_time_sec, comfortable_distance_m, d, k=k)
     zones = derive_zones(predictions["10000"])
     return {"predictions": predictions, "zones": zones}
 
 
-@router.post("", response_model=CapabilityOut)
-def create_capability(
-    payload: CapabilityCreate,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    proj = _projection(payload.comfortable_distance_m, payload.comfortable_time_sec)
+def create_snapshot(db: Session, user_id: str, payload: CapabilityCreate) -> CapabilityOut:
+    """Store a snapshot and make it the user's latest (unless backdated); commits."""
+    fit = db.get(UserRiegelFit, user_id)
+    proj = _projection(payload.comfortable_distance_m, payload.comfortable_time_sec, fit.exponent if fit else None)
     snap = CapabilitySnapshot(
-        user_id=user.id,
+        user_id=user_id,
         date=payload.date,
         comfortable_distance_m=payload.comfortable_distance_m,
         comfortable_time_sec=payload.comfortable_time_sec,
         projection=proj,
     )
     db.add(snap)
-    db.commit()
-    db.refresh(snap)
-    return CapabilityOut(
+    db.flush()
+    record_snapshot(db, user_id, snap)
+    # Built before commit expires ``snap``; snapshots never change, so no refresh is needed
+    out = CapabilityOut(
         id=snap.id,
         date=snap.date,
         comfortable_distance_m=snap.comfortable_distance_m,
         comfortable_time_sec=snap.comfortable_time_sec,
         projection=snap.projection,
     )
+    db.commit()
+    return out
 
 
-@router.get("/latest", response_model=CapabilityOut)
-def get_latest_capability(
-    user: User = Depends(get_current_user), db: Session = Depends(get_db)
-):
-    stmt = (
-        select(CapabilitySnapshot)
-        .where(CapabilitySnapshot.user_id == user.id)
-        .order_by(CapabilitySnapshot.date.desc(), CapabilitySnapshot.created_at.desc())
-        .limit(1)
-    )
-    snap = db.scalars(stmt).first()
+@router.post("", response_model=CapabilityOut)
+@query_budget(6)
+def create_capability(payload: CapabilityCreate, user: CurrentPrincipal, db: DbSession):
+    out = create_snapshot(db, user.id, payload)
+    get_response_cache().invalidate(CAPABILITY_SCOPE, user.id)
+    return out
+
+
+def snapshot_etag(snapshot_id: str) -> str:
+    # Snapshots are immutable, so the id is the version token
+    return f'"c-{snapshot_id}"'
+
+
+def latest_capability_response(
+    db: Session, user_id: str, if_none_match: str | None
+) -> tuple[Response, bytes | None]:
+    """The latest snapshot as a response, plus the tagged body to cache when one was built."""
+    snap = latest_snapshot(db, user_id)
     if not snap:
         raise HTTPException(status_code=404, detail="No capability snapshots")
-    return CapabilityOut(
+    etag = snapshot_etag(snap.id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag), None
+    out = CapabilityOut(
         id=snap.id,
         date=snap.date,
         comfortable_distance_m=snap.comfortable_distance_m,
         comfortable_time_sec=snap.comfortable_time_sec,
         projection=snap.projection,
     )
+    body = out.model_dump_json().encode()
+    return json_response(body, etag=etag), pack_tagged(etag, body)
 
+
+@router.get("/latest", response_model=CapabilityOut)
+@query_budget(1)
+def get_latest_capability(
+    user: CurrentPrincipal,
+    db: DbSession,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    cache = get_response_cache()
+    cached, version = cache.get(CAPABILITY_SCOPE, user.id)
+    if cached is not None:
+        return tagged_response(cached, if_none_match)
+    resp, tagged = latest_capability_response(db, user.id, if_none_match)
+    if tagged is not None:
+        cache.put(CAPABILITY_SCOPE, user.id, version, tagged)
+    return resp
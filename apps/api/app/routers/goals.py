@@ -2,21 +2,36 @@ from __future__ import annotations
 
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, HTTPException
 from sqlalchemy.orm import Session
 
-from ..auth.dependencies import get_current_user
-from ..db import get_db
-from ..domain.feasibility import assess_feasibility
-from ..models import CapabilitySnapshot, Goal, User
-from ..schemas import FeasibilityResult, GoalCreate, GoalOut
+from ..auth.dependencies import CurrentPrincipal
+from ..current_state import latest_snapshot
+from ..domain.feasibility import assess_feasibility, sweep_feasibility
+from ..metrics import query_budget
+from ..models import Goal, UserRiegelFit
+from ..schemas import (
+    FeasibilityResult,
+    FeasibilitySurfaceOut,
+    FeasibilitySweepOut,
+    FeasibilitySweepRequest,
+    GoalCreate,
+    GoalOut,
+)
+from . import DbSession
 
 
 router = APIRouter(prefix="/goals", tags=["goals"])
 
 
+def _fitted_riegel_k(db: Session, user_id: str) -> float | None:
+    fit = db.get(UserRiegelFit, user_id)
+    return fit.exponent if fit else None
+
+
 @router.post("", response_model=GoalOut)
-def create_goal(payload: GoalCreate, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@query_budget(2)
+def create_goal(payload: GoalCreate, user: CurrentPrincipal, db: DbSession):
     goal = Goal(
         user_id=user.id,
         distance_m=payload.distance_m,
@@ -29,17 +44,54 @@ def create_goal(payload: GoalCreate, user: User = Depends(get_current_user), db:
     return GoalOut(id=goal.id, distance_m=goal.distance_m, target_time_sec=goal.target_time_sec, target_date=goal.target_date)
 
 
+def sweep_inputs(db: Session, user_id: str) -> tuple[int, int, float | None]:
+    """(comfortable distance, comfortable time, fitted Riegel exponent) for a sweep."""
+    snap = latest_snapshot(db, user_id)
+    if not snap:
+        raise HTTPException(status_code=400, detail="No capability snapshot; create one first")
+    return snap.comfortable_distance_m, snap.comfortable_time_sec, _fitted_riegel_k(db, user_id)
+
+
+def sweep_response(
+    payload: FeasibilitySweepRequest, comfortable_distance_m: int, comfortable_time_sec: int, riegel_k: float | None
+) -> FeasibilitySweepOut:
+    surfaces = sweep_feasibility(
+        today=date.today(),
+        target_dates=payload.target_dates,
+        target_times_sec=payload.target_times_sec,
+        goal_distances_m=payload.distances_m,
+        comfortable_distance_m=comfortable_distance_m,
+        comfortable_time_sec=comfortable_time_sec,
+        riegel_k=riegel_k,
+    )
+    return FeasibilitySweepOut(
+        target_dates=payload.target_dates,
+        target_times_sec=payload.target_times_sec,
+        surfaces=[
+            FeasibilitySurfaceOut(
+                distance_m=s.distance_m,
+                weeks_needed=s.weeks_needed,
+                best_case_time_sec=s.best_case_time_sec,
+                feasible=s.feasible,
+            )
+            for s in surfaces
+        ],
+    )
+
+
+@router.post("/feasibility-sweep", response_model=FeasibilitySweepOut)
+@query_budget(3)
+def feasibility_sweep(payload: FeasibilitySweepRequest, user: CurrentPrincipal, db: DbSession):
+    return sweep_response(payload, *sweep_inputs(db, user.id))
+
+
 @router.post("/{goal_id}/feasibility", response_model=FeasibilityResult)
-def goal_feasibility(goal_id: str, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@query_budget(3)
+def goal_feasibility(goal_id: str, user: CurrentPrincipal, db: DbSession):
     goal = db.get(Goal, goal_id)
     if not goal or goal.user_id != user.id:
         raise HTTPException(status_code=404, detail="Goal not found")
-    snap = (
-        db.query(CapabilitySnapshot)
-        .filter(CapabilitySnapshot.user_id == user.id)
-        .order_by(CapabilitySnapshot.date.desc(), CapabilitySnapshot.created_at.desc())
-        .first()
-    )
+    snap = latest_snapshot(db, user.id)
     if not snap:
         raise HTTPException(status_code=400, detail="No capability snapshot; create one first")
     today = date.today()
@@ -50,6 +102,7 @@ def goal_feasibility(goal_id: str, user: User = Depends(get_current_user), db: S
         target_time_sec=goal.target_time_sec,
         comfortable_distance_m=snap.comfortable_distance_m,
         comfortable_time_sec=snap.comfortable_time_sec,
+        riegel_k=_fitted_riegel_k(db, user.id),
     )
     return FeasibilityResult(feasible=res.feasible, reasons=res.reasons, tradeoffs=res.tradeoffs)
 
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import uuid
+from typing import Annotated, BinaryIO
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+
+from ..auth.dependencies import CurrentPrincipal
+from ..config import get_settings
+from ..importing.parsers import FORMATS, ImportFormatError, detect_format
+from ..metrics import query_budget
+from ..queue import IMPORTS_QUEUE, fetch_job, get_queue
+from ..schemas import ImportJobOut
+
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+_COPY_CHUNK = 1 << 20
+
+
+def _spool(src: BinaryIO, path: str, max_bytes: int) -> None:
+    """Copy the upload to ``path`` in chunks, refusing it (413) once it passes ``max_bytes``."""
+    written = 0
+    with open(path, "wb") as out:
+        while chunk := src.read(_COPY_CHUNK):
+            written += len(chunk)
+            if written > max_bytes:
+                break
+            out.write(chunk)
+    if written > max_bytes:
+        os.unlink(path)
+        raise HTTPException(status_code=413, detail=f"Import is larger than {max_bytes} bytes")
+
+
+@router.post("", response_model=ImportJobOut, status_code=202)
+@query_budget(0)
+def start_import(
+    file: Annotated[UploadFile, File()],
+    user: CurrentPrincipal,
+    fmt: Annotated[str | None, Query(alias="format", description=f"One of {', '.join(FORMATS)}")] = None,
+):
+    """Spool a CSV/GPX/TCX export to disk and queue it; poll ``GET /imports/{job_id}`` for progress."""
+    import redis
+
+    try:
+        fmt = detect_format(f"x.{fmt}" if fmt else file.filename or "")
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    settings = get_settings()
+    os.makedirs(settings.import_dir, exist_ok=True)
+    path = os.path.join(settings.import_dir, f"{uuid.uuid4().hex}.{fmt}")
+    _spool(file.file, path, settings.import_max_bytes)
+    try:
+        job = get_queue(IMPORTS_QUEUE).enqueue(
+            "app.importing.jobs.run_import",
+            user.id,
+            path,
+            fmt,
+            job_timeout=settings.import_job_timeout,
+            result_ttl=86400,
+            failure_ttl=86400,
+            meta={"user_id": user.id},
+        )
+    except redis.RedisError:
+        os.unlink(path)
+        raise HTTPException(status_code=503, detail="Import queue unavailable")
+    return ImportJobOut(job_id=job.id, status="queued")
+
+
+@router.get("/{job_id}", response_model=ImportJobOut)
+@query_budget(0)
+def get_import(job_id: str, user: CurrentPrincipal):
+    job = fetch_job(job_id, user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    status = job.get_status()
+    counts = (job.return_value() if status == "finished" else None) or job.meta
+    # The job's traceback stays in the worker log; it can name files and SQL
+    error = "Import failed" if status == "failed" else None
+    return ImportJobOut(
+        job_id=job.id,
+        status=status.value,
+        parsed=counts.get("parsed", 0),
+        matched=counts.get("matched", 0),
+        unplanned=counts.get("unplanned", 0),
+        skipped=counts.get("skipped", 0),
+        duplicates=counts.get("duplicates", 0),
+        error=error,
+    )
@@ -1,143 +1,665 @@
 from __future__ import annotations
 
-from datetime import date
-from typing import List, Optional
+import base64
+import binascii
+import hashlib
+import dataclasses
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from datetime import UTC, date, datetime, timedelta
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, select
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, and_, delete, exists, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from ..auth.dependencies import get_current_user
-from ..db import get_db
-from ..domain.planner import PlanSpec, generate_plan
-from ..models import CapabilitySnapshot, Goal, Plan, User, Workout
-from ..schemas import PlanOut, WorkoutOut
+from ..auth.dependencies import CALENDAR_TOKEN_TYPE, CalendarPrincipal, CurrentPrincipal
+from ..auth.jwt import create_token
+from ..cache import PLAN_SCOPE, get_response_cache
+from ..config import get_settings
+from ..current_state import active_plan_row, latest_snapshot, record_plan
+from ..db import session_scope
+from ..domain.adaptation import ADJUSTMENT_DAYS, Adjustment, adjusted_workout, replayed_adjustment
+from ..domain.plan_diff import SPEC_FIELDS, PlanDiff, diff_workouts
+from ..domain.planner import (
+    PlanRequest,
+    PlanSpec,
+    WorkoutSpec,
+    generate_plan,
+    generate_plan_batch,
+    regenerate_from,
+)
+from ..ical import CALENDAR_TAIL, ICS_MEDIA_TYPE, calendar_head, vevents
+from ..metrics import query_budget
+from ..models import AdaptationEvent, CapabilitySnapshot, Goal, Plan, SessionLog, Workout
+from ..queue import PLANS_QUEUE, fetch_job, get_queue
+from ..schemas import (
+    CalendarSubscriptionOut,
+    PlanBatchRequest,
+    PlanDiffOut,
+    PlanJobOut,
+    PlanOut,
+    WorkoutBatchOut,
+    WorkoutOut,
+)
+from ..serialization import (
+    WORKOUT_COLUMNS,
+    WORKOUT_FIELDS,
+    dumps,
+    etag_matches,
+    json_response,
+    ndjson_lines,
+    not_modified,
+    pack_tagged,
+    tagged_response,
+    unpack_tagged,
+    workout_dicts,
+)
+from . import DbSession
 
 
 router = APIRouter(prefix="/plans", tags=["plans"])
 
 
-@router.post("/goals/{goal_id}/generate-plan", response_model=PlanOut)
-def generate_plan_for_goal(goal_id: str, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def _goal_and_snapshot(db: Session, user_id: str, goal_id: str) -> tuple[Goal, CapabilitySnapshot]:
     goal = db.get(Goal, goal_id)
-    if not goal or goal.user_id != user.id:
+    if not goal or goal.user_id != user_id:
         raise HTTPException(status_code=404, detail="Goal not found")
-    snap = (
-        db.query(CapabilitySnapshot)
-        .filter(CapabilitySnapshot.user_id == user.id)
-        .order_by(CapabilitySnapshot.date.desc(), CapabilitySnapshot.created_at.desc())
-        .first()
-    )
+    snap = latest_snapshot(db, user_id)
     if not snap:
         raise HTTPException(status_code=400, detail="No capability snapshot")
+    return goal, snap
+
+
+def write_plan_for_goal(db: Session, user_id: str, goal_id: str, mode: str) -> tuple[str, bytes, str, bool]:
+    """Generate and commit a plan for the goal; returns (plan id, PlanOut JSON, ETag, changed).
+
+    Leaves the response cache alone, so the async routes can invalidate it off the
+    event loop; everything else goes through ``generate_for_goal``.
+    """
+    goal, snap = _goal_and_snapshot(db, user_id, goal_id)
+
+    if mode == "incremental":
+        plan = db.scalars(
+            select(Plan).where(Plan.goal_id == goal.id, Plan.status == "active").with_for_update()
+        ).first()
+        if plan:
+            diff = _plan_diff(db, plan, snap, date.today())
+            _apply_plan_diff(db, plan, diff)
+            db.commit()
+            rows = db.execute(select(*WORKOUT_COLUMNS).where(Workout.plan_id == plan.id).order_by(Workout.wdate.asc()))
+            body = _plan_json(plan.id, plan.start_date, plan.end_date, plan.status, workout_dicts(rows))
+            return plan.id, body, plan_etag(plan.id, plan.version), diff.changed
 
     # Archive existing active plans for the goal
-    db.query(Plan).filter(and_(Plan.goal_id == goal.id, Plan.status == "active")).update({Plan.status: "superseded"})
+    db.query(Plan).filter(and_(Plan.goal_id == goal.id, Plan.status == "active")).update(
+        {Plan.status: "superseded", Plan.version: Plan.version + 1}
+    )
 
     start_date = snap.date
     end_date = goal.target_date
     spec = PlanSpec(start_date=start_date, end_date=end_date, running_days_per_week=4, phases={})
-    start_weekly_vol = max(snap.comfortable_distance_m * 3.0, 10000)
     workouts_specs = generate_plan(
-        goal_distance_m=goal.distance_m, start_weekly_vol=start_weekly_vol, cap_growth=0.10, spec=spec
+        goal_distance_m=goal.distance_m,
+        start_weekly_vol=_start_weekly_vol(snap.comfortable_distance_m),
+        cap_growth=0.10,
+        spec=spec,
     )
-    plan = Plan(user_id=user.id, goal_id=goal.id, start_date=start_date, end_date=end_date, status="active")
+    plan = Plan(user_id=user_id, goal_id=goal.id, start_date=start_date, end_date=end_date, status="active")
     db.add(plan)
-    db.flush()
-    # Persist workouts
-    for ws in workouts_specs:
-        db.add(
-            Workout(
-                plan_id=plan.id,
-                wdate=ws.wdate,
-                wtype=ws.wtype,
-                target_distance_m=ws.target_distance_m,
-                target_duration_sec=ws.target_duration_sec,
-                target_zone=ws.target_zone,
-                description=ws.description,
-                is_key=ws.is_key,
-            )
-        )
+    try:
+        db.flush()
+    except IntegrityError:
+        # uq_plans_goal_active: a concurrent request generated a plan for this goal first
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Plan generation already in progress for this goal")
+    record_plan(db, user_id, plan)
+    workouts = _bulk_insert_workouts(db, plan.id, workouts_specs)
     db.commit()
-    db.refresh(plan)
-    workouts = db.scalars(select(Workout).where(Workout.plan_id == plan.id).order_by(Workout.wdate.asc())).all()
-    return PlanOut(
-        id=plan.id,
-        start_date=plan.start_date,
-        end_date=plan.end_date,
-        status=plan.status,
-        workouts=[
-            WorkoutOut(
-                id=w.id,
-                wdate=w.wdate,
-                wtype=w.wtype,
-                target_distance_m=w.target_distance_m,
-                target_duration_sec=w.target_duration_sec,
-                target_zone=w.target_zone,
-                description=w.description,
-                is_key=w.is_key,
-            )
-            for w in workouts
+    body = _plan_json(plan.id, plan.start_date, plan.end_date, plan.status, workouts)
+    return plan.id, body, plan_etag(plan.id, plan.version), True
+
+
+def generate_for_goal(db: Session, user_id: str, goal_id: str, mode: str) -> tuple[str, bytes, str]:
+    """Generate and commit a plan for the goal; returns (plan id, PlanOut JSON, ETag).
+
+    Shared by the inline route and the rq job, so both fail with the same
+    ``HTTPException`` for a missing goal or snapshot or a concurrent generation.
+    """
+    plan_id, body, etag, changed = write_plan_for_goal(db, user_id, goal_id, mode)
+    if changed:
+        get_response_cache().invalidate(PLAN_SCOPE, user_id)
+    return plan_id, body, etag
+
+
+# Seconds a finished or failed job's status stays pollable.
+PLAN_JOB_TTL = 86400
+
+
+def enqueue_generation(user_id: str, goal_id: str, mode: str) -> Response:
+    """Queue generation on the plans queue; 202 with the job to poll."""
+    import redis
+
+    try:
+        job = get_queue(PLANS_QUEUE).enqueue(
+            "app.plan_jobs.run_plan_generation",
+            user_id,
+            goal_id,
+            mode,
+            job_timeout=get_settings().plan_job_timeout,
+            result_ttl=PLAN_JOB_TTL,
+            failure_ttl=PLAN_JOB_TTL,
+            meta={"user_id": user_id},
+        )
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="Plan queue unavailable")
+    resp = json_response(PlanJobOut(job_id=job.id, status="queued").model_dump_json().encode(), status_code=202)
+    resp.headers["Location"] = f"{router.prefix}/jobs/{job.id}"
+    return resp
+
+
+@router.post(
+    "/goals/{goal_id}/generate-plan",
+    response_model=PlanOut,
+    responses={202: {"model": PlanJobOut, "description": "Queued (``async=true``)"}},
+)
+@query_budget(10)
+def generate_plan_for_goal(
+    goal_id: str,
+    user: CurrentPrincipal,
+    db: DbSession,
+    mode: Annotated[str, Query(pattern="^(full|incremental)$")] = "full",
+    run_async: Annotated[bool, Query(alias="async")] = False,
+):
+    """Generate a plan for the goal from the latest capability snapshot.
+
+    ``mode=full`` supersedes the goal's active plan with a new one. ``mode=incremental``
+    instead rewrites the active plan in place from today on (see ``regenerate_plan``)
+    and falls back to a full generation when the goal has no active plan.
+
+    With ``async=true`` the goal and snapshot are checked, generation is queued on
+    an rq worker and the response is 202 with a job to poll at ``GET /plans/jobs/{id}``.
+    """
+    if not run_async:
+        _, body, etag = generate_for_goal(db, user.id, goal_id, mode)
+        return json_response(body, etag=etag)
+    _goal_and_snapshot(db, user.id, goal_id)
+    return enqueue_generation(user.id, goal_id, mode)
+
+
+@router.get("/jobs/{job_id}", response_model=PlanJobOut)
+@query_budget(0)
+def get_plan_job(job_id: str, user: CurrentPrincipal):
+    job = fetch_job(job_id, user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    status = job.get_status()
+    plan_id = error = None
+    if status == "finished":
+        plan_id = (job.return_value() or {}).get("plan_id")
+    elif status == "failed":
+        error = job.meta.get("error") or "Plan generation failed"
+    return PlanJobOut(job_id=job.id, status=status.value, plan_id=plan_id, error=error)
+
+
+def _start_weekly_vol(comfortable_distance_m: int) -> float:
+    return max(comfortable_distance_m * 3.0, 10000)
+
+
+def plan_etag(plan_id: str, version: int, variant: str = "") -> str:
+    """Strong ETag for a plan representation; ``variant`` distinguishes query shapes."""
+    return f'"p-{plan_id}-{version}{variant}"'
+
+
+def _plan_json(plan_id: str, start_date: date, end_date: date, status: str, workouts: list[dict]) -> bytes:
+    # Same shape as PlanOut
+    return dumps(
+        {"id": plan_id, "start_date": start_date, "end_date": end_date, "status": status, "workouts": workouts}
+    )
+
+
+def _bulk_insert_workouts(db: Session, plan_id: str, specs: list[WorkoutSpec]) -> list[dict]:
+    """Write all workouts with one multi-row INSERT ... RETURNING.
+
+    The response is built from the returned rows without re-selecting. Ids are
+    generated here so rows can be put back in parameter (date) order: asking
+    SQLAlchemy to sort RETURNING rows instead (``sort_by_parameter_order``) makes
+    it fall back to one INSERT per row, as a server-generated UUID key gives it
+    nothing to match rows on. ``render_nulls`` keeps rows with different NULL
+    columns (rest vs run days) in the same batch.
+    """
+    if not specs:
+        return []
+    ids = [str(uuid.uuid4()) for _ in specs]
+    rows = db.execute(
+        insert(Workout).returning(*WORKOUT_COLUMNS),
+        [
+            {
+                "id": workout_id,
+                "plan_id": plan_id,
+                "wdate": ws.wdate,
+                "wtype": ws.wtype,
+                "target_distance_m": ws.target_distance_m,
+                "target_duration_sec": ws.target_duration_sec,
+                "target_zone": ws.target_zone,
+                "description": ws.description,
+                "is_key": ws.is_key,
+            }
+            for workout_id, ws in zip(ids, specs)
         ],
+        execution_options={"render_nulls": True},
     )
+    by_id = {row.id: row for row in rows}
+    return workout_dicts(by_id[workout_id] for workout_id in ids)
 
 
-@router.get("/current", response_model=PlanOut)
-def get_current_plan(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    plan = db.query(Plan).filter(and_(Plan.user_id == user.id, Plan.status == "active")).order_by(Plan.created_at.desc()).first()
+@router.post("/generate-batch", response_model=WorkoutBatchOut)
+@query_budget(0)
+def generate_plan_batch_preview(payload: PlanBatchRequest, user: CurrentPrincipal):
+    batch = generate_plan_batch(
+        PlanRequest(
+            goal_distance_m=item.goal_distance_m,
+            start_weekly_vol=_start_weekly_vol(item.comfortable_distance_m),
+            cap_growth=0.10,
+            start_date=item.start_date,
+            end_date=item.end_date,
+        )
+        for item in payload.items
+    )
+    return WorkoutBatchOut(
+        offsets=batch.offsets,
+        wdate=batch.wdate,
+        wtype=batch.wtype,
+        target_distance_m=batch.target_distance_m,
+        target_zone=batch.target_zone,
+        description=batch.description,
+        is_key=batch.is_key,
+    )
+
+
+def current_plan_response(db: Session, user_id: str, if_none_match: str | None) -> tuple[Response, bytes | None]:
+    """The active plan as a response, plus the tagged body to cache when one was built."""
+    # Version check first: an unchanged poll costs this one primary-key lookup.
+    plan = active_plan_row(db, user_id)
     if not plan:
         raise HTTPException(status_code=404, detail="No active plan")
-    workouts = db.scalars(select(Workout).where(Workout.plan_id == plan.id).order_by(Workout.wdate.asc())).all()
-    return PlanOut(
-        id=plan.id,
-        start_date=plan.start_date,
-        end_date=plan.end_date,
-        status=plan.status,
-        workouts=[
-            WorkoutOut(
-                id=w.id,
-                wdate=w.wdate,
-                wtype=w.wtype,
-                target_distance_m=w.target_distance_m,
-                target_duration_sec=w.target_duration_sec,
-                target_zone=w.target_zone,
-                description=w.description,
-                is_key=w.is_key,
-            )
-            for w in workouts
-        ],
-    )
+    etag = plan_etag(plan.id, plan.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag), None
+    rows = db.execute(select(*WORKOUT_COLUMNS).where(Workout.plan_id == plan.id).order_by(Workout.wdate.asc()))
+    body = _plan_json(plan.id, plan.start_date, plan.end_date, plan.status, workout_dicts(rows))
+    return json_response(body, etag=etag), pack_tagged(etag, body)
+
+
+@router.get("/current", response_model=PlanOut)
+@query_budget(2)
+def get_current_plan(
+    user: CurrentPrincipal,
+    db: DbSession,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    cache = get_response_cache()
+    cached, version = cache.get(PLAN_SCOPE, user.id)
+    if cached is not None:
+        return tagged_response(cached, if_none_match)
+    resp, tagged = current_plan_response(db, user.id, if_none_match)
+    if tagged is not None:
+        cache.put(PLAN_SCOPE, user.id, version, tagged)
+    return resp
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Rows fetched per round trip from the server-side cursor when streaming.
+STREAM_BATCH_SIZE = 500
+
+
+def encode_cursor(wdate: date, workout_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{wdate.isoformat()},{workout_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        wdate, workout_id = raw.split(",", 1)
+        return date.fromisoformat(wdate), str(uuid.UUID(workout_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def workouts_stmt(
+    plan_id: str, from_date: date | None, to_date: date | None, after: tuple[date, str] | None
+) -> Select:
+    """Workouts for a plan in (wdate, id) order, resuming strictly after ``after``.
+
+    The keyset predicate rides the (plan_id, wdate) index, so every page costs the
+    same regardless of how deep into the plan it starts.
+    """
+    stmt = select(*WORKOUT_COLUMNS).where(Workout.plan_id == plan_id)
+    if from_date:
+        stmt = stmt.where(Workout.wdate >= from_date)
+    if to_date:
+        stmt = stmt.where(Workout.wdate <= to_date)
+    if after:
+        stmt = stmt.where(tuple_(Workout.wdate, Workout.id) > after)
+    return stmt.order_by(Workout.wdate.asc(), Workout.id.asc())
+
+
+def listing_etag(
+    plan: Plan,
+    from_date: date | None,
+    to_date: date | None,
+    limit: int | None,
+    cursor: str | None,
+    stream: bool,
+) -> str:
+    key = f"{from_date}|{to_date}|{limit}|{cursor}|{stream}"
+    return plan_etag(plan.id, plan.version, "-" + hashlib.blake2b(key.encode(), digest_size=8).hexdigest())
+
+
+def _stream_workouts(stmt: Select) -> Iterator[bytes]:
+    # Own session: the request-scoped one may already be closed while the body streams.
+    with session_scope() as s:
+        for part in s.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE)).partitions():
+            yield ndjson_lines(part)
 
 
 @router.get("/{plan_id}/workouts", response_model=list[WorkoutOut])
+@query_budget(2)
 def list_workouts(
     plan_id: str,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    from_date: Optional[date] = Query(default=None, alias="from"),
-    to_date: Optional[date] = Query(default=None, alias="to"),
+    user: CurrentPrincipal,
+    db: DbSession,
+    from_date: Annotated[date | None, Query(alias="from")] = None,
+    to_date: Annotated[date | None, Query(alias="to")] = None,
+    limit: Annotated[int | None, Query(ge=1, le=1000)] = None,
+    cursor: str | None = None,
+    accept: Annotated[str | None, Header()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
+    """List a plan's workouts.
+
+    With ``limit``, returns one page and sets ``X-Next-Cursor`` when more rows
+    follow; pass it back as ``cursor``. With ``Accept: application/x-ndjson`` the
+    rows are streamed one JSON object per line from a server-side cursor.
+    """
     plan = db.get(Plan, plan_id)
     if not plan or plan.user_id != user.id:
         raise HTTPException(status_code=404, detail="Plan not found")
-    stmt = select(Workout).where(Workout.plan_id == plan_id)
-    if from_date:
-        stmt = stmt.where(Workout.wdate >= from_date)
-    if to_date:
-        stmt = stmt.where(Workout.wdate <= to_date)
-    stmt = stmt.order_by(Workout.wdate.asc())
-    workouts = db.scalars(stmt).all()
-    return [
-        WorkoutOut(
-            id=w.id,
-            wdate=w.wdate,
-            wtype=w.wtype,
-            target_distance_m=w.target_distance_m,
-            target_duration_sec=w.target_duration_sec,
-            target_zone=w.target_zone,
-            description=w.description,
-            is_key=w.is_key,
+    stream = bool(accept and NDJSON_MEDIA_TYPE in accept)
+    etag = listing_etag(plan, from_date, to_date, limit, cursor, stream)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    stmt = workouts_stmt(plan_id, from_date, to_date, decode_cursor(cursor) if cursor else None)
+    if stream:
+        if limit:
+            stmt = stmt.limit(limit)
+        return StreamingResponse(_stream_workouts(stmt), media_type=NDJSON_MEDIA_TYPE, headers={"ETag": etag})
+    next_cursor = None
+    if limit:
+        rows = db.execute(stmt.limit(limit + 1)).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].wdate, rows[-1].id)
+    else:
+        rows = db.execute(stmt).all()
+    resp = json_response(dumps(workout_dicts(rows)), etag=etag)
+    if next_cursor:
+        resp.headers["X-Next-Cursor"] = next_cursor
+    return resp
+
+
+def _calendar_variant(plan_id: str) -> str:
+    return f"ics:{plan_id}"
+
+
+def calendar_etag(plan: Plan) -> str:
+    return plan_etag(plan.id, plan.version, "-ics")
+
+
+def calendar_response(body: bytes, etag: str) -> Response:
+    return Response(content=body, media_type=ICS_MEDIA_TYPE, headers={"ETag": etag})
+
+
+def cached_calendar(user_id: str, plan_id: str, if_none_match: str | None) -> tuple[Response | None, str]:
+    """Serve a feed from the response cache if present; else return the cache version to fill."""
+    cached, version = get_response_cache().get(PLAN_SCOPE, user_id, variant=_calendar_variant(plan_id))
+    if cached is None:
+        return None, version
+    etag, body = unpack_tagged(cached)
+    return (not_modified(etag) if etag_matches(if_none_match, etag) else calendar_response(body, etag)), version
+
+
+def calendar_filler(user_id: str, plan: Plan, version: str) -> Callable[[bytes], None]:
+    """Store a finished feed body under the cache version read before the plan was."""
+    etag, variant = calendar_etag(plan), _calendar_variant(plan.id)
+
+    def fill(body: bytes) -> None:
+        get_response_cache().put(PLAN_SCOPE, user_id, version, pack_tagged(etag, body), variant=variant)
+
+    return fill
+
+
+def calendar_renderer(plan: Plan) -> tuple[bytes, Callable[[Iterable], bytes]]:
+    """The feed's header and a renderer for each batch of workout rows."""
+    head = calendar_head(f"Training plan {plan.start_date.isoformat()} to {plan.end_date.isoformat()}")
+    dtstamp, sequence = plan.created_at, plan.version
+    return head, lambda rows: vevents(rows, dtstamp, sequence)
+
+
+def _stream_calendar(
+    stmt: Select, head: bytes, render: Callable[[Iterable], bytes], fill: Callable[[bytes], None]
+) -> Iterator[bytes]:
+    parts = [head]
+    yield head
+    with session_scope() as s:
+        for part in s.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE)).partitions():
+            chunk = render(part)
+            parts.append(chunk)
+            yield chunk
+    parts.append(CALENDAR_TAIL)
+    yield CALENDAR_TAIL
+    # Only a feed that streamed to the end is cached
+    fill(b"".join(parts))
+
+
+@router.get("/{plan_id}/calendar.ics", response_class=Response)
+@query_budget(2)
+def get_plan_calendar(
+    plan_id: str,
+    user: CalendarPrincipal,
+    db: DbSession,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """The plan's workouts as an iCalendar feed.
+
+    Authenticates with a bearer token or a subscription ``token`` from
+    ``POST /plans/{plan_id}/calendar-token``. Feeds are cached per plan version, so
+    repeated polls (conditional or not) are answered without querying Postgres
+    until the plan changes.
+    """
+    cached, version = cached_calendar(user.id, plan_id, if_none_match)
+    if cached is not None:
+        return cached
+    plan = db.get(Plan, plan_id)
+    if not plan or plan.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    etag = calendar_etag(plan)
+    head, render = calendar_renderer(plan)
+    fill = calendar_filler(user.id, plan, version)
+    stmt = workouts_stmt(plan.id, None, None, None)
+    if etag_matches(if_none_match, etag):
+        # Warm the cache anyway, or every conditional poll would keep reaching Postgres
+        fill(head + render(db.execute(stmt)) + CALENDAR_TAIL)
+        return not_modified(etag)
+    return StreamingResponse(_stream_calendar(stmt, head, render, fill), media_type=ICS_MEDIA_TYPE, headers={"ETag": etag})
+
+
+@router.post("/{plan_id}/calendar-token", response_model=CalendarSubscriptionOut)
+@query_budget(1)
+def create_calendar_token(
+    plan_id: str, request: Request, user: CurrentPrincipal, db: DbSession
+):
+    """Issue a subscription URL for the plan's feed that calendar apps can poll without a login."""
+    plan = db.get(Plan, plan_id)
+    if not plan or plan.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    ttl = get_settings().calendar_token_ttl
+    token = create_token(user.id, ttl, CALENDAR_TOKEN_TYPE, plan=plan.id)
+    url = request.url_for("get_plan_calendar", plan_id=plan.id).include_query_params(token=token)
+    return CalendarSubscriptionOut(url=str(url), expires_at=datetime.now(UTC) + timedelta(seconds=ttl))
+
+
+def _future_workouts(db: Session, plan_id: str, from_date: date) -> tuple[list[tuple[str, WorkoutSpec]], set[date]]:
+    """Unlogged workouts dated ``from_date`` onwards, and the dates that already have a log."""
+    logged = exists().where(SessionLog.workout_id == Workout.id)
+    rows = db.execute(
+        select(Workout.id, Workout.wdate, *(getattr(Workout, f) for f in SPEC_FIELDS), logged.label("logged"))
+        .where(Workout.plan_id == plan_id, Workout.wdate >= from_date)
+        .order_by(Workout.wdate, Workout.id)
+    )
+    existing, logged_dates = [], set()
+    for row in rows:
+        if row.logged:
+            logged_dates.add(row.wdate)
+        else:
+            existing.append((row.id, WorkoutSpec(wdate=row.wdate, **{f: getattr(row, f) for f in SPEC_FIELDS})))
+    return existing, logged_dates
+
+
+def _pending_adjustments(db: Session, plan_id: str, today: date) -> list[Adjustment]:
+    """Adjustments recorded for the plan whose week still reaches ``today`` or later, oldest first."""
+    rows = db.execute(
+        select(AdaptationEvent.rule, AdaptationEvent.event_date, AdaptationEvent.after_state)
+        .where(AdaptationEvent.plan_id == plan_id, AdaptationEvent.event_date >= today - timedelta(days=ADJUSTMENT_DAYS))
+        .order_by(AdaptationEvent.event_date)
+    )
+    return [replayed_adjustment(rule, event_date, after["volume_factor"]) for rule, event_date, after in rows]
+
+
+def _adapted_spec(spec: WorkoutSpec, adjustment: Adjustment) -> WorkoutSpec:
+    return dataclasses.replace(spec, **adjusted_workout({f: getattr(spec, f) for f in SPEC_FIELDS}, adjustment))
+
+
+def _plan_diff(db: Session, plan: Plan, snap: CapabilitySnapshot, today: date) -> PlanDiff:
+    """Changes that regenerating ``plan`` from ``today`` with the latest snapshot would make.
+
+    Past workouts, and any workout (or date) that already has a log, are left alone.
+    Adaptations still ahead are re-applied to the regenerated workouts, so the diff
+    doesn't read them as drift and revert them.
+    """
+    specs = regenerate_from(
+        plan_start=plan.start_date,
+        plan_end=plan.end_date,
+        from_date=today,
+        goal_distance_m=plan.goal.distance_m,
+        start_weekly_vol=_start_weekly_vol(snap.comfortable_distance_m),
+        cap_growth=0.10,
+    )
+    for adj in _pending_adjustments(db, plan.id, today):
+        specs = [_adapted_spec(ws, adj) if adj.start <= ws.wdate <= adj.end else ws for ws in specs]
+    existing, logged_dates = _future_workouts(db, plan.id, today)
+    return diff_workouts(existing, [ws for ws in specs if ws.wdate not in logged_dates])
+
+
+def _spec_dict(workout_id: str | None, spec: WorkoutSpec) -> dict:
+    return {"id": workout_id, **{f: getattr(spec, f) for f in WORKOUT_FIELDS[1:]}}
+
+
+def _apply_plan_diff(db: Session, plan: Plan, diff: PlanDiff) -> tuple[list[dict], list[dict], list[str]]:
+    """Write only the changed rows; returns (inserted, updated, deleted ids)."""
+    deleted: list[str] = []
+    if diff.deletes:
+        # session_logs cascade on delete; never drop a workout logged since the diff was taken
+        deleted = list(
+            db.scalars(
+                delete(Workout)
+                .where(Workout.id.in_(diff.deletes), ~exists().where(SessionLog.workout_id == Workout.id))
+                .returning(Workout.id)
+            )
         )
-        for w in workouts
-    ]
+    if diff.updates:
+        db.execute(update(Workout), [{"id": wid, **{f: getattr(ws, f) for f in SPEC_FIELDS}} for wid, ws in diff.updates])
+    inserted = _bulk_insert_workouts(db, plan.id, diff.inserts)
+    if diff.changed:
+        plan.version += 1
+    return inserted, [_spec_dict(wid, ws) for wid, ws in diff.updates], deleted
+
+
+def _regeneration_inputs(
+    db: Session, plan_id: str, user_id: str, for_update: bool = False
+) -> tuple[Plan, CapabilitySnapshot]:
+    plan = db.get(Plan, plan_id, with_for_update=for_update)
+    if not plan or plan.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    if plan.status != "active":
+        raise HTTPException(status_code=409, detail="Only the active plan can be regenerated")
+    snap = latest_snapshot(db, user_id)
+    if not snap:
+        raise HTTPException(status_code=400, detail="No capability snapshot")
+    return plan, snap
+
+
+def _diff_json(
+    plan: Plan, from_date: date, applied: bool, inserted: list[dict], updated: list[dict], deleted: list[str], unchanged: int
+) -> bytes:
+    # Same shape as PlanDiffOut
+    return dumps(
+        {
+            "plan_id": plan.id,
+            "version": plan.version,
+            "from_date": from_date,
+            "applied": applied,
+            "inserted": inserted,
+            "updated": updated,
+            "deleted": deleted,
+            "unchanged": unchanged,
+        }
+    )
+
+
+@router.get("/{plan_id}/diff", response_model=PlanDiffOut)
+@query_budget(5)
+def preview_plan_diff(plan_id: str, user: CurrentPrincipal, db: DbSession):
+    """What ``POST /plans/{plan_id}/regenerate`` would change right now; writes nothing."""
+    plan, snap = _regeneration_inputs(db, plan_id, user.id)
+    today = date.today()
+    diff = _plan_diff(db, plan, snap, today)
+    body = _diff_json(
+        plan,
+        today,
+        False,
+        [_spec_dict(None, ws) for ws in diff.inserts],
+        [_spec_dict(wid, ws) for wid, ws in diff.updates],
+        diff.deletes,
+        diff.unchanged,
+    )
+    return json_response(body)
+
+
+def regenerate_in_place(db: Session, user_id: str, plan_id: str) -> tuple[bytes, bool]:
+    """Apply and commit the plan's diff; returns (PlanDiffOut JSON, whether anything changed)."""
+    plan, snap = _regeneration_inputs(db, plan_id, user_id, for_update=True)
+    today = date.today()
+    diff = _plan_diff(db, plan, snap, today)
+    inserted, updated, deleted = _apply_plan_diff(db, plan, diff)
+    body = _diff_json(plan, today, True, inserted, updated, deleted, diff.unchanged)
+    db.commit()
+    return body, diff.changed
+
+
+@router.post("/{plan_id}/regenerate", response_model=PlanDiffOut)
+@query_budget(9)
+def regenerate_plan(plan_id: str, user: CurrentPrincipal, db: DbSession):
+    """Regenerate the active plan from today with the latest snapshot, in place.
 
+    Unlike a full generation this keeps the plan and its history: workouts before
+    today and logged workouts are untouched, and of the rest only rows that differ
+    from the regenerated plan are updated, inserted or deleted. Responds with the
+    applied changes and the plan's new version.
+    """
+    body, changed = regenerate_in_place(db, user.id, plan_id)
+    if changed:
+        get_response_cache().invalidate(PLAN_SCOPE, user.id)
+    return json_response(body)
@@ -1,52 +1,261 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import uuid
+from collections.abc import Iterable, Sequence
+from datetime import date, timedelta
 
-from ..auth.dependencies import get_current_user
-from ..db import get_db
-from ..models import SessionLog, User, Workout
-from ..schemas import LogCreate, WorkoutOut
+from fastapi import APIRouter, HTTPException
+from sqlalchemy import and_, exists, func, insert, or_, select, update
+from sqlalchemy.orm import Session, contains_eager
+
+from ..auth.dependencies import CurrentPrincipal
+from ..cache import PLAN_SCOPE, get_response_cache
+from ..current_state import fold_riegel_fit
+from ..domain.adaptation import AdaptationState, LoggedSession, adjusted_workout, evaluate_and_apply_adaptations
+from ..domain.projection import RiegelFit
+from ..metrics import query_budget
+from ..models import AdaptationEvent, Plan, PlanAdaptationState, SessionLog, Workout
+from ..schemas import LogBatchOut, LogBatchRequest, LogBatchResult, LogCreate, WorkoutOut
+from ..serialization import WORKOUT_COLUMNS, dumps, json_response, workout_dicts
+from . import DbSession
 
 
 router = APIRouter(prefix="/workouts", tags=["workouts"])
 
 
 @router.get("/{workout_id}", response_model=WorkoutOut)
-def get_workout(workout_id: str, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    w = db.get(Workout, workout_id)
-    if not w:
+@query_budget(1)
+def get_workout(workout_id: str, user: CurrentPrincipal, db: DbSession):
+    wid = _canonical_uuid(workout_id)
+    if not wid:
         raise HTTPException(status_code=404, detail="Workout not found")
-    plan_user_id = w.plan.user_id  # requires relationship load
-    if plan_user_id != user.id:
+    row = db.execute(
+        select(*WORKOUT_COLUMNS)
+        .join(Plan, Plan.id == Workout.plan_id)
+        .where(Workout.id == wid, Plan.user_id == user.id)
+    ).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Workout not found")
-    return WorkoutOut(
-        id=w.id,
-        wdate=w.wdate,
-        wtype=w.wtype,
-        target_distance_m=w.target_distance_m,
-        target_duration_sec=w.target_duration_sec,
-        target_zone=w.target_zone,
-        description=w.description,
-        is_key=w.is_key,
+    return json_response(dumps(workout_dicts([row])[0]))
+
+
+def _owned_workouts(db: Session, user_id: str, workout_ids: Iterable[str]) -> dict[str, Workout]:
+    """The caller's workouts among ``workout_ids``, with their plans, in one joined query.
+
+    Keyed by canonical (lowercase) id; malformed ids are simply not found.
+    """
+    valid = {wid for wid in map(_canonical_uuid, workout_ids) if wid}
+    if not valid:
+        return {}
+    rows = db.scalars(
+        select(Workout)
+        .join(Workout.plan)
+        .options(contains_eager(Workout.plan))
+        .where(Workout.id.in_(valid), Plan.user_id == user_id)
     )
+    return {w.id: w for w in rows}
 
 
-@router.post("/{workout_id}/log")
-def log_workout(
-    workout_id: str, payload: LogCreate, user: User = Depends(get_current_user), db: Session = Depends(get_db)
-):
-    w = db.get(Workout, workout_id)
-    if not w or w.plan.user_id != user.id:
-        raise HTTPException(status_code=404, detail="Workout not found")
-    log = SessionLog(
-        workout_id=w.id,
-        actual_distance_m=payload.actual_distance_m,
-        actual_time_sec=payload.actual_time_sec,
-        rpe=payload.rpe,
-        notes=payload.notes,
+def _canonical_uuid(value: str) -> str | None:
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        return None
+
+
+def _record_logs(db: Session, user_id: str, entries: Sequence[tuple[Workout, LogCreate]]) -> list[str]:
+    """Insert logs for owned workouts in one statement and fold them into fit, adaptation and plan versions."""
+    # Client-side ids keep this one INSERT (see plans._bulk_insert_workouts)
+    log_ids = [str(uuid.uuid4()) for _ in entries]
+    db.execute(
+        insert(SessionLog),
+        [
+            {
+                "id": log_id,
+                "user_id": user_id,
+                "workout_id": w.id,
+                "run_date": w.wdate,
+                "actual_distance_m": p.actual_distance_m,
+                "actual_time_sec": p.actual_time_sec,
+                "rpe": p.rpe,
+                "notes": p.notes,
+            }
+            for log_id, (w, p) in zip(log_ids, entries)
+        ],
+        execution_options={"render_nulls": True},
     )
-    db.add(log)
+    runs = RiegelFit()
+    for _, p in entries:
+        runs.add(p.actual_distance_m or 0, p.actual_time_sec or 0)
+    if runs.n:
+        fold_riegel_fit(db, user_id, runs)
+    today = date.today()
+    states = _lock_adaptation_states(db, {w.plan_id for w, _ in entries})
+    unlogged = _unlogged_key_dates(db, states, entries, today)
+    windows: dict[tuple[str, date, date], Sequence[Workout]] = {}
+    events: list[dict] = []
+    # The adaptation engine is incremental, so feed it in workout-date order.
+    for w, p in sorted(entries, key=lambda e: e[0].wdate):
+        events += _apply_adaptations(db, states[w.plan_id], w, p, today, unlogged[w.plan_id], windows)
+    if events:
+        # Core executemany: ORM flushes insert rows with server-side ids one at a time
+        db.execute(insert(AdaptationEvent), events)
+    # Every log bumps the plan's ETag version; adaptation may also have rewritten workouts
+    db.execute(update(Plan).where(Plan.id.in_({w.plan_id for w, _ in entries})).values(version=Plan.version + 1))
+    return log_ids
+
+
+def record_log_batch(db: Session, user_id: str, payload: LogBatchRequest) -> tuple[LogBatchOut, bool]:
+    """Record and commit the batch's logs; returns (per-item results, whether any log was recorded)."""
+    owned = _owned_workouts(db, user_id, {item.workout_id for item in payload.items})
+    found = [owned.get(_canonical_uuid(item.workout_id) or "") for item in payload.items]
+    entries = [(w, item) for w, item in zip(found, payload.items) if w is not None]
+    log_ids = iter(_record_logs(db, user_id, entries) if entries else [])
     db.commit()
+    out = LogBatchOut(
+        results=[
+            LogBatchResult(workout_id=item.workout_id, ok=True, log_id=next(log_ids))
+            if w is not None
+            else LogBatchResult(workout_id=item.workout_id, ok=False, error="Workout not found")
+            for w, item in zip(found, payload.items)
+        ]
+    )
+    return out, bool(entries)
+
+
+@router.post("/logs:batch", response_model=LogBatchOut)
+@query_budget(11)
+def log_workouts_batch(payload: LogBatchRequest, user: CurrentPrincipal, db: DbSession):
+    """Upload a backlog of logs (offline sync). Unknown or foreign workouts fail per item."""
+    out, recorded = record_log_batch(db, user.id, payload)
+    if recorded:
+        get_response_cache().invalidate(PLAN_SCOPE, user.id)
+    return out
+
+
+def record_log(db: Session, user_id: str, workout_id: str, payload: LogCreate) -> None:
+    """Record and commit one log; 404 for an unknown or foreign workout."""
+    w = _owned_workouts(db, user_id, [workout_id]).get(_canonical_uuid(workout_id) or "")
+    if not w:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    _record_logs(db, user_id, [(w, payload)])
+    db.commit()
+
+
+@router.post("/{workout_id}/log")
+@query_budget(11)
+def log_workout(workout_id: str, payload: LogCreate, user: CurrentPrincipal, db: DbSession):
+    record_log(db, user.id, workout_id, payload)
+    get_response_cache().invalidate(PLAN_SCOPE, user.id)
     return {"ok": True}
 
+
+_ADAPTED_FIELDS = ("wtype", "target_distance_m", "target_zone", "description", "is_key")
+
+
+def _lock_adaptation_states(db: Session, plan_ids: set[str]) -> dict[str, PlanAdaptationState]:
+    """Each plan's rule state row, locked in one SELECT ... FOR UPDATE; new rows for plans without one."""
+    rows = {
+        row.plan_id: row
+        for row in db.scalars(
+            select(PlanAdaptationState).where(PlanAdaptationState.plan_id.in_(plan_ids)).with_for_update()
+        )
+    }
+    for plan_id in plan_ids - rows.keys():
+        rows[plan_id] = PlanAdaptationState(plan_id=plan_id, state={})
+        db.add(rows[plan_id])
+    return rows
+
+
+def _unlogged_key_dates(
+    db: Session, states: dict[str, PlanAdaptationState], entries: Sequence[tuple[Workout, LogCreate]], as_of: date
+) -> dict[str, list[date]]:
+    """Unlogged key workout dates each plan's logs may count as missed, for the whole batch in one query.
+
+    A plan's cursor only moves forward through a date-ordered batch, so everything
+    its logs can ask for lies between the stored cursor and the latest horizon.
+    """
+    horizons: dict[str, date] = {}
+    starts: dict[str, date] = {}
+    for w, _ in entries:
+        horizons[w.plan_id] = max(min(w.wdate, as_of), horizons.get(w.plan_id, date.min))
+        starts[w.plan_id] = w.plan.start_date
+    ranges = []
+    for plan_id, until in horizons.items():
+        since = AdaptationState.from_dict(states[plan_id].state).cursor or starts[plan_id] - timedelta(days=1)
+        if until > since:
+            ranges.append(and_(Workout.plan_id == plan_id, Workout.wdate > since, Workout.wdate < until))
+    out: dict[str, list[date]] = {plan_id: [] for plan_id in states}
+    if ranges:
+        rows = db.execute(
+            select(Workout.plan_id, Workout.wdate)
+            .where(
+                or_(*ranges),
+                Workout.is_key.is_(True),
+                ~exists().where(SessionLog.workout_id == Workout.id),
+            )
+            .order_by(Workout.wdate)
+        )
+        for plan_id, wdate in rows:
+            out[plan_id].append(wdate)
+    return out
+
+
+def _apply_adaptations(
+    db: Session,
+    row: PlanAdaptationState,
+    w: Workout,
+    payload: LogCreate,
+    as_of: date,
+    unlogged: list[date],
+    windows: dict[tuple[str, date, date], Sequence[Workout]],
+) -> list[dict]:
+    """Advance the plan's rolling rule state (``row``, locked) by one log and rewrite only the workouts it affects.
+
+    ``unlogged`` comes from ``_unlogged_key_dates``; ``windows`` caches the workouts
+    of each adjusted date range across the batch. Returns the adaptation event rows to insert.
+    """
+    state = AdaptationState.from_dict(row.state)
+
+    missed: list[date] = []
+    horizon = min(w.wdate, as_of)
+    if state.cursor is None or horizon > state.cursor:
+        since = state.cursor or w.plan.start_date - timedelta(days=1)
+        missed = [d for d in unlogged if since < d < horizon]
+    session = LoggedSession(
+        wdate=w.wdate,
+        wtype=w.wtype,
+        is_key=w.is_key,
+        target_distance_m=w.target_distance_m,
+        actual_distance_m=payload.actual_distance_m,
+        rpe=payload.rpe,
+    )
+    events = []
+    for adj in evaluate_and_apply_adaptations(state, session, missed, as_of):
+        key = (w.plan_id, adj.start, adj.end)
+        if key not in windows:
+            windows[key] = db.scalars(
+                select(Workout)
+                .where(Workout.plan_id == w.plan_id, Workout.wdate >= adj.start, Workout.wdate <= adj.end)
+                .order_by(Workout.wdate)
+            ).all()
+        before, after = [], []
+        for target in windows[key]:
+            old = {f: getattr(target, f) for f in _ADAPTED_FIELDS}
+            new = adjusted_workout(old, adj)
+            for f in _ADAPTED_FIELDS:
+                setattr(target, f, new[f])
+            before.append({"id": target.id, "wdate": target.wdate.isoformat(), **old})
+            after.append({"id": target.id, "wdate": target.wdate.isoformat(), **new})
+        events.append(
+            {
+                "plan_id": w.plan_id,
+                "event_date": as_of,
+                "rule": adj.rule,
+                "before_state": {"volume_factor": 1.0, "workouts": before},
+                "after_state": {"volume_factor": adj.volume_factor, "workouts": after},
+            }
+        )
+    row.state = state.to_dict()
+    row.updated_at = func.now()
+    return events
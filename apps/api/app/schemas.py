@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import Annotated
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 
 # Auth
@@ -39,14 +38,14 @@ class CapabilityOut(BaseModel):
 # Goals
 class GoalCreate(BaseModel):
     distance_m: int = Field(ge=1000, le=100000)
-    target_time_sec: Optional[int] = Field(default=None, ge=300, le=200000)
+    target_time_sec: int | None = Field(default=None, ge=300, le=200000)
     target_date: date
 
 
 class GoalOut(BaseModel):
     id: str
     distance_m: int
-    target_time_sec: Optional[int]
+    target_time_sec: int | None
     target_date: date
 
 
@@ -56,18 +55,44 @@ class FeasibilityResult(BaseModel):
     tradeoffs: list[dict]
 
 
+class FeasibilitySweepRequest(BaseModel):
+    # Items are bounded like GoalCreate's fields
+    target_dates: list[date] = Field(min_length=1, max_length=104)
+    target_times_sec: list[Annotated[int, Field(ge=300, le=200000)] | None] = Field(
+        default=[None], min_length=1, max_length=64
+    )
+    distances_m: list[Annotated[int, Field(ge=1000, le=100000)]] = Field(min_length=1, max_length=8)
+
+
+class FeasibilitySurfaceOut(BaseModel):
+    distance_m: int
+    weeks_needed: int
+    best_case_time_sec: int
+    feasible: list[list[bool]]  # [date index][time index]
+
+
+class FeasibilitySweepOut(BaseModel):
+    target_dates: list[date]
+    target_times_sec: list[int | None]
+    surfaces: list[FeasibilitySurfaceOut]
+
+
 # Plans & Workouts
-class WorkoutOut(BaseModel):
-    id: str
+class WorkoutDraftOut(BaseModel):
+    id: str | None = None  # not yet written
     wdate: date
     wtype: str
-    target_distance_m: Optional[int]
-    target_duration_sec: Optional[int]
-    target_zone: Optional[str]
-    description: Optional[str]
+    target_distance_m: int | None
+    target_duration_sec: int | None
+    target_zone: str | None
+    description: str | None
     is_key: bool
 
 
+class WorkoutOut(WorkoutDraftOut):
+    id: str
+
+
 class PlanOut(BaseModel):
     id: str
     start_date: date
@@ -76,9 +101,108 @@ class PlanOut(BaseModel):
     workouts: list[WorkoutOut]
 
 
+class PlanDiffOut(BaseModel):
+    plan_id: str
+    version: int
+    from_date: date
+    applied: bool
+    inserted: list[WorkoutDraftOut]
+    updated: list[WorkoutOut]
+    deleted: list[str]
+    unchanged: int
+
+
+class PlanJobOut(BaseModel):
+    job_id: str
+    status: str  # rq job status: queued, started, finished, failed, ...
+    plan_id: str | None = None
+    error: str | None = None
+
+
+class CalendarSubscriptionOut(BaseModel):
+    url: str
+    expires_at: datetime
+
+
+# Bounds on /plans/generate-batch work; plans have four rows per week.
+PLAN_BATCH_MAX_WEEKS = 104
+PLAN_BATCH_MAX_TOTAL_WEEKS = 50_000
+
+
+def _plan_weeks(start: date, end: date) -> int:
+    return max(1, (end - start).days // 7)
+
+
+class PlanBatchItem(BaseModel):
+    goal_distance_m: int = Field(ge=1000, le=100000)
+    comfortable_distance_m: int = Field(ge=500, le=100000)
+    start_date: date
+    end_date: date
+
+    @model_validator(mode="after")
+    def _check_dates(self) -> PlanBatchItem:
+        if self.end_date <= self.start_date:
+            raise ValueError("end_date must be after start_date")
+        if _plan_weeks(self.start_date, self.end_date) > PLAN_BATCH_MAX_WEEKS:
+            raise ValueError(f"a plan may span at most {PLAN_BATCH_MAX_WEEKS} weeks")
+        return self
+
+
+class PlanBatchRequest(BaseModel):
+    items: list[PlanBatchItem] = Field(min_length=1, max_length=10000)
+
+    @model_validator(mode="after")
+    def _check_total_weeks(self) -> PlanBatchRequest:
+        if sum(_plan_weeks(i.start_date, i.end_date) for i in self.items) > PLAN_BATCH_MAX_TOTAL_WEEKS:
+            raise ValueError(f"a batch may span at most {PLAN_BATCH_MAX_TOTAL_WEEKS} plan weeks in total")
+        return self
+
+
+class WorkoutBatchOut(BaseModel):
+    """Columnar workouts; plan ``i`` owns rows ``offsets[i]:offsets[i + 1]``."""
+
+    offsets: list[int]
+    wdate: list[date]
+    wtype: list[str]
+    target_distance_m: list[int]
+    target_zone: list[str]
+    description: list[str]
+    is_key: list[bool]
+
+
 class LogCreate(BaseModel):
-    actual_distance_m: Optional[int] = Field(default=None, ge=0)
-    actual_time_sec: Optional[int] = Field(default=None, ge=0)
-    rpe: Optional[int] = Field(default=None, ge=1, le=10)
-    notes: Optional[str] = None
+    actual_distance_m: int | None = Field(default=None, ge=0)
+    actual_time_sec: int | None = Field(default=None, ge=0)
+    rpe: int | None = Field(default=None, ge=1, le=10)
+    notes: str | None = None
 
+
+class LogBatchItem(LogCreate):
+    workout_id: str
+
+
+class LogBatchRequest(BaseModel):
+    items: list[LogBatchItem] = Field(min_length=1, max_length=500)
+
+
+class LogBatchResult(BaseModel):
+    workout_id: str
+    ok: bool
+    log_id: str | None = None
+    error: str | None = None
+
+
+class LogBatchOut(BaseModel):
+    # One result per request item, in request order
+    results: list[LogBatchResult]
+
+
+class ImportJobOut(BaseModel):
+    job_id: str
+    status: str
+    parsed: int = 0
+    matched: int = 0
+    unplanned: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    error: str | None = None
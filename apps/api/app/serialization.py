@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+from .models import Workout
+from .schemas import WorkoutOut
+
+
+# Reads select only the columns in WorkoutOut and hand the rows to orjson, skipping
+# ORM hydration and Pydantic validation. Output matches WorkoutOut.model_dump_json
+# byte for byte (field order, ISO dates, compact separators).
+WORKOUT_FIELDS: tuple[str, ...] = tuple(WorkoutOut.model_fields)
+WORKOUT_COLUMNS = tuple(getattr(Workout, f) for f in WORKOUT_FIELDS)
+
+
+def workout_dicts(rows: Iterable[Sequence[Any]]) -> list[dict[str, Any]]:
+    """Rows selected as ``WORKOUT_COLUMNS`` → plain dicts keyed like ``WorkoutOut``."""
+    return [dict(zip(WORKOUT_FIELDS, row)) for row in rows]
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj)
+
+
+def ndjson_lines(rows: Iterable[Sequence[Any]]) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(WORKOUT_FIELDS, row))) + b"\n" for row in rows)
+
+
+def json_response(body: bytes, status_code: int = 200, etag: str | None = None) -> Response:
+    headers = {"ETag": etag} if etag else None
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """RFC 9110 weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def pack_tagged(etag: str, body: bytes) -> bytes:
+    """Store a body with its ETag in one cache value (tags never contain a newline)."""
+    return etag.encode() + b"\n" + body
+
+
+def unpack_tagged(value: bytes) -> tuple[str, bytes]:
+    etag, _, body = value.partition(b"\n")
+    return etag.decode(), body
+
+
+def tagged_response(value: bytes, if_none_match: str | None) -> Response:
+    """Answer from a ``pack_tagged`` cache value: 304 when the client's copy is current."""
+    etag, body = unpack_tagged(value)
+    return not_modified(etag) if etag_matches(if_none_match, etag) else json_response(body, etag=etag)
@@ -0,0 +1,8 @@
+"""Helpers shared by the benchmark scripts."""
+from __future__ import annotations
+
+
+def pct(values: list[float], p: float) -> float:
+    """Nearest-rank ``p`` quantile (0-1) of ``values``."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
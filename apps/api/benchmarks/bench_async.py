@@ -0,0 +1,105 @@
+"""Throughput of the sync and async (DB_ASYNC=1) request paths under high concurrency.
+
+Starts ``uvicorn app.asgi:app`` once per mode against ``DATABASE_URL`` (response
+cache off, so every request reaches Postgres), seeds one user with a plan, then
+drives ``GET --path`` (default ``/plans/current``) with N concurrent connections.
+
+    python -m benchmarks.bench_async --concurrency 500 --requests 5000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+import httpx
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(base: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base}/healthz").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def _seed(base: str) -> tuple[dict[str, str], str]:
+    """Register a user with a capability snapshot and an active plan; return (auth headers, email)."""
+    email = f"bench-{uuid.uuid4().hex}@example.com"
+    tokens = httpx.post(f"{base}/auth/register", json={"email": email, "password": "benchmark1", "age": 30, "sex": "other"}).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    today = date.today()
+    httpx.post(f"{base}/capability", headers=headers, json={"date": str(today), "comfortable_distance_m": 5000, "comfortable_time_sec": 1800})
+    goal = httpx.post(f"{base}/goals", headers=headers, json={"distance_m": 21097, "target_date": str(today + timedelta(weeks=16))}).json()
+    httpx.post(f"{base}/plans/goals/{goal['id']}/generate-plan", headers=headers, timeout=30)
+    return headers, email
+
+
+async def _drive(base: str, path: str, headers: dict[str, str], concurrency: int, total: int) -> tuple[float, int]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    errors = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async with httpx.AsyncClient(base_url=base, headers=headers, limits=limits, timeout=60) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                try:
+                    r = await client.get(path)
+                    errors += r.status_code != 200
+                except httpx.HTTPError as exc:
+                    print(f"  {type(exc).__name__}: {exc}", file=sys.stderr) if not errors else None
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - t0, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--path", default="/plans/current")
+    args = parser.parse_args()
+
+    print(f"{'mode':>6} {'req/s':>8} {'errors':>7}")
+    for mode, flag in (("sync", "0"), ("async", "1")):
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        env = {**os.environ, "DB_ASYNC": flag, "RESPONSE_CACHE": "off"}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.asgi:app", "--port", str(port), "--log-level", "warning"], env=env
+        )
+        try:
+            _wait_ready(base)
+            headers, _ = _seed(base)
+            elapsed, errors = asyncio.run(_drive(base, args.path, headers, args.concurrency, args.requests))
+            print(f"{mode:>6} {args.requests / elapsed:>8.0f} {errors:>7}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
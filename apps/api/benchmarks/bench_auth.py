@@ -0,0 +1,80 @@
+"""Requests/sec on an authenticated no-op route, before and after the principal fast path.
+
+"before" decodes the JWT and loads the ``User`` row on every request (the old
+``get_current_user``); "after" uses ``CurrentPrincipal`` (cached token
+verification, no DB). Requires a migrated database at ``DATABASE_URL``.
+
+    python -m benchmarks.bench_auth --requests 2000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+
+from typing import Annotated
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.auth.dependencies import BearerCredentials, CurrentPrincipal
+from app.auth.jwt import create_token, decode_token
+from app.db import get_sessionmaker
+from app.models import User
+from app.routers import DbSession
+
+
+def _legacy_current_user(cred: BearerCredentials, db: DbSession) -> User:
+    if cred is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    payload = decode_token(cred.credentials)
+    user = db.get(User, payload.get("sub"))
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before")
+    def before(user: Annotated[User, Depends(_legacy_current_user)]):
+        return {"ok": True}
+
+    @app.get("/after")
+    def after(user: CurrentPrincipal):
+        return {"ok": True}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    with get_sessionmaker()() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex}@example.com", password_hash="x", age=30, sex="other")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    headers = {"Authorization": f"Bearer {create_token(user_id, 3600, 'access')}"}
+
+    try:
+        with TestClient(_app()) as client:
+            for path in ("/before", "/after"):
+                for _ in range(50):  # warm pool and caches
+                    client.get(path, headers=headers)
+                t0 = time.perf_counter()
+                for _ in range(args.requests):
+                    client.get(path, headers=headers)
+                elapsed = time.perf_counter() - t0
+                print(f"{path:>8} {args.requests / elapsed:>10.0f} req/s")
+    finally:
+        with get_sessionmaker()() as db:
+            db.delete(db.get(User, user_id))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
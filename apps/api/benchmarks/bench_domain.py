@@ -0,0 +1,256 @@
+"""Time and allocations per call of the domain layer, gated against stored baselines.
+
+Scenarios draw a seeded population of runners (comfortable runs of 2-21 km at
+4:00-8:00/km) with goals from 5K to 160K and plans of 4 to 104 weeks, then call
+``generate_plan``, ``assess_feasibility``, ``sweep_feasibility``, ``riegel_predict``,
+``derive_zones`` and ``routers.capability._projection`` once per runner. Each case
+reports its best time per call, that time relative to a fixed reference workload
+run just before it, and the median per-call peak of traced memory.
+
+Compares against ``benchmarks/baselines/domain.json`` and exits non-zero when a
+case's relative time or peak memory exceeds the baseline by more than the
+thresholds. Gating on relative time keeps the baseline usable across machines
+and under load; rerun with ``--save`` after an intended change. Per-call figures
+depend on the population, so a ``--users`` other than the baseline's only reports.
+
+    python -m benchmarks.bench_domain                 # compare against baseline
+    python -m benchmarks.bench_domain --save          # record a new baseline
+    python -m benchmarks.bench_domain --only plan     # gate one family of cases
+    python -m benchmarks.bench_domain --users 200     # quicker run, not gated
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.domain.feasibility import assess_feasibility, sweep_feasibility
+from app.domain.planner import PlanSpec, generate_plan
+from app.domain.projection import riegel_predict
+from app.domain.zones import derive_zones
+from app.routers.capability import _projection
+
+
+BASELINE = Path(__file__).parent / "baselines" / "domain.json"
+DISTANCES_M = (5000, 10000, 21097, 42195, 50000, 100000, 160934)
+PLAN_WEEKS = (4, 16, 52, 104)
+TODAY = date(2025, 1, 6)
+# Calls per case sampled for the allocation measurement (tracemalloc is slow).
+ALLOC_SAMPLE = 50
+
+
+@dataclass(frozen=True)
+class Runner:
+    comfortable_distance_m: int
+    comfortable_time_sec: int
+    goal_distance_m: int
+    weeks: int
+    target_time_sec: int | None
+
+
+@dataclass(frozen=True)
+class Result:
+    us_per_call: float
+    relative: float  # time per call / time of one _reference() run
+    peak_kib: float
+
+
+def runners(n: int, seed: int = 0) -> list[Runner]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        distance = rng.randrange(2000, 21001, 500)
+        goal = rng.choice(DISTANCES_M)
+        out.append(
+            Runner(
+                comfortable_distance_m=distance,
+                comfortable_time_sec=int(distance / 1000 * rng.uniform(240, 480)),
+                goal_distance_m=goal,
+                weeks=rng.randint(4, 104),
+                target_time_sec=rng.choice([None, int(goal / 1000 * rng.uniform(210, 480))]),
+            )
+        )
+    return out
+
+
+def _plan(r: Runner, weeks: int) -> Callable[[], object]:
+    spec = PlanSpec(start_date=TODAY, end_date=TODAY + timedelta(weeks=weeks), running_days_per_week=4, phases={})
+    vol = max(r.comfortable_distance_m * 3.0, 10000)
+    return lambda: generate_plan(goal_distance_m=r.goal_distance_m, start_weekly_vol=vol, cap_growth=0.10, spec=spec)
+
+
+def _feasibility(r: Runner) -> Callable[[], object]:
+    return lambda: assess_feasibility(
+        today=TODAY,
+        target_date=TODAY + timedelta(weeks=r.weeks),
+        goal_distance_m=r.goal_distance_m,
+        target_time_sec=r.target_time_sec,
+        comfortable_distance_m=r.comfortable_distance_m,
+        comfortable_time_sec=r.comfortable_time_sec,
+    )
+
+
+_SWEEP_DATES = [TODAY + timedelta(weeks=w) for w in range(4, 105, 4)]
+_SWEEP_TIMES = [None] + list(range(1200, 36001, 1200))
+
+
+def _sweep(r: Runner) -> Callable[[], object]:
+    return lambda: sweep_feasibility(
+        today=TODAY,
+        target_dates=_SWEEP_DATES,
+        target_times_sec=_SWEEP_TIMES,
+        goal_distances_m=DISTANCES_M,
+        comfortable_distance_m=r.comfortable_distance_m,
+        comfortable_time_sec=r.comfortable_time_sec,
+    )
+
+
+def _riegel(r: Runner) -> Callable[[], object]:
+    return lambda: riegel_predict(r.comfortable_time_sec, r.comfortable_distance_m, r.goal_distance_m, k=1.06)
+
+
+def _zones(r: Runner) -> Callable[[], object]:
+    t10k = riegel_predict(r.comfortable_time_sec, r.comfortable_distance_m, 10000, k=1.06)
+    return lambda: derive_zones(t10k)
+
+
+def _capability(r: Runner) -> Callable[[], object]:
+    return lambda: _projection(r.comfortable_distance_m, r.comfortable_time_sec, 1.06)
+
+
+def cases(population: list[Runner]) -> dict[str, list[Callable[[], object]]]:
+    out = {f"generate_plan/{w}w": [_plan(r, w) for r in population] for w in PLAN_WEEKS}
+    out["generate_plan/mixed"] = [_plan(r, r.weeks) for r in population]
+    out["assess_feasibility"] = [_feasibility(r) for r in population]
+    out["sweep_feasibility/26x31x7"] = [_sweep(r) for r in population]
+    out["riegel_predict"] = [_riegel(r) for r in population]
+    out["derive_zones"] = [_zones(r) for r in population]
+    out["capability_projection"] = [_capability(r) for r in population]
+    return out
+
+
+def _reference() -> None:
+    # Fixed pure-Python workload; case timings are reported relative to it
+    acc = 0
+    for i in range(2000):
+        acc += i * i % 7
+    [str(i) for i in range(200)]
+
+
+def _time(calls: list[Callable[[], object]]) -> float:
+    t0 = time.perf_counter()
+    for call in calls:
+        call()
+    return (time.perf_counter() - t0) / len(calls)
+
+
+def measure(calls: list[Callable[[], object]], repeat: int) -> Result:
+    ref = [_reference] * max(50, len(calls) // 10)
+    ratios, best = [], float("inf")
+    for _ in range(repeat):
+        # Interleave so both sides see the same machine load
+        t_ref = _time(ref)
+        t_case = _time(calls)
+        best = min(best, t_case)
+        ratios.append(t_case / t_ref)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for call in calls[:ALLOC_SAMPLE]:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return Result(us_per_call=best * 1e6, relative=min(ratios), peak_kib=statistics.median(peaks) / 1024)
+
+
+def compare(
+    baseline: dict[str, dict], results: dict[str, Result], time_threshold: float, alloc_threshold: float
+) -> list[str]:
+    """Regression messages for cases beyond a threshold (fractions, e.g. 0.25 = +25%)."""
+    failures = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if res.relative > base["relative"] * (1 + time_threshold):
+            failures.append(f"{name}: {res.relative:.4f} x reference vs baseline {base['relative']:.4f}")
+        # Small absolute slack so sub-KiB cases don't trip on allocator noise
+        if res.peak_kib > base["peak_kib"] * (1 + alloc_threshold) + 0.5:
+            failures.append(f"{name}: {res.peak_kib:.1f} KiB peak vs baseline {base['peak_kib']:.1f}")
+    return failures
+
+
+def _delta(current: float, base: dict | None, key: str) -> str:
+    if not base or not base.get(key):
+        return "new"
+    return f"{(current / base[key] - 1) * 100:+.0f}%"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--only", default="", help="run cases whose name contains this")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--time-threshold", type=float, default=0.25)
+    parser.add_argument("--alloc-threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"cases": {}}
+    baseline = stored["cases"]
+    other_population = stored.get("users", args.users) != args.users
+    if other_population:
+        # A different population draws different plans; its cases aren't comparable
+        baseline = {}
+    results: dict[str, Result] = {}
+    print(f"{args.users} runners, best of {args.repeat}")
+    print(f"{'case':<28} {'us/call':>10} {'x ref':>8} {'Δ':>6} {'peak KiB':>9} {'Δ':>6}")
+    for name, calls in cases(runners(args.users)).items():
+        if args.only not in name:
+            continue
+        res = results[name] = measure(calls, args.repeat)
+        base = baseline.get(name)
+        print(
+            f"{name:<28} {res.us_per_call:>10.2f} {res.relative:>8.4f} {_delta(res.relative, base, 'relative'):>6}"
+            f" {res.peak_kib:>9.1f} {_delta(res.peak_kib, base, 'peak_kib'):>6}"
+        )
+
+    if args.save:
+        merged = dict(baseline)
+        for name, res in results.items():
+            merged[name] = {
+                "us_per_call": round(res.us_per_call, 3),
+                "relative": round(res.relative, 5),
+                "peak_kib": round(res.peak_kib, 2),
+            }
+        payload = {"python": platform.python_version(), "machine": platform.machine(), "users": args.users, "cases": merged}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return
+    if stored.get("python") and stored["python"].rsplit(".", 1)[0] != platform.python_version().rsplit(".", 1)[0]:
+        print(f"note: baseline recorded on Python {stored['python']}; allocation figures may differ")
+    if other_population:
+        print(f"warning: baseline recorded with --users {stored['users']}; not comparing")
+        return
+    failures = compare(baseline, results, args.time_threshold, args.alloc_threshold)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
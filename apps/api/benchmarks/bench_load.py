@@ -0,0 +1,273 @@
+"""Per-route latency, throughput and DB queries per request under a realistic request mix.
+
+Drives ``create_app()`` in-process through ``httpx.ASGITransport`` (no server or
+network in the way) against the database at ``DATABASE_URL``. Each virtual user
+onboards (register, login, capability, goal, feasibility, generate-plan), then
+makes ``--iterations`` requests drawn from ``--mix`` (current plan, log workout,
+feasibility, capability, login). ``--concurrency`` users run at once.
+
+Reports requests/s overall and per route n, errors, p50/p95/p99 and SQL
+statements per request, counted with ``app.metrics.count_queries``.
+The app runs with the current environment, so set e.g. ``DB_ASYNC=1`` or
+``RESPONSE_CACHE=off`` to measure those modes. ``--json`` writes the results and
+``--compare`` prints the change against an earlier ``--json`` file (e.g. from
+main). Synthetic users are deleted afterwards.
+
+    python -m benchmarks.bench_load --users 50 --iterations 20 --json /tmp/branch.json
+    python -m benchmarks.bench_load --users 50 --iterations 20 --compare /tmp/main.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+from sqlalchemy import delete
+
+from app.config import get_settings
+from app.db import get_sessionmaker
+from app.main import create_app
+from app.metrics import count_queries, instrument_engines
+from app.models import User
+
+from ._stats import pct
+
+
+PASSWORD = "benchmark1"
+DEFAULT_MIX = "current_plan=60,log_workout=20,feasibility=10,capability=5,login=5"
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.queries: dict[str, list[int]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def call(
+        self, client: httpx.AsyncClient, route: str, path: str, expect: int = 200, **kw
+    ) -> httpx.Response:
+        """Send ``route``'s method to ``path``, recording latency and statements under ``route``."""
+        # ASGITransport runs the app in this task, so the request's statements land here
+        with count_queries() as stats:
+            t0 = time.perf_counter()
+            resp = await client.request(route.split(" ", 1)[0], path, **kw)
+            self.latencies[route].append(time.perf_counter() - t0)
+        self.queries[route].append(stats.queries)
+        if resp.status_code != expect:
+            if not self.errors[route]:
+                print(f"  {route}: {resp.status_code} {resp.text[:200]}", file=sys.stderr)
+            self.errors[route] += 1
+        return resp
+
+    def report(self) -> dict[str, dict]:
+        out = {}
+        for route in sorted(self.latencies):
+            lat, queries = self.latencies[route], self.queries[route]
+            out[route] = {
+                "n": len(lat),
+                "errors": self.errors[route],
+                "p50_ms": round(pct(lat, 0.50) * 1e3, 2),
+                "p95_ms": round(pct(lat, 0.95) * 1e3, 2),
+                "p99_ms": round(pct(lat, 0.99) * 1e3, 2),
+                "queries_mean": round(sum(queries) / len(queries), 2),
+                "queries_max": max(queries),
+            }
+        return out
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in STEADY_ACTIONS or not weight.isdigit():
+            raise SystemExit(f"bad --mix entry {part!r}; actions: {', '.join(STEADY_ACTIONS)}")
+        mix[name] = int(weight)
+    return mix
+
+
+class VirtualUser:
+    def __init__(self, rec: Recorder, client: httpx.AsyncClient, email: str, rng: random.Random) -> None:
+        self.rec, self.client, self.email, self.rng = rec, client, email, rng
+        self.headers: dict[str, str] = {}
+        self.goal_id = ""
+        self.workout_ids: list[str] = []
+
+    async def onboard(self) -> None:
+        today = date.today()
+        body = {"email": self.email, "password": PASSWORD, "age": self.rng.randint(18, 70), "sex": "other"}
+        await self.rec.call(self.client, "POST /auth/register", "/auth/register", json=body)
+        await self.login()
+        await self.capability()
+        goal = await self.rec.call(
+            self.client,
+            "POST /goals",
+            "/goals",
+            headers=self.headers,
+            json={
+                "distance_m": self.rng.choice([5000, 10000, 21097, 42195]),
+                "target_date": str(today + timedelta(weeks=16)),
+            },
+        )
+        self.goal_id = goal.json()["id"]
+        await self.feasibility()
+        plan = await self.rec.call(
+            self.client,
+            "POST /plans/goals/{goal_id}/generate-plan",
+            f"/plans/goals/{self.goal_id}/generate-plan",
+            headers=self.headers,
+        )
+        self.workout_ids = [w["id"] for w in plan.json()["workouts"] if w["wtype"] != "rest"]
+
+    async def login(self) -> None:
+        body = {"email": self.email, "password": PASSWORD}
+        resp = await self.rec.call(self.client, "POST /auth/login", "/auth/login", json=body)
+        self.headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    async def capability(self) -> None:
+        distance = self.rng.randrange(3000, 15001, 500)
+        body = {
+            "date": str(date.today()),
+            "comfortable_distance_m": distance,
+            "comfortable_time_sec": int(distance / 1000 * self.rng.uniform(270, 420)),
+        }
+        await self.rec.call(self.client, "POST /capability", "/capability", headers=self.headers, json=body)
+
+    async def feasibility(self) -> None:
+        await self.rec.call(
+            self.client, "POST /goals/{goal_id}/feasibility", f"/goals/{self.goal_id}/feasibility", headers=self.headers
+        )
+
+    async def current_plan(self) -> None:
+        await self.rec.call(self.client, "GET /plans/current", "/plans/current", headers=self.headers)
+
+    async def log_workout(self) -> None:
+        if not self.workout_ids:
+            return
+        workout_id = self.workout_ids.pop(0)
+        body = {
+            "actual_distance_m": self.rng.randrange(3000, 12001, 100),
+            "actual_time_sec": self.rng.randrange(900, 4200),
+            "rpe": self.rng.randint(3, 8),
+        }
+        await self.rec.call(
+            self.client, "POST /workouts/{workout_id}/log", f"/workouts/{workout_id}/log", headers=self.headers, json=body
+        )
+
+
+STEADY_ACTIONS = {
+    "current_plan": VirtualUser.current_plan,
+    "log_workout": VirtualUser.log_workout,
+    "feasibility": VirtualUser.feasibility,
+    "capability": VirtualUser.capability,
+    "login": VirtualUser.login,
+}
+
+
+async def run(
+    prefix: str, users: int, iterations: int, concurrency: int, mix: dict[str, int], seed: int
+) -> tuple[Recorder, float]:
+    """Run ``users`` virtual users with emails ``{prefix}-{i}@example.com``."""
+    app = create_app()
+    rec = Recorder()
+    names, weights = list(mix), list(mix.values())
+    slots = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async def session(i: int, client: httpx.AsyncClient) -> None:
+        rng = random.Random(seed + i)
+        async with slots:
+            vu = VirtualUser(rec, client, f"{prefix}-{i}@example.com", rng)
+            await vu.onboard()
+            for name in rng.choices(names, weights, k=iterations):
+                await STEADY_ACTIONS[name](vu)
+
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client,
+    ):
+        t0 = time.perf_counter()
+        await asyncio.gather(*(session(i, client) for i in range(users)))
+        wall = time.perf_counter() - t0
+    return rec, wall
+
+
+def _cleanup(prefix: str) -> None:
+    with get_sessionmaker()() as db:
+        db.execute(delete(User).where(User.email.like(f"{prefix}-%")))
+        db.commit()
+
+
+def _print(report: dict[str, dict], previous: dict[str, dict]) -> None:
+    print(f"{'route':<42} {'n':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for route, r in report.items():
+        print(
+            f"{route:<42} {r['n']:>6} {r['errors']:>4} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+            f" {r['queries_mean']:>8.1f}"
+        )
+        old = previous.get(route)
+        if old:
+            deltas = " ".join(
+                f"{(r[k] / old[k] - 1) * 100:>+7.0f}%" if old[k] else f"{'-':>8}" for k in ("p50_ms", "p95_ms", "p99_ms")
+            )
+            print(f"{'  vs compare':<42} {'':>6} {'':>4} {deltas} {r['queries_mean'] - old['queries_mean']:>+8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=20, help="steady-state requests per user after onboarding")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="action=weight,... for the steady-state requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--compare", type=Path, help="earlier --json output to diff against")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    settings = get_settings()
+    instrument_engines()
+    prefix = f"bench-load-{time.time_ns()}"
+    try:
+        rec, wall = asyncio.run(run(prefix, args.users, args.iterations, args.concurrency, mix, args.seed))
+    finally:
+        _cleanup(prefix)
+
+    report = rec.report()
+    total = sum(r["n"] for r in report.values())
+    result = {
+        "config": {
+            **vars(args),
+            "json": None,
+            "compare": None,
+            "db_async": settings.db_async,
+            "response_cache": settings.response_cache,
+            "cpus": os.cpu_count(),
+        },
+        "requests": total,
+        "errors": sum(r["errors"] for r in report.values()),
+        "wall_sec": round(wall, 3),
+        "throughput_rps": round(total / wall, 1),
+        "routes": report,
+    }
+    previous = json.loads(args.compare.read_text()) if args.compare else {}
+    mode = "async" if settings.db_async else "sync"
+    print(f"{args.users} users x {args.iterations} iterations, concurrency {args.concurrency}, {mode} DB")
+    _print(report, previous.get("routes", {}))
+    line = f"{total} requests in {wall:.2f}s: {result['throughput_rps']:.1f} req/s, {result['errors']} errors"
+    if previous:
+        line += f" ({(result['throughput_rps'] / previous['throughput_rps'] - 1) * 100:+.0f}% vs compare)"
+    print(line)
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""p99 of a non-auth endpoint while a login storm is running.
+
+Starts ``uvicorn app.asgi:app`` with inline hashing (PASSWORD_HASH_WORKERS=0) and
+with the hashing process pool, fires ``--logins`` concurrent logins and meanwhile
+polls ``GET /capability/latest``; reports probe latency percentiles and how many
+logins were rejected with 503. Requires a migrated database at ``DATABASE_URL``.
+
+    python -m benchmarks.bench_login_storm --logins 200 --concurrency 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from ._stats import pct
+from .bench_async import _free_port, _seed, _wait_ready
+
+
+async def _storm(base: str, headers: dict[str, str], email: str, logins: int, concurrency: int):
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=120) as client:
+        remaining = logins
+        statuses: list[int] = []
+        probe_latencies: list[float] = []
+        done = asyncio.Event()
+
+        async def login_worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                r = await client.post("/auth/login", json={"email": email, "password": "benchmark1"})
+                statuses.append(r.status_code)
+
+        async def probe() -> None:
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await client.get("/capability/latest", headers=headers)
+                probe_latencies.append(time.perf_counter() - t0)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+        done.set()
+        await probe_task
+        return probe_latencies, statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'hashing':>8} {'probe p50 ms':>13} {'probe p99 ms':>13} {'logins ok':>10} {'503s':>6}")
+    for mode, workers in (("inline", "0"), ("pool", os.getenv("PASSWORD_HASH_WORKERS", "2"))):
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        env = {**os.environ, "PASSWORD_HASH_WORKERS": workers}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.asgi:app", "--port", str(port), "--log-level", "warning"], env=env
+        )
+        try:
+            _wait_ready(base)
+            headers, email = _seed(base)
+            probes, statuses = asyncio.run(_storm(base, headers, email, args.logins, args.concurrency))
+            print(
+                f"{mode:>8} {pct(probes, 0.5) * 1e3:>13.1f} {pct(probes, 0.99) * 1e3:>13.1f} "
+                f"{statuses.count(200):>10} {statuses.count(503):>6}"
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
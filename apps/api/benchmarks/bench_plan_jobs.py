@@ -0,0 +1,140 @@
+"""Throughput of async plan generation (``generate-plan?async=true``) by rq worker count.
+
+For each worker count, enqueues one full-generation job per synthetic user on the
+"plans" queue, starts that many ``rq worker --burst`` processes and reports jobs/s
+and per-job latency. Requires a migrated database at ``DATABASE_URL`` and Redis at
+``REDIS_URL``. Without Redis, ``--fake`` runs the workers as threads in this
+process on a shared fakeredis; that measures the database side of scaling only,
+since the workers then share one GIL. Synthetic users are deleted afterwards.
+
+    python -m benchmarks.bench_plan_jobs --jobs 200 --workers 1 2 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import delete
+
+from app.current_state import record_snapshot
+from app.db import get_sessionmaker
+from app.models import CapabilitySnapshot, Goal, User
+
+
+def _thread_workers(queue, n: int) -> list[threading.Thread]:
+    """``n`` burst SimpleWorkers on threads sharing the queue's (fake) Redis server."""
+    from rq import SimpleWorker
+    from rq.timeouts import TimerDeathPenalty
+
+    class _ThreadWorker(SimpleWorker):
+        # Signals (handlers, SIGALRM job timeouts) only work on the main thread
+        death_penalty_class = TimerDeathPenalty
+
+        def _install_signal_handlers(self) -> None:
+            pass
+
+    return [
+        threading.Thread(target=_ThreadWorker([queue], connection=queue.connection).work, kwargs={"burst": True})
+        for _ in range(n)
+    ]
+
+
+def _seed(n: int, weeks: int) -> list[tuple[str, str]]:
+    """``n`` users, each with a snapshot and a goal; returns (user_id, goal_id) pairs."""
+    today = date.today()
+    pairs = []
+    with get_sessionmaker()() as db:
+        for i in range(n):
+            user = User(email=f"bench-jobs-{time.time_ns()}-{i}@example.com", password_hash="x", age=30, sex="other")
+            db.add(user)
+            db.flush()
+            snap = CapabilitySnapshot(
+                user_id=user.id, date=today, comfortable_distance_m=8000, comfortable_time_sec=2700, projection={}
+            )
+            goal = Goal(user_id=user.id, distance_m=42195, target_date=today + timedelta(weeks=weeks))
+            db.add_all([snap, goal])
+            db.flush()
+            record_snapshot(db, user.id, snap)
+            pairs.append((user.id, goal.id))
+        db.commit()
+    return pairs
+
+
+def _cleanup(user_ids: list[str]) -> None:
+    with get_sessionmaker()() as db:
+        db.execute(delete(User).where(User.id.in_(user_ids)))
+        db.commit()
+
+
+def _run(pairs: list[tuple[str, str]], workers: int, connection, redis_url: str | None) -> tuple[float, float, float]:
+    from rq import Queue
+
+    queue = Queue("plans", connection=connection)
+    jobs = [
+        queue.enqueue("app.plan_jobs.run_plan_generation", user_id, goal_id, "full", meta={"user_id": user_id})
+        for user_id, goal_id in pairs
+    ]
+    t0 = time.perf_counter()
+    if redis_url is None:
+        threads = _thread_workers(queue, workers)
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    else:
+        procs = [
+            subprocess.Popen(
+                [sys.executable, "-m", "rq.cli", "worker", "plans", "--burst", "--quiet", "--url", redis_url],
+                env={**os.environ, "REDIS_URL": redis_url},
+                stdout=subprocess.DEVNULL,
+            )
+            for _ in range(workers)
+        ]
+        for p in procs:
+            p.wait()
+    wall = time.perf_counter() - t0
+    for job in jobs:
+        job.refresh()
+    failed = [j for j in jobs if j.get_status() != "finished"]
+    if failed:
+        raise SystemExit(f"{len(failed)} jobs did not finish, e.g. {failed[0].id}: {failed[0].get_status()}")
+    latencies = sorted((j.ended_at - j.started_at).total_seconds() for j in jobs)
+    return wall, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--weeks", type=int, default=26)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--fake", action="store_true", help="thread workers on an in-process fakeredis")
+    args = parser.parse_args()
+
+    if args.fake:
+        import fakeredis
+
+        connection, redis_url = fakeredis.FakeStrictRedis(), None
+    else:
+        from redis import Redis
+
+        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        connection = Redis.from_url(redis_url)
+    pairs = _seed(args.jobs, args.weeks)
+    try:
+        print(f"{args.jobs} jobs x {args.weeks}-week plans, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'wall s':>8} {'jobs/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for n in args.workers:
+            wall, p50, p95 = _run(pairs, n, connection, redis_url)
+            print(f"{n:>8} {wall:>8.2f} {args.jobs / wall:>8.1f} {p50 * 1e3:>8.1f} {p95 * 1e3:>8.1f}")
+    finally:
+        _cleanup([user_id for user_id, _ in pairs])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Query count and latency of persisting a generated plan against a local Postgres.
+
+Compares the per-row ``db.add`` + refresh + re-select path with the bulk
+``INSERT ... RETURNING`` path used by ``generate_plan_for_goal``. Statements are
+counted at the cursor, so a bulk path that SQLAlchemy splits into per-row
+INSERTs shows up; the run fails unless the bulk path is a single statement. Rest
+days are mixed in so rows with different NULL columns are covered. Requires a
+migrated database at ``DATABASE_URL``; all rows are rolled back.
+
+    python -m benchmarks.bench_plan_writes --weeks 26 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import event, select
+
+from app.db import get_engine, get_sessionmaker
+from app.domain.planner import PlanSpec, WorkoutSpec, generate_plan
+from app.models import Goal, Plan, User, Workout
+from app.routers.plans import _bulk_insert_workouts
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+
+
+def _per_row(db, plan: Plan, specs) -> None:
+    for ws in specs:
+        db.add(
+            Workout(
+                plan_id=plan.id,
+                wdate=ws.wdate,
+                wtype=ws.wtype,
+                target_distance_m=ws.target_distance_m,
+                target_duration_sec=ws.target_duration_sec,
+                target_zone=ws.target_zone,
+                description=ws.description,
+                is_key=ws.is_key,
+            )
+        )
+    db.flush()
+    db.refresh(plan)
+    db.scalars(select(Workout).where(Workout.plan_id == plan.id).order_by(Workout.wdate.asc())).all()
+
+
+def _bulk(db, plan: Plan, specs) -> None:
+    _bulk_insert_workouts(db, plan.id, specs)
+
+
+def _measure(fn, specs, repeat: int) -> tuple[float, float, int]:
+    counter = QueryCounter()
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        db = get_sessionmaker()()
+        try:
+            user = User(email=f"bench-{time.time_ns()}@example.com", password_hash="x", age=30, sex="other")
+            db.add(user)
+            db.flush()
+            goal = Goal(user_id=user.id, distance_m=42195, target_date=specs[-1].wdate)
+            db.add(goal)
+            db.flush()
+            plan = Plan(user_id=user.id, goal_id=goal.id, start_date=specs[0].wdate, end_date=specs[-1].wdate, status="active")
+            db.add(plan)
+            db.flush()
+
+            event.listen(get_engine(), "before_cursor_execute", counter)
+            counter.count = 0
+            t0 = time.perf_counter()
+            fn(db, plan, specs)
+            timings.append(time.perf_counter() - t0)
+            event.remove(get_engine(), "before_cursor_execute", counter)
+            queries = counter.count
+        finally:
+            db.rollback()
+            db.close()
+    return statistics.median(timings), max(timings), queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weeks", type=int, default=26)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    start = date.today()
+    spec = PlanSpec(start_date=start, end_date=start + timedelta(weeks=args.weeks), running_days_per_week=4, phases={})
+    specs = generate_plan(goal_distance_m=42195, start_weekly_vol=20000, cap_growth=0.10, spec=spec)
+    # Rest days leave the run columns NULL, as a stored plan's rest rows do
+    specs += [WorkoutSpec(ws.wdate + timedelta(days=1), "rest", None, None, None, "Rest", False) for ws in specs[::2]]
+    specs.sort(key=lambda ws: ws.wdate)
+
+    print(f"{len(specs)} workouts, {args.repeat} runs")
+    print(f"{'path':>8} {'queries':>8} {'p50 ms':>8} {'max ms':>8}")
+    for name, fn in (("per-row", _per_row), ("bulk", _bulk)):
+        p50, worst, queries = _measure(fn, specs, args.repeat)
+        print(f"{name:>8} {queries:>8} {p50 * 1e3:>8.2f} {worst * 1e3:>8.2f}")
+        if name == "bulk" and queries != 1:
+            raise SystemExit(f"bulk path ran {queries} statements; expected a single INSERT ... RETURNING")
+
+
+if __name__ == "__main__":
+    main()
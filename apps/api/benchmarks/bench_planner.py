@@ -0,0 +1,67 @@
+"""Compare per-plan cost of ``generate_plan`` against ``generate_plan_batch``.
+
+Run from ``apps/api``::
+
+    python -m benchmarks.bench_planner --sizes 1000 10000 100000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from app.domain.planner import PlanRequest, PlanSpec, generate_plan, generate_plan_batch
+
+CHUNK = 10_000  # bounds batch memory for the largest sizes
+
+
+def _requests(n: int, seed: int = 0) -> list[PlanRequest]:
+    rng = random.Random(seed)
+    today = date(2025, 1, 6)
+    out = []
+    for _ in range(n):
+        start = today + timedelta(days=rng.randint(0, 6))
+        comfortable = rng.choice([2000, 3000, 5000, 8000, 10000, 15000])
+        out.append(
+            PlanRequest(
+                goal_distance_m=rng.choice([5000, 10000, 21097, 42195]),
+                start_weekly_vol=max(comfortable * 3.0, 10000),
+                cap_growth=0.10,
+                start_date=start,
+                end_date=start + timedelta(weeks=rng.randint(8, 24)),
+            )
+        )
+    return out
+
+
+def _run_single(requests: list[PlanRequest]) -> float:
+    t0 = time.perf_counter()
+    for r in requests:
+        spec = PlanSpec(start_date=r.start_date, end_date=r.end_date, running_days_per_week=4, phases={})
+        generate_plan(goal_distance_m=r.goal_distance_m, start_weekly_vol=r.start_weekly_vol, cap_growth=r.cap_growth, spec=spec)
+    return time.perf_counter() - t0
+
+
+def _run_batch(requests: list[PlanRequest]) -> float:
+    t0 = time.perf_counter()
+    for i in range(0, len(requests), CHUNK):
+        generate_plan_batch(requests[i : i + CHUNK])
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'plans':>8} {'single us/plan':>15} {'batch us/plan':>14} {'speedup':>8}")
+    for n in args.sizes:
+        requests = _requests(n)
+        single = _run_single(requests)
+        batch = _run_batch(requests)
+        print(f"{n:>8} {single / n * 1e6:>15.1f} {batch / n * 1e6:>14.1f} {single / batch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
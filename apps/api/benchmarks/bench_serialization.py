@@ -0,0 +1,128 @@
+"""Read + serialize cost of a 200-workout plan: ORM/Pydantic path vs column tuples + orjson.
+
+"orm" is the old path: hydrate ``Workout`` objects, copy them into ``WorkoutOut``,
+then let FastAPI re-validate and encode through ``response_model``. "columns" is
+the path now used by ``routers/plans``: select the ``WorkoutOut`` columns as tuples
+and dump them with orjson. Both are timed with and without the query, against a
+plan seeded in the database at ``DATABASE_URL`` (deleted afterwards).
+
+    python -m benchmarks.bench_serialization --workouts 200 --repeat 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+
+from app.db import get_sessionmaker
+from app.domain.planner import PlanSpec, generate_plan
+from app.models import Goal, Plan, User, Workout
+from app.routers.plans import _bulk_insert_workouts, _plan_json
+from app.schemas import PlanOut, WorkoutOut
+from app.serialization import WORKOUT_COLUMNS, workout_dicts
+
+
+def _orm_fetch(db, plan: Plan) -> list[Workout]:
+    return db.scalars(select(Workout).where(Workout.plan_id == plan.id).order_by(Workout.wdate.asc())).all()
+
+
+def _orm_serialize(plan: Plan, workouts: list[Workout]) -> bytes:
+    out = PlanOut(
+        id=plan.id,
+        start_date=plan.start_date,
+        end_date=plan.end_date,
+        status=plan.status,
+        workouts=[
+            WorkoutOut(
+                id=w.id,
+                wdate=w.wdate,
+                wtype=w.wtype,
+                target_distance_m=w.target_distance_m,
+                target_duration_sec=w.target_duration_sec,
+                target_zone=w.target_zone,
+                description=w.description,
+                is_key=w.is_key,
+            )
+            for w in workouts
+        ],
+    )
+    # What FastAPI does with a returned model and response_model=PlanOut
+    validated = PlanOut.model_validate(out.model_dump())
+    return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode()
+
+
+def _columns_fetch(db, plan: Plan) -> list:
+    return db.execute(select(*WORKOUT_COLUMNS).where(Workout.plan_id == plan.id).order_by(Workout.wdate.asc())).all()
+
+
+def _columns_serialize(plan: Plan, rows: list) -> bytes:
+    return _plan_json(plan.id, plan.start_date, plan.end_date, plan.status, workout_dicts(rows))
+
+
+def _time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workouts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    start = date.today()
+    spec = PlanSpec(start_date=start, end_date=start + timedelta(weeks=args.workouts // 4 + 1), running_days_per_week=4, phases={})
+    specs = generate_plan(goal_distance_m=42195, start_weekly_vol=20000, cap_growth=0.10, spec=spec)[: args.workouts]
+
+    with get_sessionmaker()() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex}@example.com", password_hash="x", age=30, sex="other")
+        db.add(user)
+        db.flush()
+        goal = Goal(user_id=user.id, distance_m=42195, target_date=specs[-1].wdate)
+        db.add(goal)
+        db.flush()
+        plan = Plan(user_id=user.id, goal_id=goal.id, start_date=specs[0].wdate, end_date=specs[-1].wdate, status="active")
+        db.add(plan)
+        db.flush()
+        _bulk_insert_workouts(db, plan.id, specs)
+        db.commit()
+        user_id = user.id
+
+    try:
+        with get_sessionmaker()() as db:
+            plan = db.get(Plan, plan.id)
+            workouts, rows = _orm_fetch(db, plan), _columns_fetch(db, plan)
+            assert _orm_serialize(plan, workouts) == _columns_serialize(plan, rows)
+
+            def orm_read():
+                db.expunge_all()  # a fresh request has an empty identity map
+                _orm_serialize(plan, _orm_fetch(db, plan))
+
+            def columns_read():
+                _columns_serialize(plan, _columns_fetch(db, plan))
+
+            print(f"{len(specs)} workouts, median of {args.repeat} runs")
+            print(f"{'path':>8} {'serialize ms':>13} {'query+serialize ms':>19}")
+            for name, serialize, read in (
+                ("orm", lambda: _orm_serialize(plan, workouts), orm_read),
+                ("columns", lambda: _columns_serialize(plan, rows), columns_read),
+            ):
+                print(f"{name:>8} {_time(serialize, args.repeat) * 1e3:>13.3f} {_time(read, args.repeat) * 1e3:>19.3f}")
+    finally:
+        with get_sessionmaker()() as db:
+            db.delete(db.get(User, user_id))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+
+import pytest
+
+from app.metrics import count_queries, instrument_engines
+
+
+@pytest.fixture
+def max_queries():
+    """``with max_queries(n): ...`` fails the test when the block runs more than ``n`` SQL statements."""
+    instrument_engines()
+
+    @contextmanager
+    def check(budget: int):
+        with count_queries() as stats:
+            yield stats
+        assert stats.queries <= budget, f"{stats.queries} SQL statements, budget {budget}"
+
+    return check
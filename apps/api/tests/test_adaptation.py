@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+from app.domain.adaptation import (
+    AdaptationState,
+    LoggedSession,
+    adjusted_workout,
+    evaluate_and_apply_adaptations,
+)
+
+
+def _easy(d, rpe, actual=8000):
+    return LoggedSession(wdate=d, wtype="easy", is_key=False, target_distance_m=8000, actual_distance_m=actual, rpe=rpe)
+
+
+def test_three_hard_easy_runs_reduce_next_week_once():
+    state = AdaptationState()
+    start = date(2025, 3, 3)
+    fired = []
+    for i in range(4):
+        d = start + timedelta(days=2 * i)
+        fired.append(evaluate_and_apply_adaptations(state, _easy(d, 8), [], d))
+    assert [len(a) for a in fired] == [0, 0, 1, 0]
+    adj = fired[2][0]
+    assert adj.rule == "hard_easy_runs_reduce_volume"
+    assert adj.volume_factor == 0.9
+    assert (adj.start, adj.end) == (start + timedelta(days=5), start + timedelta(days=11))
+
+
+def test_hard_easy_window_expires():
+    state = AdaptationState()
+    d0 = date(2025, 3, 3)
+    evaluate_and_apply_adaptations(state, _easy(d0, 8), [], d0)
+    evaluate_and_apply_adaptations(state, _easy(d0 + timedelta(days=1), 8), [], d0 + timedelta(days=1))
+    late = d0 + timedelta(days=20)
+    assert evaluate_and_apply_adaptations(state, _easy(late, 8), [], late) == []
+
+
+def test_backfilled_batch_is_windowed_by_workout_date():
+    state = AdaptationState()
+    today = date(2025, 6, 2)
+    start = today - timedelta(days=60)
+    fired = [evaluate_and_apply_adaptations(state, _easy(start + timedelta(days=2 * i), 8), [], today) for i in range(3)]
+    assert [len(a) for a in fired] == [0, 0, 1]
+    # Adjustments still rewrite the coming week, the only one left to change
+    assert (fired[2][0].start, fired[2][0].end) == (today + timedelta(days=1), today + timedelta(days=7))
+
+
+def test_missed_keys_trigger_recovery_week_and_cursor_advances():
+    state = AdaptationState()
+    d = date(2025, 3, 10)
+    adjs = evaluate_and_apply_adaptations(state, _easy(d, 3), [date(2025, 3, 4), date(2025, 3, 6)], d)
+    assert [a.rule for a in adjs] == ["missed_key_recovery_week"]
+    assert adjs[0].easy_only
+    assert state.cursor == d
+    # An out-of-order log for an earlier date cannot re-count the same gap.
+    earlier = d - timedelta(days=3)
+    assert evaluate_and_apply_adaptations(state, _easy(earlier, 3), [date(2025, 3, 4)], d) == []
+    assert state.missed_key == []
+
+
+def test_ahead_of_schedule_increase():
+    state = AdaptationState()
+    d = date(2025, 3, 3)
+    adjs = []
+    for i in range(3):
+        adjs = evaluate_and_apply_adaptations(state, _easy(d + timedelta(days=i), 3, actual=9000), [], d + timedelta(days=i))
+    assert [a.rule for a in adjs] == ["ahead_of_schedule_progress"]
+    assert adjs[0].volume_factor == 1.05
+
+
+def test_state_round_trips_and_recovery_rewrite():
+    state = AdaptationState(hard_easy=[date(2025, 3, 1)], cursor=date(2025, 3, 2))
+    assert AdaptationState.from_dict(state.to_dict()) == state
+    adj = evaluate_and_apply_adaptations(
+        AdaptationState(), _easy(date(2025, 3, 10), 3), [date(2025, 3, 5), date(2025, 3, 7)], date(2025, 3, 10)
+    )[0]
+    w = {"wtype": "tempo", "target_distance_m": 10000, "target_zone": "threshold", "description": "Tempo", "is_key": True}
+    out = adjusted_workout(w, adj)
+    assert out == {"wtype": "easy", "target_distance_m": 6000, "target_zone": "easy", "description": "Recovery run", "is_key": False}
+    assert w["wtype"] == "tempo"
@@ -0,0 +1,126 @@
+import asyncio
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, text
+
+from app import queue
+from app.cache import LRUBackend, get_response_cache
+from app.config import get_settings
+from app.db import get_sessionmaker
+from app.main import create_app
+from app.models import User
+
+
+def _on_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class LoopCheckingBackend(LRUBackend):
+    """LRU backend that records every call made from the event loop thread."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.on_loop: list[str] = []
+
+    def _check(self, op: str) -> None:
+        if _on_loop():
+            self.on_loop.append(op)
+
+    def get(self, key: str) -> bytes | None:
+        self._check("get")
+        return super().get(key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._check("set")
+        super().set(key, value, ttl)
+
+    def add(self, key: str, value: bytes, ttl: int) -> bytes:
+        self._check("add")
+        return super().add(key, value, ttl)
+
+
+# The DB_ASYNC=1 routers end to end against the Postgres at DATABASE_URL (migrated
+# to head; skipped otherwise), checking that cache and queue calls leave the loop.
+@pytest.fixture
+def aio(monkeypatch):
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.connect() as conn:
+            if not conn.execute(text("SELECT to_regclass('ix_plans_user_active')")).scalar():
+                pytest.skip("database is not migrated to head")
+    except Exception as exc:  # noqa: BLE001 - no reachable Postgres
+        pytest.skip(f"no Postgres at DATABASE_URL: {exc.__class__.__name__}")
+    finally:
+        engine.dispose()
+    fakeredis = pytest.importorskip("fakeredis")
+    conn = fakeredis.FakeStrictRedis()
+    queue_on_loop: list[bool] = []
+
+    def get_redis():
+        queue_on_loop.append(_on_loop())
+        return conn
+
+    monkeypatch.setattr(queue, "get_redis", get_redis)
+    backend = LoopCheckingBackend()
+    monkeypatch.setattr(get_response_cache(), "backend", backend)
+    monkeypatch.setattr(get_settings(), "db_async", True)
+    email = f"aio-{uuid.uuid4().hex}@example.com"
+    with TestClient(create_app()) as client:
+        register = {"email": email, "password": "aio-password", "age": 30, "sex": "other"}
+        tokens = client.post("/auth/register", json=register)
+        assert tokens.status_code == 200, tokens.text
+        yield client, {"Authorization": f"Bearer {tokens.json()['access_token']}"}
+    with get_sessionmaker()() as db:
+        db.execute(delete(User).where(User.email == email))
+        db.commit()
+    assert backend.on_loop == []
+    assert queue_on_loop and not any(queue_on_loop)
+
+
+def _ok(resp, status: int = 200):
+    assert resp.status_code == status, resp.text
+    return resp
+
+
+def test_async_routes_serve_cached_reads_and_invalidate_on_writes(aio):
+    client, h = aio
+    today = date.today()
+    snap = {"date": str(today), "comfortable_distance_m": 8000, "comfortable_time_sec": 2700}
+    snap_id = _ok(client.post("/capability", headers=h, json=snap)).json()["id"]
+    latest = _ok(client.get("/capability/latest", headers=h))
+    assert latest.json()["id"] == snap_id
+    assert client.get("/capability/latest", headers={**h, "If-None-Match": latest.headers["ETag"]}).status_code == 304
+
+    goal = {"distance_m": 21097, "target_date": str(today + timedelta(weeks=16))}
+    goal_id = _ok(client.post("/goals", headers=h, json=goal)).json()["id"]
+    sweep = {"target_dates": [str(today + timedelta(weeks=12))], "distances_m": [10000, 21097]}
+    surfaces = _ok(client.post("/goals/feasibility-sweep", headers=h, json=sweep)).json()["surfaces"]
+    assert [s["distance_m"] for s in surfaces] == [10000, 21097]
+
+    plan = _ok(client.post(f"/plans/goals/{goal_id}/generate-plan", headers=h)).json()
+    current = _ok(client.get("/plans/current", headers=h))
+    assert current.json()["id"] == plan["id"]
+    assert client.get("/plans/current", headers={**h, "If-None-Match": current.headers["ETag"]}).status_code == 304
+
+    run = next(w for w in plan["workouts"] if w["wtype"] != "rest")
+    log = {"actual_distance_m": 5000, "actual_time_sec": 1800, "rpe": 5}
+    _ok(client.post(f"/workouts/{run['id']}/log", headers=h, json=log))
+    # The log bumped the plan version and dropped the cached copy
+    assert _ok(client.get("/plans/current", headers=h)).headers["ETag"] != current.headers["ETag"]
+    results = _ok(client.post("/workouts/logs:batch", headers=h, json={"items": [{"workout_id": run["id"], **log}]}))
+    assert [r["ok"] for r in results.json()["results"]] == [True]
+
+    _ok(client.post("/capability", headers=h, json={**snap, "comfortable_distance_m": 12000}))
+    diff = _ok(client.post(f"/plans/{plan['id']}/regenerate", headers=h)).json()
+    assert diff["applied"] and diff["plan_id"] == plan["id"]
+    assert _ok(client.get("/plans/current", headers=h)).json()["workouts"] != plan["workouts"]
+
+    job = _ok(client.post(f"/plans/goals/{goal_id}/generate-plan", headers=h, params={"async": "true"}), 202)
+    assert _ok(client.get(job.headers["Location"], headers=h)).json()["status"] == "queued"
@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from app.auth.jwt import (
+    InvalidToken,
+    TokenCache,
+    create_token,
+    get_token_cache,
+    verify_token,
+)
+
+
+def test_verify_token_caches_claims():
+    token = create_token("user-1", 60, "access")
+    first = verify_token(token)
+    assert first["sub"] == "user-1"
+    assert get_token_cache().get(token) is first
+    assert verify_token(token) is first
+
+
+def test_token_cache_evicts_on_exp_and_size():
+    cache = TokenCache(max_entries=2)
+    now = int(time.time())
+    cache.put("expired", {"sub": "a", "exp": now - 1})
+    assert cache.get("expired") is None
+    cache.put("t1", {"sub": "a", "exp": now + 60})
+    cache.put("t2", {"sub": "b", "exp": now + 60})
+    cache.put("t3", {"sub": "c", "exp": now + 60})
+    assert cache.get("t1") is None
+    assert cache.get("t3")["sub"] == "c"
+    cache.put("no-exp", {"sub": "d"})
+    assert cache.get("no-exp") is None
+
+
+@pytest.mark.parametrize("token", ["not-a-jwt", create_token("user-1", -10, "access")])
+def test_bad_and_expired_tokens_are_invalid(token):
+    with pytest.raises(InvalidToken):
+        verify_token(token)
@@ -0,0 +1,15 @@
+from benchmarks.bench_domain import Result, compare, measure
+
+BASE = {"plan": {"us_per_call": 100.0, "relative": 2.0, "peak_kib": 40.0}}
+
+
+def test_compare_flags_slower_and_hungrier_cases_only():
+    assert compare(BASE, {"plan": Result(150.0, 2.4, 43.0)}, 0.25, 0.10) == []
+    failures = compare(BASE, {"plan": Result(90.0, 2.6, 48.0), "new": Result(1.0, 1.0, 1.0)}, 0.25, 0.10)
+    assert len(failures) == 2 and all(f.startswith("plan:") for f in failures)
+
+
+def test_measure_reports_allocations_per_call():
+    res = measure([lambda: [0] * 10_000] * 5, repeat=1)
+    assert res.us_per_call > 0 and res.relative > 0
+    assert 70 < res.peak_kib < 90
@@ -0,0 +1,53 @@
+import pytest
+
+from app.cache import PLAN_SCOPE, LRUBackend, NullBackend, RedisBackend, ResponseCache
+
+
+def test_read_through_and_invalidate():
+    cache = ResponseCache(LRUBackend(), ttl=60)
+    body, version = cache.get(PLAN_SCOPE, "u1")
+    assert body is None
+    cache.put(PLAN_SCOPE, "u1", version, b'{"id":"p1"}')
+    assert cache.get(PLAN_SCOPE, "u1") == (b'{"id":"p1"}', version)
+    cache.invalidate(PLAN_SCOPE, "u1")
+    body, new_version = cache.get(PLAN_SCOPE, "u1")
+    assert body is None and new_version != version
+
+
+def test_stale_reader_cannot_repopulate_after_invalidation():
+    cache = ResponseCache(LRUBackend(), ttl=60)
+    _, version = cache.get(PLAN_SCOPE, "u1")  # reader starts before the write commits
+    cache.invalidate(PLAN_SCOPE, "u1")
+    cache.put(PLAN_SCOPE, "u1", version, b"stale")
+    assert cache.get(PLAN_SCOPE, "u1")[0] is None
+
+
+def test_lru_evicts_oldest_and_expires():
+    lru = LRUBackend(max_entries=2)
+    lru.set("a", b"1", 60)
+    lru.set("b", b"2", 60)
+    lru.get("a")
+    lru.set("c", b"3", 60)
+    assert lru.get("b") is None and lru.get("a") == b"1"
+    lru.set("d", b"4", -1)
+    assert lru.get("d") is None
+
+
+def test_null_backend_never_hits():
+    cache = ResponseCache(NullBackend(), ttl=60)
+    _, version = cache.get(PLAN_SCOPE, "u1")
+    cache.put(PLAN_SCOPE, "u1", version, b"x")
+    assert cache.get(PLAN_SCOPE, "u1")[0] is None
+
+
+def test_unreachable_redis_misses_until_it_returns():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    cache = ResponseCache(RedisBackend(fakeredis.FakeStrictRedis(server=server)), ttl=60)
+    server.connected = False
+    assert cache.get(PLAN_SCOPE, "u1") == (None, "")
+    cache.invalidate(PLAN_SCOPE, "u1")  # logged, not raised
+    server.connected = True
+    _, version = cache.get(PLAN_SCOPE, "u1")
+    cache.put(PLAN_SCOPE, "u1", version, b"x")
+    assert cache.get(PLAN_SCOPE, "u1") == (b"x", version)
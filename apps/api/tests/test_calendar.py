@@ -0,0 +1,85 @@
+from collections import namedtuple
+from datetime import UTC, date, datetime
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.auth.dependencies import CALENDAR_TOKEN_TYPE, get_calendar_principal, get_current_principal
+from app.auth.jwt import create_token
+from app.cache import LRUBackend, ResponseCache
+from app.ical import CALENDAR_TAIL, calendar_head, vevents
+from app.routers import plans
+from app.serialization import WORKOUT_FIELDS
+
+
+Row = namedtuple("Row", WORKOUT_FIELDS)
+ROWS = [
+    Row("w1", date(2025, 3, 4), "tempo", 8000, None, "threshold", "Warm up, then 3x10'; cool down", True),
+    Row("w2", date(2025, 3, 5), "rest", None, None, None, None, False),
+    Row("w3", date(2025, 3, 6), "easy", None, 1800, None, None, False),
+]
+STAMP = datetime(2025, 3, 1, 12, 30, tzinfo=UTC)
+PLAN_ID = "11111111-1111-1111-1111-111111111111"
+
+
+def _unfold(body: bytes) -> list[str]:
+    return body.decode().replace("\r\n ", "").split("\r\n")
+
+
+def test_events_are_escaped_deterministic_and_skip_rest_days():
+    body = vevents(ROWS, STAMP, 3)
+    assert body == vevents(ROWS, STAMP, 3)
+    lines = _unfold(body)
+    assert lines.count("BEGIN:VEVENT") == 2
+    assert "UID:w1@nra" in lines and "UID:w2@nra" not in lines
+    assert "DTSTAMP:20250301T123000Z" in lines and "SEQUENCE:3" in lines
+    assert "DTSTART;VALUE=DATE:20250304" in lines and "DTEND;VALUE=DATE:20250305" in lines
+    assert "SUMMARY:Tempo run · 8.0 km" in lines and "SUMMARY:Easy run · 30 min" in lines
+    assert "DESCRIPTION:Warm up\\, then 3x10'\\; cool down\\nZone: threshold\\nKey session" in lines
+
+
+def test_long_lines_fold_at_75_octets_without_splitting_characters():
+    body = calendar_head("Plan " + "é" * 80)
+    for line in body.split(b"\r\n"):
+        assert len(line) <= 75
+        line.decode()
+    assert "X-WR-CALNAME:Plan " + "é" * 80 in _unfold(body)
+    assert CALENDAR_TAIL == b"END:VCALENDAR\r\n"
+
+
+def test_calendar_token_only_opens_its_own_feed():
+    token = create_token("user-1", 60, CALENDAR_TOKEN_TYPE, plan=PLAN_ID)
+    assert get_calendar_principal(PLAN_ID, token=token, cred=None).id == "user-1"
+    with pytest.raises(HTTPException) as exc:
+        get_calendar_principal("22222222-2222-2222-2222-222222222222", token=token, cred=None)
+    assert exc.value.status_code == 401
+    with pytest.raises(HTTPException):
+        get_current_principal(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+    access = create_token("user-1", 60, "access")
+    with pytest.raises(HTTPException):
+        get_calendar_principal(PLAN_ID, token=access, cred=None)
+    bearer = HTTPAuthorizationCredentials(scheme="Bearer", credentials=access)
+    assert get_calendar_principal(PLAN_ID, token=None, cred=bearer).id == "user-1"
+
+
+def test_feed_is_served_from_cache_until_the_plan_changes(monkeypatch):
+    cache = ResponseCache(LRUBackend(), ttl=60)
+    monkeypatch.setattr(plans, "get_response_cache", lambda: cache)
+    plan = plans.Plan(
+        id=PLAN_ID, start_date=date(2025, 3, 1), end_date=date(2025, 6, 1), version=2, created_at=STAMP
+    )
+    assert plans.cached_calendar("user-1", PLAN_ID, None)[0] is None
+    _, version = cache.get(plans.PLAN_SCOPE, "user-1", variant=f"ics:{PLAN_ID}")
+    head, render = plans.calendar_renderer(plan)
+    plans.calendar_filler("user-1", plan, version)(head + render(ROWS) + CALENDAR_TAIL)
+
+    resp, _ = plans.cached_calendar("user-1", PLAN_ID, None)
+    assert resp.status_code == 200 and resp.body.startswith(b"BEGIN:VCALENDAR\r\n")
+    assert resp.headers["etag"] == plans.calendar_etag(plan)
+    assert plans.cached_calendar("user-1", PLAN_ID, plans.calendar_etag(plan))[0].status_code == 304
+    # The JSON plan entry lives alongside it under the same version
+    assert cache.get(plans.PLAN_SCOPE, "user-1")[0] is None
+
+    cache.invalidate(plans.PLAN_SCOPE, "user-1")
+    assert plans.cached_calendar("user-1", PLAN_ID, None)[0] is None
@@ -0,0 +1,77 @@
+import threading
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, delete, text
+
+from app.config import get_settings
+from app.current_state import fold_riegel_fit, record_plan, record_snapshot
+from app.db import get_sessionmaker
+from app.domain.projection import RiegelFit
+from app.models import CapabilitySnapshot, Goal, Plan, User, UserCurrentState, UserRiegelFit
+
+
+# Against the Postgres at DATABASE_URL (migrated to head; skipped otherwise).
+@pytest.fixture
+def user_id():
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.connect() as conn:
+            if not conn.execute(text("SELECT to_regclass('user_current_state')")).scalar():
+                pytest.skip("database is not migrated to head")
+    except Exception as exc:  # noqa: BLE001 - no reachable Postgres
+        pytest.skip(f"no Postgres at DATABASE_URL: {exc.__class__.__name__}")
+    finally:
+        engine.dispose()
+    email = f"state-{uuid.uuid4().hex}@example.com"
+    with get_sessionmaker()() as db:
+        user = User(email=email, password_hash="x", age=30, sex="other")
+        db.add(user)
+        db.commit()
+        yield user.id
+        db.rollback()
+        db.execute(delete(User).where(User.email == email))
+        db.commit()
+
+
+def test_concurrent_first_riegel_folds_serialize(user_id):
+    run = RiegelFit()
+    assert run.add(5000, 1500)
+    with get_sessionmaker()() as first, get_sessionmaker()() as second:
+        fold_riegel_fit(first, user_id, run)  # creates and locks the user's fit row, uncommitted
+        errors: list[Exception] = []
+
+        def fold_second() -> None:
+            try:
+                fold_riegel_fit(second, user_id, run)  # blocks on the row until `first` commits
+                second.commit()
+            except Exception as exc:  # noqa: BLE001 - surfaced by the assert below
+                errors.append(exc)
+
+        thread = threading.Thread(target=fold_second)
+        thread.start()
+        thread.join(0.5)
+        assert thread.is_alive()
+        first.commit()
+        thread.join(10)
+        assert errors == []
+        assert first.get(UserRiegelFit, user_id, populate_existing=True).n == 2
+
+
+def test_pointer_changes_survive_a_second_record_in_one_session(user_id):
+    with get_sessionmaker()() as db:
+        snap = CapabilitySnapshot(
+            user_id=user_id, date=date(2025, 1, 1), comfortable_distance_m=5000, comfortable_time_sec=1800, projection={}
+        )
+        goal = Goal(user_id=user_id, distance_m=10000, target_date=date(2025, 6, 1))
+        db.add_all([snap, goal])
+        db.flush()
+        plan = Plan(user_id=user_id, goal_id=goal.id, start_date=date(2025, 1, 6), end_date=date(2025, 6, 1), status="active")
+        db.add(plan)
+        db.flush()
+        record_snapshot(db, user_id, snap)
+        record_plan(db, user_id, plan)  # re-locks the row before the snapshot pointer is flushed
+        db.commit()
+        state = db.get(UserCurrentState, user_id, populate_existing=True)
+        assert (state.snapshot_id, state.plan_id) == (snap.id, plan.id)
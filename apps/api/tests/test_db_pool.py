@@ -0,0 +1,23 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+
+from app.db import InstrumentedQueuePool, PoolMetrics
+
+
+class _TestPool(InstrumentedQueuePool):
+    metrics = PoolMetrics("test")
+
+
+def test_pool_metrics_track_checkouts_and_timeouts():
+    pool = _TestPool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01)
+    conn = pool.connect()
+    snap = _TestPool.metrics.snapshot()
+    assert snap["checkouts"] == 1 and snap["in_use"] == 1 and snap["size"] == 1
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    conn.close()
+    snap = _TestPool.metrics.snapshot()
+    assert snap["timeouts"] == 1 and snap["in_use"] == 0
+    assert snap["checkout_wait_buckets"][-1] == ("+Inf", 1)
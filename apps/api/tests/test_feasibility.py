@@ -1,6 +1,10 @@
 from datetime import date, timedelta
 
-from app.domain.feasibility import assess_feasibility
+import pytest
+from pydantic import ValidationError
+
+from app.domain.feasibility import _weeks_to_volume, assess_feasibility, sweep_feasibility
+from app.schemas import FeasibilitySweepRequest
 
 
 def test_feasible_basic_distance_goal():
@@ -29,3 +33,47 @@ def test_tradeoff_when_too_soon():
     assert res.feasible is False
     assert any(t["lever"] == "date" for t in res.tradeoffs)
 
+
+
+def test_weeks_to_volume_matches_compounding():
+    for start, target, growth in [(10_000, 52_742.5, 0.10), (15_000, 15_000, 0.10), (10_000, 11_000, 0.10), (9_000, 105_487.5, 0.05)]:
+        expected, vol = 0, float(start)
+        while vol < target and expected < 200:
+            vol *= 1 + growth
+            expected += 1
+        assert _weeks_to_volume(start, target, growth) == expected
+
+
+def test_sweep_matches_single_assessment():
+    today = date.today()
+    dates = [today + timedelta(weeks=w) for w in (2, 6, 12, 20, 40)]
+    times = [None, 20 * 60, 60 * 60, 4 * 3600]
+    surfaces = sweep_feasibility(
+        today=today,
+        target_dates=dates,
+        target_times_sec=times,
+        goal_distances_m=[5000, 21097, 42195],
+        comfortable_distance_m=5000,
+        comfortable_time_sec=30 * 60,
+    )
+    assert [s.distance_m for s in surfaces] == [5000, 21097, 42195]
+    for s in surfaces:
+        for i, d in enumerate(dates):
+            for j, t in enumerate(times):
+                res = assess_feasibility(
+                    today=today,
+                    target_date=d,
+                    goal_distance_m=s.distance_m,
+                    target_time_sec=t,
+                    comfortable_distance_m=5000,
+                    comfortable_time_sec=30 * 60,
+                )
+                assert s.feasible[i][j] is res.feasible
+
+
+@pytest.mark.parametrize("field,value", [("distances_m", [0]), ("distances_m", [-5000]), ("target_times_sec", [0])])
+def test_sweep_request_bounds_each_item(field, value):
+    body = {"target_dates": [str(date.today() + timedelta(weeks=12))], "distances_m": [10000], field: value}
+    with pytest.raises(ValidationError):
+        FeasibilitySweepRequest.model_validate(body)
+    assert FeasibilitySweepRequest.model_validate({**body, field: [None] if field == "target_times_sec" else [5000]})
@@ -0,0 +1,144 @@
+import io
+import itertools
+import tracemalloc
+from datetime import date
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import create_engine, func, select, text
+
+from app.config import get_settings
+from app.db import get_sessionmaker
+from app.importing.loader import import_runs
+from app.importing.parsers import (
+    ImportedRun,
+    ImportFormatError,
+    detect_format,
+    parse_runs,
+)
+from app.models import SessionLog, User, UserRiegelFit
+from app.routers.imports import start_import
+
+
+def test_csv_aliases_units_and_bad_rows():
+    data = (
+        "﻿Activity Date,Distance,Elapsed Time,RPE,Activity Name\n"
+        "2024-03-01,10.0,3000,6,Tempo\n"
+        "not a date,5,1500,,\n"
+        "\"Mar 3, 2024, 7:00:00 AM\",5.5,27:30,,\n"
+    ).encode()
+    runs = list(parse_runs(io.BytesIO(data), "csv"))
+    assert runs == [
+        ImportedRun(date(2024, 3, 1), 10000, 3000, 6, "Tempo"),
+        None,
+        ImportedRun(date(2024, 3, 3), 5500, 1650),
+    ]
+
+
+def test_csv_without_date_column_is_rejected():
+    with pytest.raises(ImportFormatError):
+        list(parse_runs(io.BytesIO(b"distance_m,time_sec\n5000,1500\n"), "csv"))
+
+
+GPX_HEAD = b'<?xml version="1.0"?><gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1">'
+GPX_TRK = (
+    b"<trk><trkseg>"
+    b'<trkpt lat="51.5000" lon="-0.1200"><time>2024-03-01T07:00:00Z</time></trkpt>'
+    b'<trkpt lat="51.5090" lon="-0.1200"><time>2024-03-01T07:05:00Z</time></trkpt>'
+    b"</trkseg></trk>"
+)
+
+
+def test_gpx_tracks_become_runs():
+    runs = list(parse_runs(io.BytesIO(GPX_HEAD + GPX_TRK * 2 + b"</gpx>"), "gpx"))
+    assert len(runs) == 2
+    assert runs[0].run_date == date(2024, 3, 1)
+    assert runs[0].time_sec == 300
+    assert 995 <= runs[0].distance_m <= 1005
+
+
+def test_tcx_sums_laps_and_ignores_trackpoint_distances():
+    tcx = (
+        b'<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2"><Activities>'
+        b'<Activity Sport="Running"><Id>2024-03-02T06:30:00Z</Id>'
+        b'<Lap StartTime="2024-03-02T06:30:00Z"><TotalTimeSeconds>600</TotalTimeSeconds><DistanceMeters>2000</DistanceMeters>'
+        b"<Track><Trackpoint><DistanceMeters>1999</DistanceMeters></Trackpoint></Track></Lap>"
+        b'<Lap StartTime="2024-03-02T06:40:00Z"><TotalTimeSeconds>620.4</TotalTimeSeconds><DistanceMeters>2000</DistanceMeters></Lap>'
+        b"</Activity></Activities></TrainingCenterDatabase>"
+    )
+    assert list(parse_runs(io.BytesIO(tcx), "tcx")) == [ImportedRun(date(2024, 3, 2), 4000, 1220)]
+
+
+class _RepeatingStream(io.RawIOBase):
+    """GPX with ``n`` tracks, generated on read so the input itself is never in memory."""
+
+    def __init__(self, n: int) -> None:
+        self._chunks = itertools.chain([GPX_HEAD], itertools.repeat(GPX_TRK, n), [b"</gpx>"])
+        self._buf = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buf:
+            self._buf = next(self._chunks, None)
+            if self._buf is None:
+                self._buf = b""
+                return 0
+        n = min(len(b), len(self._buf))
+        b[:n], self._buf = self._buf[:n], self._buf[n:]
+        return n
+
+
+def test_gpx_parsing_memory_is_flat():
+    tracemalloc.start()
+    count = sum(1 for _ in parse_runs(io.BufferedReader(_RepeatingStream(50_000)), "gpx"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert count == 50_000
+    assert peak < 1_000_000
+
+
+def test_detect_format():
+    assert detect_format("Export.GPX") == "gpx"
+    with pytest.raises(ImportFormatError):
+        detect_format("runs.fit")
+
+
+def test_oversized_upload_is_refused_and_not_spooled(monkeypatch, tmp_path):
+    monkeypatch.setattr(get_settings(), "import_dir", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "import_max_bytes", 64)
+    upload = UploadFile(io.BytesIO(b"date,distance_m,time_sec\n" * 10), filename="runs.csv")
+    with pytest.raises(HTTPException) as exc:
+        start_import(file=upload, user=None, fmt=None)
+    assert exc.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.connect() as conn:
+            if not conn.execute(text("SELECT to_regclass('ix_session_logs_user_date')")).scalar():
+                pytest.skip("database is not migrated to head")
+    except Exception as exc:  # noqa: BLE001 - no reachable Postgres
+        pytest.skip(f"no Postgres at DATABASE_URL: {exc.__class__.__name__}")
+    finally:
+        engine.dispose()
+    with get_sessionmaker()() as session:
+        yield session
+        session.rollback()
+
+
+def test_reimported_runs_are_not_logged_twice(db):
+    user = User(email="import-dedupe@example.com", password_hash="x", age=30, sex="other")
+    db.add(user)
+    db.flush()
+    runs = [ImportedRun(date(2024, 3, 1), 10000, 3000), ImportedRun(date(2024, 3, 2), 5000, 1500), None]
+    first = import_runs(db, user.id, iter(runs + runs[:1]), source="import:csv")
+    assert (first.parsed, first.unplanned, first.duplicates, first.skipped) == (3, 2, 1, 1)
+    again = import_runs(db, user.id, iter([*runs, ImportedRun(date(2024, 3, 3), 8000, 2500)]), source="import:csv")
+    assert (again.parsed, again.unplanned, again.duplicates) == (3, 1, 2)
+    assert db.scalar(select(func.count()).select_from(SessionLog).where(SessionLog.user_id == user.id)) == 3
+    assert db.get(UserRiegelFit, user.id).n == 3
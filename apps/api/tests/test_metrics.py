@@ -0,0 +1,72 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.db import PoolMetrics
+from app.metrics import (
+    MetricsMiddleware,
+    RequestMetrics,
+    count_queries,
+    instrument_engines,
+    render,
+)
+
+
+def _client(metrics: RequestMetrics) -> TestClient:
+    engine = create_engine("sqlite://")
+    instrument_engines()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        with engine.connect() as conn:
+            conn.execute(text("select 1"))
+            conn.execute(text("select :i"), {"i": item_id})
+        return {"id": item_id}
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_requests_are_labelled_by_route_with_db_queries():
+    metrics = RequestMetrics()
+    client = _client(metrics)
+    for i in (1, 2):
+        assert client.get(f"/items/{i}").status_code == 200
+    assert client.get("/no/such/path").status_code == 404
+    assert client.get("/boom").status_code == 500
+
+    assert metrics.response_counts() == [
+        (("GET", "/boom", "500"), 1),
+        (("GET", "/items/{item_id}", "200"), 2),
+        (("GET", "unmatched", "404"), 1),
+    ]
+    assert metrics.in_flight == 0
+    queries = {labels: (total, n) for labels, _, total, n in metrics.db_queries.samples()}
+    assert queries[("GET", "/items/{item_id}")] == (4, 2)
+    assert queries[("GET", "unmatched")] == (0, 1)
+
+
+def test_nested_query_counts_roll_up():
+    engine = create_engine("sqlite://")
+    instrument_engines()
+    with count_queries() as outer, engine.connect() as conn:
+        conn.execute(text("select 1"))
+        with count_queries() as inner:
+            conn.execute(text("select 2"))
+    assert (inner.queries, outer.queries) == (1, 2)
+
+
+def test_render_emits_prometheus_histograms():
+    metrics = RequestMetrics()
+    _client(metrics).get("/items/7")
+    out = render(metrics, [PoolMetrics("unused")])
+    assert 'nra_http_responses_total{method="GET",route="/items/{item_id}",status="200"} 1' in out
+    assert 'nra_http_request_db_queries_bucket{method="GET",route="/items/{item_id}",le="1"} 0' in out
+    assert 'nra_http_request_db_queries_bucket{method="GET",route="/items/{item_id}",le="2"} 1' in out
+    assert 'nra_http_request_duration_seconds_count{method="GET",route="/items/{item_id}"} 1' in out
+    assert "# TYPE nra_db_pool_size gauge" in out and 'pool="unused"' not in out
@@ -0,0 +1,41 @@
+import threading
+
+import pytest
+
+from app.auth.passwords import HashingBusy, HashingPool, _hash, _verify
+
+FAST = (1, 1024, 1)
+
+
+def test_verify_flags_outdated_cost_for_rehash():
+    old = _hash("correct horse", FAST)
+    assert _verify("wrong", old, FAST) == (False, None)
+    assert _verify("correct horse", old, FAST) == (True, None)
+    ok, new_hash = _verify("correct horse", old, (2, 1024, 1))
+    assert ok and new_hash and "t=2" in new_hash
+    assert _verify("correct horse", new_hash, (2, 1024, 1)) == (True, None)
+
+
+def test_pool_rejects_when_saturated():
+    pool = HashingPool(workers=1, max_pending=1)
+    gate = threading.Event()
+    pool._executor = _BlockingExecutor(gate)
+    first = pool._submit(_hash, "pw", FAST)
+    with pytest.raises(HashingBusy):
+        pool._submit(_hash, "pw", FAST)
+    gate.set()
+    first.result()
+    assert pool.pending == 0
+
+
+class _BlockingExecutor:
+    """Thread-backed stand-in for the process pool that holds jobs until released."""
+
+    def __init__(self, gate):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._inner = ThreadPoolExecutor(max_workers=1)
+        self._gate = gate
+
+    def submit(self, fn, *args):
+        return self._inner.submit(lambda: (self._gate.wait(), fn(*args))[1])
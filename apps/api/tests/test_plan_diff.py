@@ -0,0 +1,111 @@
+import uuid
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, text
+
+from app.config import get_settings
+from app.db import get_sessionmaker
+from app.domain.plan_diff import diff_workouts
+from app.domain.planner import PlanSpec, generate_plan, regenerate_from
+from app.main import create_app
+from app.models import User
+
+
+START = date(2025, 1, 6)
+END = START + timedelta(weeks=16)
+
+
+def _plan(start_weekly_vol: float = 20000):
+    spec = PlanSpec(start_date=START, end_date=END, running_days_per_week=4, phases={})
+    return generate_plan(goal_distance_m=21097, start_weekly_vol=start_weekly_vol, cap_growth=0.1, spec=spec)
+
+
+def _regen(from_date: date, start_weekly_vol: float = 20000):
+    return regenerate_from(
+        plan_start=START,
+        plan_end=END,
+        from_date=from_date,
+        goal_distance_m=21097,
+        start_weekly_vol=start_weekly_vol,
+        cap_growth=0.1,
+    )
+
+
+def test_unchanged_inputs_produce_an_empty_diff():
+    today = START + timedelta(days=10)
+    existing = [(f"w{i}", ws) for i, ws in enumerate(_plan()) if ws.wdate >= today]
+    diff = diff_workouts(existing, _regen(today))
+    assert not diff.changed
+    assert diff.unchanged == len(existing)
+
+
+def test_regeneration_keeps_the_plans_weekly_grid():
+    original = _plan()
+    today = START + timedelta(weeks=9, days=3)
+    regenerated = _regen(today, start_weekly_vol=30000)
+    future = [ws for ws in original if ws.wdate >= today]
+    assert [(ws.wdate, ws.wtype) for ws in regenerated] == [(ws.wdate, ws.wtype) for ws in future]
+    # Only distances moved, so changed rows are in-place updates; capped long runs stay put
+    diff = diff_workouts([(f"w{i}", ws) for i, ws in enumerate(future)], regenerated)
+    assert not diff.inserts and not diff.deletes
+    assert diff.updates and len(diff.updates) + diff.unchanged == len(future)
+    assert all(ws.wtype != "long" for _, ws in diff.updates)
+    assert _regen(END + timedelta(days=1)) == []
+
+
+def test_diff_inserts_deletes_and_updates_by_date():
+    a, b, c = _plan()[:3]
+    existing = [("id-a", a), ("id-b", b), ("id-b2", b)]
+    specs = [a, replace(b, target_distance_m=b.target_distance_m + 500), c]
+    diff = diff_workouts(existing, specs)
+    assert diff.unchanged == 1
+    assert diff.updates == [("id-b", specs[1])]
+    assert diff.deletes == ["id-b2"]
+    assert diff.inserts == [c]
+
+
+# Against the Postgres at DATABASE_URL (migrated to head; skipped otherwise).
+@pytest.fixture
+def client():
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.connect() as conn:
+            if not conn.execute(text("SELECT to_regclass('ix_plans_user_active')")).scalar():
+                pytest.skip("database is not migrated to head")
+    except Exception as exc:  # noqa: BLE001 - no reachable Postgres
+        pytest.skip(f"no Postgres at DATABASE_URL: {exc.__class__.__name__}")
+    finally:
+        engine.dispose()
+    email = f"diff-{uuid.uuid4().hex}@example.com"
+    with TestClient(create_app()) as c:
+        tokens = c.post("/auth/register", json={"email": email, "password": "diff-password", "age": 30, "sex": "other"})
+        assert tokens.status_code == 200, tokens.text
+        c.headers["Authorization"] = f"Bearer {tokens.json()['access_token']}"
+        yield c
+    with get_sessionmaker()() as db:
+        db.execute(delete(User).where(User.email == email))
+        db.commit()
+
+
+def test_regeneration_keeps_adaptations(client):
+    today = date.today()
+    snap = {"date": str(today - timedelta(weeks=3)), "comfortable_distance_m": 8000, "comfortable_time_sec": 2700}
+    assert client.post("/capability", json=snap).status_code == 200
+    goal = {"distance_m": 21097, "target_date": str(today + timedelta(weeks=16))}
+    goal_id = client.post("/goals", json=goal).json()["id"]
+    plan = client.post(f"/plans/goals/{goal_id}/generate-plan").json()
+    week = [w for w in plan["workouts"] if today < date.fromisoformat(w["wdate"]) <= today + timedelta(days=7)]
+
+    # Three hard easy runs (or the key sessions skipped around them) adapt the coming week
+    easy = [w for w in plan["workouts"] if w["wtype"] == "easy" and date.fromisoformat(w["wdate"]) < today]
+    for w in easy[-3:]:
+        log = {"actual_distance_m": w["target_distance_m"], "actual_time_sec": 2400, "rpe": 8}
+        assert client.post(f"/workouts/{w['id']}/log", json=log).status_code == 200
+    adapted = {w["id"]: w for w in client.get("/plans/current").json()["workouts"]}
+    assert any(adapted[w["id"]]["target_distance_m"] != w["target_distance_m"] for w in week)
+
+    diff = client.get(f"/plans/{plan['id']}/diff").json()
+    assert (diff["inserted"], diff["updated"], diff["deleted"]) == ([], [], [])
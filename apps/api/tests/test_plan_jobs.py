@@ -0,0 +1,71 @@
+import pytest
+from fastapi import HTTPException
+from rq import SimpleWorker
+
+from app import queue
+from app.auth.dependencies import Principal
+from app.routers import plans
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    conn = fakeredis.FakeStrictRedis()
+    monkeypatch.setattr(queue, "get_redis", lambda: conn)
+    return conn
+
+
+def _enqueue(user_id: str = "u1"):
+    return queue.get_queue(queue.PLANS_QUEUE).enqueue(
+        "app.plan_jobs.run_plan_generation", user_id, "g1", "full", meta={"user_id": user_id}
+    )
+
+
+def _work(redis) -> None:
+    SimpleWorker([queue.get_queue(queue.PLANS_QUEUE)], connection=redis).work(burst=True)
+
+
+def test_job_status_is_private_to_its_owner(redis):
+    job = _enqueue()
+    assert plans.get_plan_job(job.id, user=Principal(id="u1")).status == "queued"
+    for job_id, user_id in ((job.id, "u2"), ("missing", "u1")):
+        with pytest.raises(HTTPException) as exc:
+            plans.get_plan_job(job_id, user=Principal(id=user_id))
+        assert exc.value.status_code == 404
+
+
+def test_worker_runs_generation_and_reports_the_plan(redis, monkeypatch):
+    calls = []
+
+    def generate(db, user_id, goal_id, mode):
+        calls.append((user_id, goal_id, mode))
+        return "p1", b"{}", '"p-p1-1"'
+
+    monkeypatch.setattr(plans, "generate_for_goal", generate)
+    job = _enqueue()
+    _work(redis)
+    out = plans.get_plan_job(job.id, user=Principal(id="u1"))
+    assert (out.status, out.plan_id, out.error) == ("finished", "p1", None)
+    assert calls == [("u1", "g1", "full")]
+
+
+def test_failed_generation_surfaces_the_http_detail(redis, monkeypatch):
+    def generate(db, user_id, goal_id, mode):
+        raise HTTPException(status_code=409, detail="Plan generation already in progress for this goal")
+
+    monkeypatch.setattr(plans, "generate_for_goal", generate)
+    job = _enqueue()
+    _work(redis)
+    out = plans.get_plan_job(job.id, user=Principal(id="u1"))
+    assert out.status == "failed" and out.plan_id is None
+    assert out.error == "Plan generation already in progress for this goal"
+
+
+def test_unreachable_queue_is_a_503(monkeypatch):
+    server = fakeredis.FakeServer()
+    server.connected = False
+    monkeypatch.setattr(queue, "get_redis", lambda: fakeredis.FakeStrictRedis(server=server))
+    with pytest.raises(HTTPException) as exc:
+        plans.enqueue_generation("u1", "g1", "full")
+    assert exc.value.status_code == 503
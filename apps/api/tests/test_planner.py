@@ -1,6 +1,10 @@
 from datetime import date, timedelta
 
-from app.domain.planner import PlanSpec, generate_plan
+import pytest
+from pydantic import ValidationError
+
+from app.domain.planner import PlanRequest, PlanSpec, generate_plan, generate_plan_batch
+from app.schemas import PLAN_BATCH_MAX_WEEKS, PlanBatchRequest
 
 
 def test_generate_plan_invariants():
@@ -15,3 +19,33 @@ def test_generate_plan_invariants():
     longs = [w for w in workouts if w.wtype == "long"]
     assert len(longs) == 8
 
+
+
+def test_batch_matches_single_plan():
+    start = date.today()
+    requests = [
+        PlanRequest(goal_distance_m=g, start_weekly_vol=v, cap_growth=0.1, start_date=start, end_date=start + timedelta(weeks=w))
+        for g in (5000, 21097, 42195)
+        for v in (10000.0, 27500.0)
+        for w in (1, 5, 8, 18)
+    ]
+    batch = generate_plan_batch(requests)
+    assert len(batch) == len(requests)
+    for i, req in enumerate(requests):
+        spec = PlanSpec(start_date=req.start_date, end_date=req.end_date, running_days_per_week=4, phases={})
+        single = generate_plan(
+            goal_distance_m=req.goal_distance_m, start_weekly_vol=req.start_weekly_vol, cap_growth=req.cap_growth, spec=spec
+        )
+        assert batch.specs(i) == single
+
+
+def test_batch_request_bounds_dates_and_total_work():
+    start = date.today()
+    item = {"goal_distance_m": 10000, "comfortable_distance_m": 5000, "start_date": str(start)}
+    PlanBatchRequest(items=[{**item, "end_date": str(start + timedelta(weeks=8))}])
+    for end in (start, start - timedelta(days=1), start + timedelta(weeks=PLAN_BATCH_MAX_WEEKS + 1)):
+        with pytest.raises(ValidationError):
+            PlanBatchRequest(items=[{**item, "end_date": str(end)}])
+    year = {**item, "end_date": str(start + timedelta(weeks=52))}
+    with pytest.raises(ValidationError, match="plan weeks in total"):
+        PlanBatchRequest(items=[year] * 1000)
@@ -1,4 +1,4 @@
-from app.domain.projection import riegel_predict
+from app.domain.projection import RiegelFit, fit_riegel, riegel_predict
 
 
 def test_riegel_monotonic_with_distance():
@@ -23,3 +23,19 @@ def test_riegel_invalid_distance_raises():
     else:
         assert False, "Expected ValueError"
 
+
+
+def test_riegel_fit_recovers_exponent_incrementally():
+    pairs = [(d, riegel_predict(1500, 5000, d, k=1.08)) for d in (3000, 5000, 8000, 10000, 21097)]
+    fit = RiegelFit()
+    assert fit.exponent() is None
+    for d, t in pairs:
+        fit.add(d, t)
+    assert abs(fit.exponent() - 1.08) < 1e-3
+    assert fit_riegel(pairs) == fit
+
+
+def test_riegel_fit_needs_distance_spread():
+    fit = fit_riegel([(5000, 1500), (5000, 1480), (5000, 1520), (500, 100)])
+    assert fit.n == 3
+    assert fit.exponent() is None
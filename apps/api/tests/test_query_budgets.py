@@ -0,0 +1,158 @@
+import logging
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, text
+
+from app import queue
+from app.config import get_settings
+from app.db import get_sessionmaker
+from app.domain.planner import WorkoutSpec
+from app.main import create_app
+from app.metrics import budget_of
+from app.models import User
+from app.routers import auth, capability, goals, imports, plans, workouts
+from app.routers.aio import auth as aio_auth
+from app.routers.aio import capability as aio_capability
+from app.routers.aio import goals as aio_goals
+from app.routers.aio import imports as aio_imports
+from app.routers.aio import plans as aio_plans
+from app.routers.aio import workouts as aio_workouts
+
+ROUTERS = [auth, capability, goals, imports, plans, workouts]
+AIO_ROUTERS = [aio_auth, aio_capability, aio_goals, aio_imports, aio_plans, aio_workouts]
+
+
+def _routes(modules):
+    for module in modules:
+        for route in module.router.routes:
+            if isinstance(route, APIRoute):
+                for method in route.methods:
+                    yield (method, route.path), route.endpoint
+
+
+def test_every_endpoint_declares_a_query_budget():
+    sync, aio = dict(_routes(ROUTERS)), dict(_routes(AIO_ROUTERS))
+    assert [key for key, endpoint in sync.items() if budget_of(endpoint) is None] == []
+    # The async routers run the same statements, so they carry the same budgets
+    assert {key: budget_of(e) for key, e in aio.items()} == {key: budget_of(sync[key]) for key in aio}
+
+
+# The tests below drive every endpoint through the app against the Postgres at
+# DATABASE_URL (migrated to head; skipped otherwise). MetricsMiddleware logs a
+# warning for any request over its endpoint's budget, and the test fails on it.
+@pytest.fixture(scope="module")
+def client():
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.connect() as conn:
+            if not conn.execute(text("SELECT to_regclass('ix_plans_user_active')")).scalar():
+                pytest.skip("database is not migrated to head")
+    except Exception as exc:  # noqa: BLE001 - no reachable Postgres
+        pytest.skip(f"no Postgres at DATABASE_URL: {exc.__class__.__name__}")
+    finally:
+        engine.dispose()
+    with TestClient(create_app()) as c:
+        yield c
+
+
+@pytest.fixture
+def user(client):
+    email = f"budget-{uuid.uuid4().hex}@example.com"
+    tokens = client.post("/auth/register", json={"email": email, "password": "budget-pw", "age": 30, "sex": "other"})
+    assert tokens.status_code == 200
+    yield email, {"Authorization": f"Bearer {tokens.json()['access_token']}"}
+    with get_sessionmaker()() as db:
+        db.execute(delete(User).where(User.email == email))
+        db.commit()
+
+
+@pytest.fixture
+def overruns(caplog):
+    caplog.set_level(logging.WARNING, logger="app.metrics")
+    return lambda: [r.getMessage() for r in caplog.records if r.name == "app.metrics"]
+
+
+def _ok(resp, status: int = 200):
+    assert resp.status_code == status, resp.text
+    return resp
+
+
+def test_endpoints_stay_within_query_budgets(client, user, overruns, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    conn = fakeredis.FakeStrictRedis()
+    monkeypatch.setattr(queue, "get_redis", lambda: conn)
+    email, h = user
+    today = date.today()
+
+    refresh = _ok(client.post("/auth/login", json={"email": email, "password": "budget-pw"})).json()["refresh_token"]
+    _ok(client.post("/auth/refresh", params={"token": refresh}))
+    snap = {"date": str(today), "comfortable_distance_m": 8000, "comfortable_time_sec": 2700}
+    _ok(client.post("/capability", headers=h, json=snap))
+    _ok(client.get("/capability/latest", headers=h))
+    goal = {"distance_m": 21097, "target_date": str(today + timedelta(weeks=16))}
+    goal_id = _ok(client.post("/goals", headers=h, json=goal)).json()["id"]
+    _ok(client.post(f"/goals/{goal_id}/feasibility", headers=h))
+    sweep = {"target_dates": [str(today + timedelta(weeks=12))], "distances_m": [10000, 21097]}
+    _ok(client.post("/goals/feasibility-sweep", headers=h, json=sweep))
+
+    plan = _ok(client.post(f"/plans/goals/{goal_id}/generate-plan", headers=h)).json()
+    # Superseding the active plan, then rewriting it in place after capability changes
+    plan = _ok(client.post(f"/plans/goals/{goal_id}/generate-plan", headers=h)).json()
+    _ok(client.post("/capability", headers=h, json={**snap, "comfortable_distance_m": 12000}))
+    _ok(client.post(f"/plans/goals/{goal_id}/generate-plan", headers=h, params={"mode": "incremental"}))
+    _ok(client.post("/capability", headers=h, json={**snap, "comfortable_distance_m": 6000}))
+    _ok(client.get(f"/plans/{plan['id']}/diff", headers=h))
+    _ok(client.post(f"/plans/{plan['id']}/regenerate", headers=h))
+    job = _ok(client.post(f"/plans/goals/{goal_id}/generate-plan", headers=h, params={"async": "true"}), 202)
+    _ok(client.get(f"/plans/jobs/{job.json()['job_id']}", headers=h))
+    batch_item = {"goal_distance_m": 10000, "comfortable_distance_m": 5000, "start_date": str(today)}
+    batch = {"items": [{**batch_item, "end_date": str(today + timedelta(weeks=8))}]}
+    _ok(client.post("/plans/generate-batch", headers=h, json=batch))
+
+    for _ in range(2):  # cold, then served from the response cache
+        _ok(client.get("/plans/current", headers=h))
+    _ok(client.get(f"/plans/{plan['id']}/workouts", headers=h))
+    _ok(client.get(f"/plans/{plan['id']}/workouts", headers=h, params={"limit": 10}))
+    streamed = _ok(client.get(f"/plans/{plan['id']}/workouts", headers={**h, "Accept": "application/x-ndjson"}))
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    _ok(client.get(f"/plans/{plan['id']}/calendar.ics", headers=h))
+    _ok(client.post(f"/plans/{plan['id']}/calendar-token", headers=h))
+
+    run_ids = [w["id"] for w in _ok(client.get("/plans/current", headers=h)).json()["workouts"] if w["wtype"] != "rest"]
+    _ok(client.get(f"/workouts/{run_ids[0]}", headers=h))
+    log = {"actual_distance_m": 3000, "actual_time_sec": 1500, "rpe": 9, "notes": "heavy legs"}
+    _ok(client.post(f"/workouts/{run_ids[0]}/log", headers=h, json=log))
+    items = [{"workout_id": w, **log} for w in run_ids[1:9]] + [{"workout_id": str(uuid.uuid4())}]
+    _ok(client.post("/workouts/logs:batch", headers=h, json={"items": items}))
+
+    job = _ok(client.post("/imports", headers=h, files={"file": ("runs.csv", b"date,distance_m,time_sec\n")}), 202)
+    _ok(client.get(f"/imports/{job.json()['job_id']}", headers=h))
+
+    assert overruns() == []
+
+
+def test_bulk_workout_insert_is_one_statement(client, user, max_queries):
+    _, h = user
+    today = date.today()
+    snap = {"date": str(today), "comfortable_distance_m": 8000, "comfortable_time_sec": 2700}
+    _ok(client.post("/capability", headers=h, json=snap))
+    goal = {"distance_m": 10000, "target_date": str(today + timedelta(weeks=8))}
+    goal_id = _ok(client.post("/goals", headers=h, json=goal)).json()["id"]
+    plan_id = _ok(client.post(f"/plans/goals/{goal_id}/generate-plan", headers=h)).json()["id"]
+    # Rest and run days leave different columns NULL, which must not split the batch
+    specs = [
+        WorkoutSpec(today + timedelta(days=100 + i), "rest", None, None, None, "Rest", False)
+        if i % 2
+        else WorkoutSpec(today + timedelta(days=100 + i), "easy", 5000, 1800, "Z2", "Easy", False)
+        for i in range(50)
+    ]
+    with get_sessionmaker()() as db:
+        with max_queries(1):
+            rows = plans._bulk_insert_workouts(db, plan_id, specs)
+        db.rollback()
+    assert [(r["wdate"], r["wtype"]) for r in rows] == [(s.wdate, s.wtype) for s in specs]
+
@@ -0,0 +1,128 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, exists, select, text
+
+from app.config import get_settings
+from app.models import (
+    AdaptationEvent,
+    CapabilitySnapshot,
+    Goal,
+    Plan,
+    SessionLog,
+    UserCurrentState,
+    Workout,
+)
+from app.routers.plans import workouts_stmt
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+OTHER_ID = "00000000-0000-0000-0000-000000000002"
+
+
+# EXPLAIN checks for the indexes from 0005_hot_path_indexes. Needs a Postgres at
+# DATABASE_URL migrated to head; skipped otherwise. Sequential scans are disabled
+# per transaction so the assertions hold on near-empty tables.
+@pytest.fixture(scope="module")
+def pg():
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.connect() as conn:
+            if not conn.execute(text("SELECT to_regclass('ix_plans_user_active')")).scalar():
+                pytest.skip("database is not migrated to head")
+    except Exception as exc:  # noqa: BLE001 - no reachable Postgres
+        pytest.skip(f"no Postgres at DATABASE_URL: {exc.__class__.__name__}")
+    with engine.connect() as conn, conn.begin() as tx:
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        yield conn
+        tx.rollback()
+    engine.dispose()
+
+
+def _scans(conn, stmt) -> list[tuple[str, str | None]]:
+    compiled = stmt.compile(dialect=conn.dialect)
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    out, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        out.append((node["Node Type"], node.get("Index Name")))
+        stack.extend(node.get("Plans", []))
+    return out
+
+
+def _assert_index(conn, stmt, index: str | tuple[str, ...], *, sorted_by_index: bool = False) -> None:
+    indexes = (index,) if isinstance(index, str) else index
+    scans = _scans(conn, stmt)
+    assert any(name in indexes for _, name in scans), scans
+    assert not any(node == "Seq Scan" for node, _ in scans), scans
+    if sorted_by_index:
+        assert not any(node == "Sort" for node, _ in scans), scans
+
+
+def test_latest_snapshot_uses_descending_index(pg):
+    stmt = (
+        select(CapabilitySnapshot)
+        .where(CapabilitySnapshot.user_id == USER_ID)
+        .order_by(CapabilitySnapshot.date.desc(), CapabilitySnapshot.created_at.desc())
+        .limit(1)
+    )
+    _assert_index(pg, stmt, "ix_capability_snapshots_user_latest", sorted_by_index=True)
+
+
+def test_current_plan_uses_partial_covering_index(pg):
+    stmt = (
+        select(Plan.id, Plan.start_date, Plan.end_date, Plan.status, Plan.version)
+        .where(Plan.user_id == USER_ID, Plan.status == "active")
+        .order_by(Plan.created_at.desc())
+        .limit(1)
+    )
+    _assert_index(pg, stmt, "ix_plans_user_active", sorted_by_index=True)
+
+
+def test_active_plan_for_goal_uses_unique_partial_index(pg):
+    stmt = select(Plan.id).where(Plan.goal_id == OTHER_ID, Plan.status == "active")
+    _assert_index(pg, stmt, "uq_plans_goal_active")
+
+
+def test_workout_listing_uses_plan_date_index(pg):
+    stmt = workouts_stmt(OTHER_ID, date(2025, 1, 1), None, (date(2025, 2, 1), USER_ID)).limit(50)
+    _assert_index(pg, stmt, "ix_workouts_plan_date")
+
+
+def test_foreign_key_lookups_are_indexed(pg):
+    _assert_index(pg, select(Goal.id).where(Goal.user_id == USER_ID), "ix_goals_user_id")
+    _assert_index(pg, select(Plan.id).where(Plan.goal_id == OTHER_ID), "ix_plans_goal_id")
+    _assert_index(pg, select(SessionLog.id).where(SessionLog.workout_id == OTHER_ID), "ix_session_logs_workout_id")
+    _assert_index(
+        pg,
+        select(AdaptationEvent.id).where(AdaptationEvent.plan_id == OTHER_ID).order_by(AdaptationEvent.event_date),
+        "ix_adaptation_events_plan_date",
+    )
+
+
+def test_missed_key_probe_uses_log_index(pg):
+    stmt = select(Workout.wdate).where(
+        Workout.plan_id == OTHER_ID,
+        Workout.is_key.is_(True),
+        Workout.wdate > date(2025, 1, 1),
+        ~exists().where(SessionLog.workout_id == Workout.id),
+    )
+    _assert_index(pg, stmt, "ix_session_logs_workout_id")
+
+
+def test_current_state_readers_are_primary_key_lookups(pg):
+    snapshot = (
+        select(CapabilitySnapshot)
+        .join(UserCurrentState, UserCurrentState.snapshot_id == CapabilitySnapshot.id)
+        .where(UserCurrentState.user_id == USER_ID)
+    )
+    _assert_index(pg, snapshot, "user_current_state_pkey", sorted_by_index=True)
+    _assert_index(pg, snapshot, "capability_snapshots_pkey")
+    plan = (
+        select(Plan.id, Plan.version)
+        .join(UserCurrentState, UserCurrentState.plan_id == Plan.id)
+        .where(UserCurrentState.user_id == USER_ID, Plan.status == "active")
+    )
+    _assert_index(pg, plan, "user_current_state_pkey", sorted_by_index=True)
+    # Any index that reaches the plan row by id is fine; on a fresh database the
+    # planner may probe the partial active-plan indexes instead of the primary key.
+    _assert_index(pg, plan, ("plans_pkey", "uq_plans_goal_active", "ix_plans_user_active"))
@@ -0,0 +1,37 @@
+from datetime import date
+
+from app.schemas import WorkoutOut
+from app.serialization import (
+    WORKOUT_FIELDS,
+    dumps,
+    etag_matches,
+    ndjson_lines,
+    pack_tagged,
+    unpack_tagged,
+    workout_dicts,
+)
+
+
+ROWS = [
+    ("a1", date(2025, 3, 4), "tempo", 8000, None, "threshold", "Quality session", True),
+    ("a2", date(2025, 3, 6), "easy", None, 1800, None, None, False),
+]
+
+
+def test_column_rows_match_pydantic_encoding():
+    expected = [WorkoutOut(**dict(zip(WORKOUT_FIELDS, r))) for r in ROWS]
+    assert dumps(workout_dicts(ROWS)) == ("[" + ",".join(w.model_dump_json() for w in expected) + "]").encode()
+    assert ndjson_lines(ROWS) == b"".join(w.model_dump_json().encode() + b"\n" for w in expected)
+
+
+def test_etag_matching():
+    etag = '"p-abc-3"'
+    assert etag_matches(etag, etag)
+    assert etag_matches('"x", W/"p-abc-3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"p-abc-2"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_tagged_cache_values_round_trip():
+    assert unpack_tagged(pack_tagged('"c-1"', b'{"a":1}')) == ('"c-1"', b'{"a":1}')
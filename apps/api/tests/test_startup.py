@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+
+# Generous for slow CI machines; the module checks below are the strict part.
+IMPORT_BUDGET_SEC = 3.0
+# Loaded on first use or by the startup warmup, never by importing the app.
+DEFERRED_MODULES = ["psycopg", "jose", "cryptography", "passlib", "argon2", "redis", "rq", "sqlalchemy.ext.asyncio"]
+
+
+def _run(code: str, **env: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=API_DIR,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    )
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def test_importing_the_app_creates_no_engine_and_defers_heavy_modules():
+    # app.asgi builds the app, as a server does; app.main alone builds nothing
+    result = _run(
+        """
+import json, os, sys, time
+t0 = time.perf_counter()
+import app.asgi
+elapsed = time.perf_counter() - t0
+from app.db import get_async_engine, get_engine
+print(json.dumps({
+    "elapsed": elapsed,
+    "engines": get_engine.cache_info().currsize + get_async_engine.cache_info().currsize,
+    "loaded": [m for m in json.loads(os.environ["DEFERRED_MODULES"]) if m in sys.modules],
+}))
+""",
+        DEFERRED_MODULES=json.dumps(DEFERRED_MODULES),
+    )
+    assert result["engines"] == 0
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_BUDGET_SEC
+
+
+def test_startup_warmup_fills_the_pool_before_serving(tmp_path):
+    result = _run(
+        """
+import json, sys
+from fastapi.testclient import TestClient
+from app.main import create_app
+with TestClient(create_app()) as client:
+    pool = client.get("/healthz/pool").json()["sync"]
+    primed = [m for m in ("jose", "argon2") if m in sys.modules]
+print(json.dumps({"pool": pool, "primed": primed}))
+""",
+        DATABASE_URL=f"sqlite:///{tmp_path / 'warmup.db'}",
+        STARTUP_WARMUP="1",
+        DB_POOL_SIZE="3",
+        PASSWORD_HASH_WORKERS="0",
+        RESPONSE_CACHE="memory",
+    )
+    assert result["pool"]["checkouts"] == 3
+    assert result["pool"]["size"] == 3 and result["pool"]["in_use"] == 0
+    assert result["primed"] == ["jose", "argon2"]
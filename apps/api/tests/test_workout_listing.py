@@ -0,0 +1,27 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.routers.plans import decode_cursor, encode_cursor, workouts_stmt
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(date(2025, 3, 4), "6f1c0c1e-8f7a-4b5e-9d3a-2a1b3c4d5e6f")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (date(2025, 3, 4), "6f1c0c1e-8f7a-4b5e-9d3a-2a1b3c4d5e6f")
+
+
+@pytest.mark.parametrize("bad", ["!!!", "bm90LWEtY3Vyc29y", "", encode_cursor(date(2025, 3, 4), "not-a-uuid")])
+def test_invalid_cursor_is_400(bad):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(bad)
+    assert exc.value.status_code == 400
+
+
+def test_keyset_statement_orders_by_date_then_id():
+    stmt = workouts_stmt("p", None, None, (date(2025, 3, 4), "w"))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "(workouts.wdate, workouts.id) > (" in sql
+    assert sql.endswith("ORDER BY workouts.wdate ASC, workouts.id ASC")
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0002_user_riegel_fits"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_riegel_fits",
+        sa.Column("user_id", postgresql.UUID(as_uuid=False), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("n", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("sum_x", sa.Float(), server_default=sa.text("0"), nullable=False),
+        sa.Column("sum_y", sa.Float(), server_default=sa.text("0"), nullable=False),
+        sa.Column("sum_xx", sa.Float(), server_default=sa.text("0"), nullable=False),
+        sa.Column("sum_xy", sa.Float(), server_default=sa.text("0"), nullable=False),
+        sa.Column("exponent", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    # Backfill running sums from existing logs so fitted exponents apply immediately.
+    op.execute(
+        """
+        INSERT INTO user_riegel_fits (user_id, n, sum_x, sum_y, sum_xx, sum_xy)
+        SELECT p.user_id,
+               count(*),
+               sum(ln(l.actual_distance_m)),
+               sum(ln(l.actual_time_sec)),
+               sum(ln(l.actual_distance_m) ^ 2),
+               sum(ln(l.actual_distance_m) * ln(l.actual_time_sec))
+        FROM session_logs l
+        JOIN workouts w ON w.id = l.workout_id
+        JOIN plans p ON p.id = w.plan_id
+        WHERE l.actual_distance_m >= 1000 AND l.actual_time_sec > 0
+        GROUP BY p.user_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE user_riegel_fits
+        SET exponent = LEAST(1.15, GREATEST(1.01,
+            (sum_xy / n - (sum_x / n) * (sum_y / n)) / (sum_xx / n - (sum_x / n) ^ 2)))
+        WHERE n >= 3 AND sum_xx / n - (sum_x / n) ^ 2 >= 0.01
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_riegel_fits")
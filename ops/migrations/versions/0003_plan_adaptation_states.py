@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_plan_adaptation_states"
+down_revision = "0002_user_riegel_fits"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows are created lazily on a plan's first log; no backfill needed.
+    op.create_table(
+        "plan_adaptation_states",
+        sa.Column("plan_id", postgresql.UUID(as_uuid=False), sa.ForeignKey("plans.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("state", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("plan_adaptation_states")
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_hot_path_indexes"
+down_revision = "0004_plan_versions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The unique index below needs at most one active plan per goal; keep the newest.
+    op.execute(
+        """
+        UPDATE plans p
+        SET status = 'superseded', version = p.version + 1
+        WHERE p.status = 'active'
+          AND EXISTS (
+              SELECT 1 FROM plans newer
+              WHERE newer.goal_id = p.goal_id
+                AND newer.status = 'active'
+                AND (newer.created_at, newer.id) > (p.created_at, p.id)
+          )
+        """
+    )
+    # CONCURRENTLY so existing tables stay writable while indexes build.
+    with op.get_context().autocommit_block():
+        # Latest snapshot per user (capability/latest, goal feasibility, plan generation)
+        op.create_index(
+            "ix_capability_snapshots_user_latest",
+            "capability_snapshots",
+            ["user_id", sa.text("date DESC"), sa.text("created_at DESC")],
+            postgresql_concurrently=True,
+        )
+        # Current plan per user; INCLUDE covers the ETag version check
+        op.create_index(
+            "ix_plans_user_active",
+            "plans",
+            ["user_id", sa.text("created_at DESC")],
+            postgresql_where=sa.text("status = 'active'"),
+            postgresql_include=["id", "start_date", "end_date", "status", "version"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "uq_plans_goal_active",
+            "plans",
+            ["goal_id"],
+            unique=True,
+            postgresql_where=sa.text("status = 'active'"),
+            postgresql_concurrently=True,
+        )
+        # Foreign keys: ownership lookups and ON DELETE CASCADE
+        op.create_index("ix_plans_user_id", "plans", ["user_id"], postgresql_concurrently=True)
+        op.create_index("ix_plans_goal_id", "plans", ["goal_id"], postgresql_concurrently=True)
+        op.create_index("ix_goals_user_id", "goals", ["user_id"], postgresql_concurrently=True)
+        op.create_index("ix_session_logs_workout_id", "session_logs", ["workout_id"], postgresql_concurrently=True)
+        op.create_index(
+            "ix_adaptation_events_plan_date",
+            "adaptation_events",
+            ["plan_id", "event_date"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in (
+            ("ix_adaptation_events_plan_date", "adaptation_events"),
+            ("ix_session_logs_workout_id", "session_logs"),
+            ("ix_goals_user_id", "goals"),
+            ("ix_plans_goal_id", "plans"),
+            ("ix_plans_user_id", "plans"),
+            ("uq_plans_goal_active", "plans"),
+            ("ix_plans_user_active", "plans"),
+            ("ix_capability_snapshots_user_latest", "capability_snapshots"),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_user_current_state"
+down_revision = "0005_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_current_state",
+        sa.Column("user_id", postgresql.UUID(as_uuid=False), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column(
+            "snapshot_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("capability_snapshots.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("plan_id", postgresql.UUID(as_uuid=False), sa.ForeignKey("plans.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("goal_id", postgresql.UUID(as_uuid=False), sa.ForeignKey("goals.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    # Backfill with the same ordering the readers used before the pointers existed.
+    op.execute(
+        """
+        INSERT INTO user_current_state (user_id, snapshot_id, plan_id, goal_id)
+        SELECT u.id, s.id, p.id, p.goal_id
+        FROM users u
+        LEFT JOIN LATERAL (
+            SELECT id FROM capability_snapshots
+            WHERE user_id = u.id
+            ORDER BY date DESC, created_at DESC
+            LIMIT 1
+        ) s ON true
+        LEFT JOIN LATERAL (
+            SELECT id, goal_id FROM plans
+            WHERE user_id = u.id AND status = 'active'
+            ORDER BY created_at DESC
+            LIMIT 1
+        ) p ON true
+        WHERE s.id IS NOT NULL OR p.id IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_current_state")
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_session_log_imports"
+down_revision = "0006_user_current_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Imported history may not match a planned workout, so logs carry their own owner and date.
+    op.add_column(
+        "session_logs",
+        sa.Column("user_id", postgresql.UUID(as_uuid=False), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=True),
+    )
+    op.add_column("session_logs", sa.Column("run_date", sa.Date(), nullable=True))
+    op.add_column("session_logs", sa.Column("source", sa.String(), nullable=True))
+    op.execute(
+        """
+        UPDATE session_logs l
+        SET user_id = p.user_id, run_date = w.wdate
+        FROM workouts w JOIN plans p ON p.id = w.plan_id
+        WHERE w.id = l.workout_id
+        """
+    )
+    op.alter_column("session_logs", "user_id", nullable=False)
+    op.alter_column("session_logs", "run_date", nullable=False)
+    op.alter_column("session_logs", "workout_id", nullable=True)
+    # CONCURRENTLY so session_logs stays writable while the index builds.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_session_logs_user_date", "session_logs", ["user_id", "run_date"], postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_session_logs_user_date", table_name="session_logs", postgresql_concurrently=True)
+    op.execute("DELETE FROM session_logs WHERE workout_id IS NULL")
+    op.alter_column("session_logs", "workout_id", nullable=False)
+    op.drop_column("session_logs", "source")
+    op.drop_column("session_logs", "run_date")
+    op.drop_column("session_logs", "user_id")
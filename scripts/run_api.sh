@@ -19,4 +19,4 @@ alembic -c ops/migrations/alembic.ini upgrade head
 
 # Start API
 cd "$API_DIR"
-exec uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
+exec uvicorn app.asgi:app --reload --host 0.0.0.0 --port 8000